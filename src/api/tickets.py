@@ -1,16 +1,47 @@
+import json
+
 import jira
-from flask import Blueprint, request
+import marshmallow
+from flask import Blueprint, Response, request, stream_with_context, url_for
 from flask_restful import Api, Resource
+from werkzeug import http
 
 from src import utils
+from src.schemas.serializers.compiled import compile_schema
 from src.schemas.serializers.jira import Issue
+from src.schemas.serializers.job import JobSchema
 from src.schemas.deserializers import tickets as dsl
 from src.services.jira import JiraSvc
+from src.services.job import JobSvc
 from src.services.ticket import TicketSvc
 
 blueprint = Blueprint("tickets", __name__, url_prefix="/tickets")
 api = Api(blueprint)
 
+NDJSON = "application/x-ndjson"
+
+
+def issue_schema(only: list[str] = None):
+    """The compiled issue schema dumping the given fields, all if not given."""
+    return compile_schema(Issue.IssueSchema, only=only)
+
+
+def not_modified(etag: str, last_modified) -> bool:
+    """Whether the representation held by the client is still current."""
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified:
+        # HTTP dates have a precision of one second
+        return last_modified.replace(microsecond=0) <= request.if_modified_since
+    return False
+
+
+def validator_headers(etag: str, last_modified) -> dict:
+    headers = {"ETag": http.quote_etag(etag)}
+    if last_modified:
+        headers["Last-Modified"] = http.http_date(last_modified)
+    return headers
+
 
 @api.resource("/", endpoint="tickets")
 class Tickets(Resource):
@@ -23,37 +54,103 @@ class Tickets(Resource):
         parameters:
             - in: query
               schema: TicketSearchCriteriaSchema
+            - in: header
+              name: If-None-Match
+              schema:
+                type: string
+              description: the ETag of the page held by the client
+            - in: header
+              name: If-Modified-Since
+              schema:
+                type: string
+              description: when the page held by the client was last modified
         responses:
             200:
-                description: Ok
+                description: Ok, along with a link to the next page if any. Tickets
+                    are streamed one per line, through every page from the given
+                    one, when asked for newline delimited JSON.
+                headers:
+                    Link:
+                        description: the URL of the next page, as rel="next"
+                        schema:
+                            type: string
+                    ETag:
+                        description: the version of the results
+                        schema:
+                            type: string
+                    Last-Modified:
+                        description: when the results were last updated
+                        schema:
+                            type: string
                 content:
                     application/json:
                         schema:
                             type: array
                             items: Issue
+                    application/x-ndjson:
+                        schema: Issue
+            304:
+                description: Not modified since the version held by the client
+            400:
+                $ref: "#/components/responses/BadRequest"
             404:
                 $ref: "#/components/responses/NotFound"
         """
+        svc = JiraSvc.instance()
         params = request.args.copy()
-        boards = params.poplist("boards") or (b.key for b in JiraSvc().boards())
+        boards = params.poplist("boards") or [b.key for b in svc.boards()]
         filters = {
             "boards": boards,
-            "categories": params.poplist("categories") or JiraSvc.allowed_categories(),
+            "categories": params.poplist("categories") or svc.allowed_categories(),
             "fields": params.poplist("fields"),
+            "only": params.poplist("only"),
             "limit": params.get("limit", 20),
             "sort": params.get("sort", "created"),
             **params,
         }
 
         # validate parameters
-        errors = dsl.TicketSearchCriteriaSchema().validate(filters)
-        if errors:
-            utils.abort_with(400, message=errors)
+        try:
+            criteria = dsl.TicketSearchCriteriaSchema().load(filters)
+        except marshmallow.ValidationError as ex:
+            utils.abort_with(400, message=ex.messages)
+
+        # identical searches share their cached results, whatever the order
+        criteria = {
+            k: sorted(v) if isinstance(v, list) else v for k, v in criteria.items()
+        }
 
         # consider default values
-        tickets = TicketSvc.find_by(**filters)
+        limit = int(filters.pop("limit"))
+        mimetype = request.accept_mimetypes.best_match(["application/json", NDJSON])
+        try:
+            if mimetype == NDJSON:
+                tickets = TicketSvc.iter_by(batch_size=limit, **filters)
+                schema = issue_schema(only=filters["only"])
+                lines = (json.dumps(schema.dump(ticket)) + "\n" for ticket in tickets)
+                return Response(stream_with_context(lines), mimetype=NDJSON)
 
-        return Issue.IssueSchema(many=True).dump(tickets)
+            # check the page changed at all with a lighter search
+            if request.if_none_match or request.if_modified_since:
+                versions, cursor = TicketSvc.find_versions(limit=limit, **filters)
+                validators = TicketSvc.validators(versions, cursor=cursor)
+                if not_modified(*validators):
+                    return Response(status=304, headers=validator_headers(*validators))
+
+            tickets, cursor = TicketSvc.find_page_cached(
+                criteria=criteria, limit=limit, **filters
+            )
+        except ValueError as ex:
+            utils.abort_with(400, message=str(ex))
+
+        versions = TicketSvc.versions({t["key"]: t.get("updated") for t in tickets})
+        headers = validator_headers(*TicketSvc.validators(versions, cursor=cursor))
+        if cursor:
+            args = {**request.args.to_dict(flat=False), "cursor": cursor}
+            url = url_for(".tickets", _external=True, **args)
+            headers["Link"] = f'<{url}>; rel="next"'
+        schema = issue_schema(only=filters["only"])
+        return schema.dump(tickets, many=True), 200, headers
 
     def post(self):
         """
@@ -61,6 +158,13 @@ class Tickets(Resource):
         ---
         tags:
             - tickets
+        parameters:
+            - in: query
+              name: async
+              schema:
+                type: boolean
+                default: false
+              description: create the ticket in the background
         requestBody:
             description: ticket properties
             required: true
@@ -78,10 +182,19 @@ class Tickets(Resource):
                             explode: true
         responses:
             201:
+                headers:
+                    Warning:
+                        description: the attachments that could not be added
+                        schema:
+                            type: string
                 content:
                     application/json:
                         schema: IssueSchema
-
+            202:
+                description: The ticket is being created, see Location header.
+                content:
+                    application/json:
+                        schema: JobSchema
             400:
                 $ref: "#/components/responses/BadRequest"
             415:
@@ -104,11 +217,56 @@ class Tickets(Resource):
         if errors:
             utils.abort_with(400, message=errors)
 
+        if request.args.get("async", "false").lower() == "true":
+            job = TicketSvc.create_async(**body, attachments=files)
+            location = url_for(".job", job_id=job.id)
+            return JobSchema().dump(job), 202, {"Location": location}
+
+        reports = {}
         try:
-            created = TicketSvc.create(**body, attachments=files)
-            return Issue.IssueSchema().dump(created), 201
+            created = TicketSvc.create(
+                **body,
+                attachments=files,
+                progress=lambda stage, **kwargs: reports.update(kwargs),
+            )
         except jira.exceptions.JIRAError as ex:
             utils.abort_with(400, message=ex.response.text)
+        else:
+            # the ticket is created even if some attachments could not be added
+            headers = {}
+            if reports.get("error"):
+                headers["Warning"] = f'199 - "{reports["error"]}"'
+            return issue_schema().dump(created), 201, headers
+
+
+@api.resource("/jobs/<job_id>", endpoint="job")
+class TicketJob(Resource):
+    def get(self, job_id):
+        """
+        Get the status of a ticket being created in the background.
+        ---
+        tags:
+            - tickets
+        parameters:
+            - in: path
+              name: job_id
+              schema:
+                type: string
+              required: true
+              description: the job unique identifier
+        responses:
+            200:
+                description: Ok
+                content:
+                    application/json:
+                        schema: JobSchema
+            404:
+                $ref: "#/components/responses/NotFound"
+        """
+        job = JobSvc.get(job_id=job_id)
+        if not job:
+            utils.abort_with(404, message="Job not found")
+        return JobSchema().dump(job)
 
 
 @api.resource("/<key>", endpoint="ticket")
@@ -126,31 +284,58 @@ class Ticket(Resource):
                 type: string
               required: true
               description: the ticket unique identifier
+            - in: header
+              name: If-None-Match
+              schema:
+                type: string
+              description: the ETag of the ticket held by the client
+            - in: header
+              name: If-Modified-Since
+              schema:
+                type: string
+              description: when the ticket held by the client was last modified
         responses:
             200:
                 description: Ok
+                headers:
+                    ETag:
+                        description: the version of the results
+                        schema:
+                            type: string
+                    Last-Modified:
+                        description: when the results were last updated
+                        schema:
+                            type: string
                 content:
                     application/json:
                         schema: IssueSchema
+            304:
+                description: Not modified since the version held by the client
             404:
                 $ref: "#/components/responses/NotFound"
         """
         # search for ticket across supported boards and categories
-        result = next(
-            iter(
-                TicketSvc.find_by(
-                    key=key,
-                    board_keys=(b.key for b in JiraSvc().boards()),
-                    categories=JiraSvc.allowed_categories(),
-                    limit=1,
-                )
-            ),
-            None,
+        filters = dict(
+            key=key,
+            boards=[b.key for b in JiraSvc.instance().boards()],
+            categories=JiraSvc.allowed_categories(),
+            limit=1,
         )
+
+        # check the ticket changed at all with a lighter search
+        if request.if_none_match or request.if_modified_since:
+            versions, _ = TicketSvc.find_versions(**filters)
+            validators = TicketSvc.validators(versions)
+            if versions and not_modified(*validators):
+                return Response(status=304, headers=validator_headers(*validators))
+
+        result = next(iter(TicketSvc.find_by(**filters)), None)
         if not result:
             utils.abort_with(404, message="Ticket not found")
         else:
-            return Issue.IssueSchema().dump(result)
+            versions = TicketSvc.versions({result["key"]: result.get("updated")})
+            headers = validator_headers(*TicketSvc.validators(versions))
+            return issue_schema().dump(result), 200, headers
 
 
 @api.resource("/<key>/comment", endpoint="comment")
@@ -231,7 +416,7 @@ class SupportedBoards(Resource):
                             items:
                                 type: string
         """
-        return [b.key for b in JiraSvc().boards()]
+        return [b.key for b in JiraSvc.instance().boards()]
 
 
 @api.resource("/supported-categories", endpoint="supported-categories")
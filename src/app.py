@@ -1,3 +1,4 @@
+import sqlalchemy
 from apispec import APISpec
 from apispec.ext.marshmallow import MarshmallowPlugin
 from apispec_plugins.webframeworks.flask import FlaskPlugin
@@ -6,8 +7,13 @@ from flask import Flask, Blueprint
 
 from src import __meta__, __version__, utils
 from src.api.tickets import blueprint as tickets
+from src.cli.db.cli import cli as db_cli
+from src.cli.jira.cli import cli as jira_cli
 from src.cli.O365.cli import cli as o365_cli
-from src.settings import oas
+from src.models.job import Job
+from src.services.jira import board_registry
+from src.services.job import JobSvc
+from src.settings import cache, database, oas, templates
 from src.settings.ctx import ctx_settings, db
 from src.settings.env import config_class, load_dotenv
 
@@ -34,8 +40,20 @@ def setup_app(app):
     url_prefix = app.config["APPLICATION_ROOT"]
     openapi_version = app.config["OPENAPI"]
 
-    # link db to app
+    # link db to app, with a connection pool sized for the process
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = database.engine_options(app.config)
     db.init_app(app)
+    with app.app_context():
+        monitor = database.PoolMonitor(db.engine, log=app.logger)
+    app.extensions["pool_monitor"] = monitor
+    if app.config["DATABASE_POOL_STATS_INTERVAL_IN_SECONDS"]:
+        monitor.start(interval=app.config["DATABASE_POOL_STATS_INTERVAL_IN_SECONDS"])
+
+    # compile ticket format templates
+    app.extensions["templates"] = templates.create_environment(app)
+
+    # cache ticket searches, shared by processes with the sqlite backend
+    app.extensions["tickets_cache"] = cache.create_search_cache(app)
 
     # initial blueprint wiring
     index = Blueprint("index", __name__)
@@ -86,4 +104,15 @@ def setup_app(app):
     ctx_settings(app)
 
     # register cli commands
+    app.cli.add_command(db_cli)
+    app.cli.add_command(jira_cli)
     app.cli.add_command(o365_cli)
+
+    # fail the jobs left unfinished by workers that are gone, once migrated
+    with app.app_context():
+        if sqlalchemy.inspect(db.engine).has_table(Job.__tablename__):
+            JobSvc.fail_stale()
+
+    # load the Jira boards ahead of the first request, when serving
+    if app.config["JIRA_BOARDS"] and app.config["JIRA_BOARDS_WARM_UP"]:
+        board_registry.warm_up(app)
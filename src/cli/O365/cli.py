@@ -1,5 +1,5 @@
 import datetime
-import itertools
+import threading
 
 import click
 from flask import current_app
@@ -9,6 +9,8 @@ from O365_notifications.constants import O365EventType
 from O365_notifications.streaming import O365StreamingSubscriber
 
 from src.cli.O365.backend import DatabaseTokenBackend
+from src.services.checkpoint import CheckpointSvc
+from src.services.O365.backfill import MailboxBackfill
 from src.services.O365.filters import (
     JiraCommentNotificationFilter,
     RecipientControlFilter,
@@ -17,6 +19,7 @@ from src.services.O365.filters import (
     ValidateMetadataFilter,
 )
 from src.services.O365.handlers.jira import JiraNotificationHandler
+from src.utils.executors import KeyedExecutor
 
 cli = AppGroup("O365", short_help="Handle O365 events")
 
@@ -63,7 +66,7 @@ def create_subscriber(email: str = None, **kwargs):
     return subscriber
 
 
-def create_handler(subscriber):
+def create_handler(subscriber, executor: KeyedExecutor = None):
 
     # the O365 mailbox manager
     whitelist = current_app.config["EMAIL_WHITELISTED_DOMAINS"]
@@ -78,10 +81,32 @@ def create_handler(subscriber):
         ValidateMetadataFilter(),
     ]
     return JiraNotificationHandler(
-        parent=subscriber, namespace=subscriber.namespace, filters=filters
+        parent=subscriber,
+        namespace=subscriber.namespace,
+        filters=filters,
+        executor=executor,
     )
 
 
+def report_filters(handler, interval: int) -> threading.Event:
+    """Log the report of the handler filters periodically, until stopped.
+
+    :param handler: the notifications handler
+    :param interval: the seconds between reports
+    :return: the event to set for reports to stop
+    """
+    app = current_app._get_current_object()
+    stop = threading.Event()
+
+    def run():
+        with app.app_context():
+            while not stop.wait(interval):
+                handler.filters.log_report()
+
+    threading.Thread(target=run, name="filters-report", daemon=True).start()
+    return stop
+
+
 @cli.command()
 @click.option("--mailbox", "-m", default=None, help="the mailbox to manage events")
 @click.option("--retries", "-r", default=0, help="number of retries when request fails")
@@ -95,37 +120,62 @@ def authorize(mailbox=None, retries=0):
 @click.option("--retries", "-r", default=0, help="number of retries when request fails")
 def handle_incoming_email(mailbox, retries):
     """Handle incoming email."""
+    config = current_app.config
     subscriber = create_subscriber(email=mailbox)
-    handler = create_handler(subscriber)
 
-    # start listening for incoming notifications ...
-    subscriber.start_streaming(
-        notification_handler=handler,
-        connection_timeout=current_app.config["CONNECTION_TIMEOUT_IN_MINUTES"],
-        keep_alive_interval=current_app.config["KEEP_ALIVE_INTERVAL_IN_SECONDS"],
-        refresh_after_expire=True,
+    # process messages in parallel, apart from the stream
+    executor = KeyedExecutor(
+        max_workers=config["O365_HANDLER_WORKERS"],
+        max_pending=config["O365_HANDLER_MAX_PENDING"],
     )
+    handler = create_handler(subscriber, executor=executor)
+    interval = config["O365_FILTERS_REPORT_INTERVAL_IN_SECONDS"]
+    stop_report = report_filters(handler, interval=interval)
+
+    # start listening for incoming notifications, the messages already queued
+    # being processed once the stream stops
+    try:
+        with executor:
+            subscriber.start_streaming(
+                notification_handler=handler,
+                connection_timeout=config["CONNECTION_TIMEOUT_IN_MINUTES"],
+                keep_alive_interval=config["KEEP_ALIVE_INTERVAL_IN_SECONDS"],
+                refresh_after_expire=True,
+            )
+    finally:
+        stop_report.set()
+        handler.filters.log_report()
 
 
 @cli.command()
 @click.option("--mailbox", "-m", default=None, help="the mailbox to verify")
 @click.option("--days", "-d", default=1, help="number of days to search back")
-def check_for_missing_tickets(mailbox, days):
+@click.option("--workers", "-w", default=None, type=int, help="conversations at once")
+@click.option("--resume", "-r", is_flag=True, help="resume from the last checkpoint")
+def check_for_missing_tickets(mailbox, days, workers, resume):
     """Check for possible tickets that went missing in the last days."""
     subscriber = create_subscriber(email=mailbox)
     handler = create_handler(subscriber)
 
-    daytime = datetime.datetime.now() - datetime.timedelta(days=days)
-    query = (
-        subscriber.new_query().on_attribute("receivedDateTime").greater_equal(daytime)
-    )
+    mailbox = mailbox or current_app.config["MAILBOX"]
+    checkpoint = f"O365.backfill.{mailbox}"
 
-    folders = [sub.resource for sub in subscriber.subscriptions]
-    data = [folder.get_messages(limit=None, query=query) for folder in folders]
-    messages = list(itertools.chain(data))
-    messages.sort(key=lambda msg: msg.received)  # sort by date
+    since = datetime.datetime.now() - datetime.timedelta(days=days)
+    if resume and (value := CheckpointSvc.get(name=checkpoint)):
+        since = datetime.datetime.fromisoformat(value)
+        current_app.logger.info(f"Resuming from checkpoint '{value}'.")
 
-    # process each individual message
-    current_app.logger.info(f"Found {str(len(messages))} messages to process.")
-    for message in messages:
-        handler.process_message(message.object_id)
+    backfill = MailboxBackfill(
+        handler=handler,
+        folders=[sub.resource for sub in subscriber.subscriptions],
+        workers=workers or current_app.config["O365_BACKFILL_WORKERS"],
+        chunk_size=current_app.config["O365_BACKFILL_CHUNK_SIZE"],
+        checkpoint=checkpoint,
+    )
+    stats = backfill.run(since=since)
+
+    current_app.logger.info(
+        f"Backfill done: {stats['processed']} processed, "
+        f"{stats['failed']} failed, {stats['skipped']} skipped."
+    )
+    handler.filters.log_report()
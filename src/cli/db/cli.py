@@ -0,0 +1,29 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from src import migrations
+from src.settings.ctx import db
+
+cli = AppGroup("db", short_help="Manage the database")
+
+
+@cli.command()
+@click.option("--target", "-t", default=None, help="the last migration to apply")
+def upgrade(target):
+    """Apply the pending database migrations."""
+    try:
+        applied = migrations.upgrade(engine=db.engine, target=target)
+    except ValueError as ex:
+        raise click.BadParameter(str(ex), param_hint="--target")
+    if not applied:
+        current_app.logger.info("Database is up to date.")
+
+
+@cli.command()
+def status():
+    """List the database migrations and whether they are applied."""
+    applied = migrations.applied(engine=db.engine)
+    for name, module in migrations.versions():
+        summary = (module.__doc__ or "").strip().splitlines()[0]
+        click.echo(f"[{'x' if name in applied else ' '}] {name}  {summary}")
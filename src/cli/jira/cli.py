@@ -0,0 +1,47 @@
+import time
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from src.services.jira import JiraSvc
+from src.services.mirror import IssueMirrorSvc
+from src.services.sync import TicketSyncSvc
+
+cli = AppGroup("jira", short_help="Handle Jira data")
+
+
+@cli.command()
+@click.option("--batch-size", "-b", default=None, type=int, help="issues per page")
+@click.option("--interval", "-i", default=0, help="seconds between syncs, once if 0")
+def mirror(batch_size, interval):
+    """Sync the issues updated in Jira into the local mirror."""
+    while True:
+        try:
+            IssueMirrorSvc.sync(svc=JiraSvc.instance(), batch_size=batch_size)
+        except Exception:
+            if not interval:
+                raise
+            current_app.logger.exception("Failed to sync the issues mirror.")
+
+        if not interval:
+            return
+        time.sleep(interval)
+
+
+@cli.command()
+@click.option("--batch-size", "-b", default=None, type=int, help="issues per page")
+@click.option("--interval", "-i", default=0, help="seconds between syncs, once if 0")
+def sync(batch_size, interval):
+    """Update or delete the local tickets after the changes made in Jira."""
+    while True:
+        try:
+            TicketSyncSvc.sync(svc=JiraSvc.instance(), batch_size=batch_size)
+        except Exception:
+            if not interval:
+                raise
+            current_app.logger.exception("Failed to sync the tickets.")
+
+        if not interval:
+            return
+        time.sleep(interval)
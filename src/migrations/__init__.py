@@ -0,0 +1,69 @@
+import datetime
+import importlib
+import pkgutil
+import types
+
+import sqlalchemy
+from flask import current_app
+
+from src.migrations import versions as versions_pkg
+from src.models.migration import SchemaMigration
+
+__all__ = ("applied", "pending", "upgrade", "versions")
+
+
+def versions() -> list[tuple[str, types.ModuleType]]:
+    """All the migrations, in the order they apply.
+
+    A migration is a module of ``src.migrations.versions`` with an ``upgrade``
+    function taking the connection to migrate, within a transaction. Databases
+    created before the migrations may already hold some of their changes, which
+    migrations must therefore leave alone.
+    """
+    names = sorted(m.name for m in pkgutil.iter_modules(versions_pkg.__path__))
+    return [
+        (name, importlib.import_module(f"{versions_pkg.__name__}.{name}"))
+        for name in names
+    ]
+
+
+def applied(engine: sqlalchemy.engine.Engine) -> set[str]:
+    """The migrations applied to a database."""
+    SchemaMigration.__table__.create(bind=engine, checkfirst=True)
+    with engine.connect() as connection:
+        query = sqlalchemy.select(SchemaMigration.version)
+        return set(connection.execute(query).scalars())
+
+
+def pending(engine: sqlalchemy.engine.Engine) -> list[tuple[str, types.ModuleType]]:
+    """The migrations not applied to a database yet."""
+    done = applied(engine)
+    return [(name, module) for name, module in versions() if name not in done]
+
+
+def upgrade(engine: sqlalchemy.engine.Engine, target: str = None) -> list[str]:
+    """Apply the pending migrations, each in its own transaction.
+
+    :param engine: the engine of the database to migrate
+    :param target: the last migration to apply, all of them if not given
+    :return: the applied migrations
+    :raises ValueError: if the target is not a known migration
+    """
+    if target is not None and target not in dict(versions()):
+        raise ValueError(f"Unknown migration '{target}'.")
+
+    done = []
+    for name, module in pending(engine):
+        if target is not None and name > target:
+            break
+
+        with engine.begin() as connection:
+            module.upgrade(connection)
+            connection.execute(
+                sqlalchemy.insert(SchemaMigration).values(
+                    version=name, applied_at=datetime.datetime.utcnow()
+                )
+            )
+        current_app.logger.info(f"Applied migration '{name}'.")
+        done.append(name)
+    return done
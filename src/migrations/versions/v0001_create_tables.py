@@ -0,0 +1,60 @@
+"""Create the tables of the schema preceding the migrations.
+
+The tables are defined as they were then rather than taken from the models,
+which keep changing, so that a new database goes through every migration.
+"""
+import sqlalchemy
+
+metadata = sqlalchemy.MetaData()
+
+sqlalchemy.Table(
+    "tickets",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column(
+        "key", sqlalchemy.String, unique=True, nullable=False, index=True
+    ),
+    sqlalchemy.Column("outlook_message_id", sqlalchemy.String, unique=True),
+    sqlalchemy.Column("outlook_conversation_id", sqlalchemy.String, unique=True),
+    sqlalchemy.Column("outlook_messages_id", sqlalchemy.String),
+    sqlalchemy.Column("created_at", sqlalchemy.DateTime),
+    sqlalchemy.Column("updated_at", sqlalchemy.DateTime),
+    sqlalchemy.Column("reporter", sqlalchemy.String, nullable=False),
+)
+
+sqlalchemy.Table(
+    "access_tokens",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column("token_type", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("access_token", sqlalchemy.String, nullable=False, unique=True),
+    sqlalchemy.Column("refresh_token", sqlalchemy.String, nullable=False, unique=True),
+    sqlalchemy.Column("expires_in", sqlalchemy.Integer, nullable=False),
+    sqlalchemy.Column("ext_expires_in", sqlalchemy.Integer, nullable=False),
+    sqlalchemy.Column("expires_at", sqlalchemy.Float, nullable=False),
+)
+
+sqlalchemy.Table(
+    "jobs",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("status", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("progress", sqlalchemy.String),
+    sqlalchemy.Column("payload", sqlalchemy.JSON),
+    sqlalchemy.Column("key", sqlalchemy.String),
+    sqlalchemy.Column("error", sqlalchemy.String),
+    sqlalchemy.Column("created_at", sqlalchemy.DateTime),
+    sqlalchemy.Column("updated_at", sqlalchemy.DateTime),
+)
+
+sqlalchemy.Table(
+    "checkpoints",
+    metadata,
+    sqlalchemy.Column("name", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("value", sqlalchemy.String),
+    sqlalchemy.Column("updated_at", sqlalchemy.DateTime),
+)
+
+
+def upgrade(connection: sqlalchemy.engine.Connection):
+    metadata.create_all(bind=connection, checkfirst=True)
@@ -0,0 +1,76 @@
+"""Move the messages history of tickets into its own table.
+
+The history used to be kept as a comma-joined list in the
+``tickets.outlook_messages_id`` column, which is left in place.
+"""
+import sqlalchemy
+
+metadata = sqlalchemy.MetaData()
+
+ticket_messages = sqlalchemy.Table(
+    "ticket_messages",
+    metadata,
+    sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True),
+    sqlalchemy.Column(
+        "ticket_id",
+        sqlalchemy.Integer,
+        sqlalchemy.ForeignKey("tickets.id", ondelete="CASCADE"),
+        nullable=False,
+    ),
+    sqlalchemy.Column("message_id", sqlalchemy.String, nullable=False, index=True),
+    sqlalchemy.Column("direction", sqlalchemy.String),
+    sqlalchemy.Column("created_at", sqlalchemy.DateTime),
+    sqlalchemy.UniqueConstraint("ticket_id", "message_id"),
+    sqlalchemy.Index(
+        "ix_ticket_messages_ticket_id_created_at", "ticket_id", "created_at"
+    ),
+)
+
+# the referred table, as created by the first migration
+sqlalchemy.Table(
+    "tickets", metadata, sqlalchemy.Column("id", sqlalchemy.Integer, primary_key=True)
+)
+
+INBOUND = "inbound"
+
+
+def upgrade(connection: sqlalchemy.engine.Connection):
+    ticket_messages.create(bind=connection, checkfirst=True)
+
+    columns = sqlalchemy.inspect(connection).get_columns("tickets")
+    if "outlook_messages_id" not in (column["name"] for column in columns):
+        return
+
+    # the legacy column is no longer mapped, hence the plain query
+    query = sqlalchemy.text(
+        "SELECT id, outlook_messages_id, updated_at FROM tickets "
+        "WHERE outlook_messages_id IS NOT NULL ORDER BY id"
+    ).columns(updated_at=sqlalchemy.DateTime)
+
+    existing = set(
+        connection.execute(
+            sqlalchemy.select(ticket_messages.c.ticket_id, ticket_messages.c.message_id)
+        ).all()
+    )
+
+    rows = []
+    for ticket in connection.execute(query):
+        message_ids = [m for m in ticket.outlook_messages_id.split(",") if m]
+        for position, message_id in enumerate(dict.fromkeys(message_ids)):
+            if (ticket.id, message_id) in existing:
+                continue
+
+            # the history starts with the message the ticket was created from,
+            # the direction of the next ones is not known
+            direction = INBOUND if position == 0 else None
+            rows.append(
+                {
+                    "ticket_id": ticket.id,
+                    "message_id": message_id,
+                    "direction": direction,
+                    "created_at": ticket.updated_at,
+                }
+            )
+
+    if rows:
+        connection.execute(sqlalchemy.insert(ticket_messages), rows)
@@ -0,0 +1,24 @@
+"""Index the tickets by reporter and by creation and update times.
+
+Tickets are searched by reporter, listed by reporter and creation time, and
+walked through by creation or update time when backfilling or syncing.
+"""
+import sqlalchemy
+
+metadata = sqlalchemy.MetaData()
+
+tickets = sqlalchemy.Table(
+    "tickets",
+    metadata,
+    sqlalchemy.Column("reporter", sqlalchemy.String),
+    sqlalchemy.Column("created_at", sqlalchemy.DateTime),
+    sqlalchemy.Column("updated_at", sqlalchemy.DateTime),
+    sqlalchemy.Index("ix_tickets_reporter_created_at", "reporter", "created_at"),
+    sqlalchemy.Index("ix_tickets_created_at", "created_at"),
+    sqlalchemy.Index("ix_tickets_updated_at", "updated_at"),
+)
+
+
+def upgrade(connection: sqlalchemy.engine.Connection):
+    for index in tickets.indexes:
+        index.create(bind=connection, checkfirst=True)
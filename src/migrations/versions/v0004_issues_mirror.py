@@ -0,0 +1,25 @@
+"""Create the local mirror of the Jira issues."""
+import sqlalchemy
+
+metadata = sqlalchemy.MetaData()
+
+issues_mirror = sqlalchemy.Table(
+    "issues_mirror",
+    metadata,
+    sqlalchemy.Column("key", sqlalchemy.String, primary_key=True),
+    sqlalchemy.Column("id", sqlalchemy.String, nullable=False),
+    sqlalchemy.Column("project", sqlalchemy.String, index=True),
+    sqlalchemy.Column("summary", sqlalchemy.String),
+    sqlalchemy.Column("status", sqlalchemy.String),
+    sqlalchemy.Column("assignee", sqlalchemy.String),
+    sqlalchemy.Column("labels", sqlalchemy.JSON),
+    sqlalchemy.Column("fields", sqlalchemy.JSON, nullable=False),
+    sqlalchemy.Column("rendered_fields", sqlalchemy.JSON),
+    sqlalchemy.Column("created", sqlalchemy.DateTime, index=True),
+    sqlalchemy.Column("updated", sqlalchemy.DateTime, index=True),
+    sqlalchemy.Column("synced_at", sqlalchemy.DateTime),
+)
+
+
+def upgrade(connection: sqlalchemy.engine.Connection):
+    issues_mirror.create(bind=connection, checkfirst=True)
@@ -0,0 +1,14 @@
+import datetime
+
+from src.settings.ctx import db
+
+
+class Checkpoint(db.Model):
+    __tablename__ = "checkpoints"
+
+    name = db.Column(db.String, primary_key=True)
+    value = db.Column(db.String)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __str__(self):
+        return f"<Checkpoint '{self.name}'>"
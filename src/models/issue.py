@@ -0,0 +1,33 @@
+import datetime
+
+from src.settings.ctx import db
+
+
+class MirroredIssue(db.Model):
+    """A local copy of a Jira issue, holding the fields tickets are served with."""
+
+    __tablename__ = "issues_mirror"
+
+    key = db.Column(db.String, primary_key=True)
+    id = db.Column(db.String, nullable=False)
+    project = db.Column(db.String, index=True)
+    summary = db.Column(db.String)
+    status = db.Column(db.String)
+    assignee = db.Column(db.String)
+    labels = db.Column(db.JSON, default=list)
+    fields = db.Column(db.JSON, nullable=False)
+    rendered_fields = db.Column(db.JSON)
+    created = db.Column(db.DateTime, index=True)
+    updated = db.Column(db.DateTime, index=True)
+    synced_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    @property
+    def raw(self) -> dict:
+        """The issue as returned by a Jira search."""
+        raw = {"id": self.id, "key": self.key, "fields": dict(self.fields)}
+        if self.rendered_fields is not None:
+            raw["renderedFields"] = dict(self.rendered_fields)
+        return raw
+
+    def __str__(self):
+        return f"<MirroredIssue '{self.key}'>"
@@ -1,8 +1,21 @@
+import dataclasses
+import typing
+
+import jira.resources
+
+
 class Board:
-    def __init__(self, key: str = None, raw: dict = None, is_default: bool = False):
+    def __init__(
+        self,
+        key: str = None,
+        raw: dict = None,
+        is_default: bool = False,
+        filter_id: str = None,
+    ):
         self.key = key
         self.raw = raw
         self.is_default = is_default
+        self.filter_id = filter_id
         self.id = raw["id"]
         self.name = raw["name"]
         self.project = raw["location"]["projectKey"]
@@ -11,6 +24,17 @@ class Board:
     def filter(self):
         from src.services.jira import JiraSvc
 
-        svc = JiraSvc()
-        config = svc.board_configuration(board_id=self.id)
-        return svc.filter(id=config["permission"]["id"])
+        return JiraSvc.instance().filter(id=self.filter_id)
+
+
+@dataclasses.dataclass
+class AttachmentUpload:
+    """The outcome of uploading a single attachment."""
+
+    filename: str
+    attachment: typing.Optional[jira.resources.Attachment] = None
+    error: typing.Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
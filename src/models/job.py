@@ -0,0 +1,20 @@
+import datetime
+import uuid
+
+from src.settings.ctx import db
+
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+
+    id = db.Column(db.String, primary_key=True, default=lambda: uuid.uuid4().hex)
+    status = db.Column(db.String, nullable=False, default="pending")
+    progress = db.Column(db.String)
+    payload = db.Column(db.JSON)
+    key = db.Column(db.String)
+    error = db.Column(db.String)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __str__(self):
+        return f"<Job '{self.id}'>"
@@ -0,0 +1,13 @@
+import datetime
+
+from src.settings.ctx import db
+
+
+class SchemaMigration(db.Model):
+    __tablename__ = "schema_migrations"
+
+    version = db.Column(db.String, primary_key=True)
+    applied_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    def __str__(self):
+        return f"<SchemaMigration '{self.version}'>"
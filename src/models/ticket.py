@@ -5,15 +5,53 @@ from src.settings.ctx import db
 
 class Ticket(db.Model):
     __tablename__ = "tickets"
+    __table_args__ = (
+        db.Index("ix_tickets_reporter_created_at", "reporter", "created_at"),
+        db.Index("ix_tickets_created_at", "created_at"),
+        db.Index("ix_tickets_updated_at", "updated_at"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     key = db.Column(db.String, unique=True, nullable=False, index=True)
     outlook_message_id = db.Column(db.String, unique=True)
     outlook_conversation_id = db.Column(db.String, unique=True)
-    outlook_messages_id = db.Column(db.String)
     created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
     reporter = db.Column(db.String, nullable=False)
 
+    messages = db.relationship(
+        "TicketMessage",
+        back_populates="ticket",
+        lazy="dynamic",
+        cascade="all, delete-orphan",
+    )
+
     def __str__(self):
         return f"<Ticket '{self.key}'>"
+
+
+class TicketMessage(db.Model):
+    """A message of the conversation of a ticket, in the order it was added."""
+
+    __tablename__ = "ticket_messages"
+    __table_args__ = (
+        db.UniqueConstraint("ticket_id", "message_id"),
+        db.Index("ix_ticket_messages_ticket_id_created_at", "ticket_id", "created_at"),
+    )
+
+    # directions of a message, from the mailbox standpoint
+    INBOUND = "inbound"
+    OUTBOUND = "outbound"
+
+    id = db.Column(db.Integer, primary_key=True)
+    ticket_id = db.Column(
+        db.Integer, db.ForeignKey("tickets.id", ondelete="CASCADE"), nullable=False
+    )
+    message_id = db.Column(db.String, nullable=False, index=True)
+    direction = db.Column(db.String)
+    created_at = db.Column(db.DateTime, default=datetime.datetime.utcnow)
+
+    ticket = db.relationship("Ticket", back_populates="messages")
+
+    def __str__(self):
+        return f"<TicketMessage '{self.message_id}'>"
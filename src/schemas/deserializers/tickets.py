@@ -1,6 +1,7 @@
 from flask import current_app
 from marshmallow import Schema, fields, pre_load, validate, validates_schema
 
+from src.schemas.serializers.jira.Issue import IssueSchema
 from src.services.jira import JiraSvc
 
 
@@ -40,7 +41,7 @@ class CreateTicketSchema(Schema):
 
     @validates_schema
     def lazy_validator(self, data, **_):
-        svc = JiraSvc()
+        svc = JiraSvc.instance()
         validate.OneOf(choices=[b.key for b in svc.boards()])(data["board"])
         validate.OneOf(choices=svc.allowed_categories())(data["category"])
         return True
@@ -106,18 +107,30 @@ class TicketSearchCriteriaSchema(Schema):
         data_key="fields",
         metadata={"description": "additional fields to include in the results"},
     )
+    only = fields.List(
+        fields.String(validate=validate.OneOf(list(IssueSchema._declared_fields))),
+        metadata={"description": "the only fields to include in the results"},
+    )
     limit = fields.Integer(
-        load_default=20, metadata={"description": "tickets user has subscribed to"}
+        load_default=20,
+        validate=validate.Range(min=1, max=100),
+        metadata={"description": "tickets user has subscribed to"},
     )
     sort = fields.String(
         validate=validate.OneOf(["created"]),
         load_default="created",
         metadata={"description": "sort tickets by"},
     )
+    cursor = fields.String(
+        metadata={"description": "the page to get, from the link to the next page"}
+    )
 
     @validates_schema
-    def lazy_validator(self, data):
-        validate.OneOf(choices=(b.key for b in JiraSvc.boards()))(data["boards"])
-        validate.OneOf(choices=JiraSvc.allowed_fields())(data["fields"])
-        validate.OneOf(choices=JiraSvc.allowed_categories())(data["category"])
+    def lazy_validator(self, data, **_):
+        svc = JiraSvc.instance()
+        boards = [b.key for b in svc.boards()]
+        validate.ContainsOnly(choices=boards)(data.get("boards", []))
+        validate.ContainsOnly(choices=svc.allowed_fields())(data.get("fields_", []))
+        categories = svc.allowed_categories()
+        validate.ContainsOnly(choices=categories)(data.get("categories", []))
         return True
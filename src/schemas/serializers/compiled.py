@@ -0,0 +1,155 @@
+import functools
+import typing
+
+from marshmallow import Schema, fields, missing, utils
+from marshmallow.decorators import POST_DUMP, PRE_DUMP
+
+__all__ = ("CompiledSchema", "compile_schema")
+
+
+class CompiledSchema:
+    """Dump objects as a marshmallow schema would, through a plan made once.
+
+    The plan holds, for every field to dump, the key it is dumped as, how its
+    value is looked up, and how the value is converted, nested schemas being
+    compiled in turn. This skips the generic machinery marshmallow goes
+    through for every field of every object.
+
+    Strings, integers, nested schemas and lists of them are compiled, any
+    other field is dumped by marshmallow, as is the whole schema when it has
+    dump hooks or a custom attribute getter, so the output stays identical.
+
+    :param schema: the schema to compile, along with its ``only`` and ``exclude``
+    """
+
+    def __init__(self, schema: Schema):
+        self.schema = schema
+        self.many = schema.many
+        self.fallback = (
+            schema._hooks[PRE_DUMP]
+            or schema._hooks[POST_DUMP]
+            or type(schema).get_attribute is not Schema.get_attribute
+        )
+        self.plan = [] if self.fallback else self.make_plan(schema)
+
+    @classmethod
+    def make_plan(cls, schema: Schema) -> list[tuple]:
+        """The dumped key, getter and converter of each field of a schema."""
+        plan = []
+        for name, field in schema.dump_fields.items():
+            key = name if field.data_key is None else field.data_key
+            convert = cls.converter(field)
+            if convert is None or field.dump_default is not missing:
+                plan.append((key, cls.serializer(schema, name, field), None))
+            else:
+                plan.append((key, cls.getter(field.attribute or name), convert))
+        return plan
+
+    @classmethod
+    def converter(cls, field: fields.Field) -> typing.Optional[typing.Callable]:
+        """The conversion of a value of a field, ``None`` if not compiled."""
+        if type(field) in (fields.String, fields.Url, fields.Email):
+            ensure_text_type = utils.ensure_text_type
+
+            def convert(value):
+                if type(value) is str:
+                    return value
+                return None if value is None else ensure_text_type(value)
+
+        elif type(field) is fields.Integer and not field.as_string:
+
+            def convert(value):
+                return None if value is None else int(value)
+
+        elif type(field) is fields.Nested and isinstance(field.nested, type):
+            nested = CompiledSchema(field.schema)
+            many = field.schema.many or field.many
+
+            def convert(value):
+                return None if value is None else nested.dump(value, many=many)
+
+        elif type(field) is fields.List:
+            inner = cls.converter(field.inner)
+            if inner is None:
+                return None
+
+            def convert(value):
+                return None if value is None else [inner(each) for each in value]
+
+        else:
+            return None
+        return convert
+
+    @staticmethod
+    def getter(attribute: str) -> typing.Callable:
+        """The lookup of an attribute, dotted for nested ones, as marshmallow's.
+
+        Dictionaries are looked up directly, unless the key is also the name of
+        a ``dict`` attribute, which marshmallow would fall back to.
+        """
+        keys = attribute.split(".")
+        get_value = utils.get_value
+        if any(hasattr(dict, key) for key in keys):
+            return lambda obj: get_value(obj, attribute)
+
+        def get(obj):
+            for key in keys:
+                if type(obj) is dict:
+                    obj = obj.get(key, missing)
+                else:
+                    obj = get_value(obj, key)
+                if obj is missing:
+                    return missing
+            return obj
+
+        return get
+
+    @staticmethod
+    def serializer(schema: Schema, name: str, field: fields.Field) -> typing.Callable:
+        """The dump of a field left to marshmallow."""
+        return lambda obj: field.serialize(name, obj, accessor=schema.get_attribute)
+
+    def dump(self, obj, many: bool = None):
+        """Serialize an object, or a collection of them, see ``Schema.dump``."""
+        many = self.many if many is None else bool(many)
+        if self.fallback:
+            return self.schema.dump(obj, many=many)
+        if many and obj is not None:
+            return [self.dump_one(each) for each in obj]
+        return self.dump_one(obj)
+
+    def dump_one(self, obj) -> dict:
+        result = self.schema.dict_class()
+        for key, get, convert in self.plan:
+            value = get(obj)
+            if value is missing:
+                continue
+            result[key] = value if convert is None else convert(value)
+        return result
+
+
+def compile_schema(
+    schema: typing.Type[Schema], only: typing.Iterable[str] = None
+) -> CompiledSchema:
+    """Compile a schema, once for each set of fields.
+
+    Fields are dumped in the order the schema declares them, whatever the
+    order or repeats of ``only``, which therefore make for the same plan.
+
+    :param schema: the schema class
+    :param only: the fields to dump, all of them if not given
+    """
+    if only:
+        declared = list(schema._declared_fields)
+        position = {name: i for i, name in enumerate(declared)}
+        only = tuple(
+            sorted(set(only), key=lambda n: (position.get(n, len(declared)), n))
+        )
+    return _compile_schema(schema, only=only or None)
+
+
+@functools.lru_cache(maxsize=64)
+def _compile_schema(
+    schema: typing.Type[Schema], only: typing.Optional[tuple[str, ...]]
+) -> CompiledSchema:
+    return CompiledSchema(schema(only=only))
@@ -1,3 +1,5 @@
+import typing
+
 from marshmallow import Schema, fields
 
 from src.schemas.serializers.jira.Attachment import AttachmentSchema
@@ -26,3 +28,31 @@ class IssueSchema(Schema):
     attachments = fields.List(fields.Nested(AttachmentSchema), attribute="attachment")
     watchers = fields.List(fields.Nested(UserSchema))
     rendered = fields.Nested(RenderedSchema)
+
+    # fields taken from the issue itself, the local ticket or other requests,
+    # rather than from the Jira fields of the issue
+    NON_JIRA_FIELDS = ("id", "key", "url", "reporter", "watchers")
+
+    # Jira only renders the fields that are fetched along
+    RENDERED_FIELDS = ("comment", "description")
+
+    @classmethod
+    def jira_fields(cls, only: typing.Iterable[str] = None) -> list[str]:
+        """The Jira fields of an issue needed to dump the given schema fields.
+
+        :param only: the schema fields, all of them if not given
+        """
+        declared = cls._declared_fields
+        names = [
+            name
+            for name in (declared if only is None else only)
+            if name not in cls.NON_JIRA_FIELDS
+        ]
+        jira_fields = {
+            (declared[name].attribute or name).split(".")[0]
+            for name in names
+            if name != "rendered"
+        }
+        if "rendered" in names:
+            jira_fields.update(cls.RENDERED_FIELDS)
+        return sorted(jira_fields)
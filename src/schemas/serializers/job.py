@@ -0,0 +1,11 @@
+from marshmallow import Schema, fields
+
+
+class JobSchema(Schema):
+    id = fields.String()
+    status = fields.String(metadata={"enum": ["pending", "running", "done", "failed"]})
+    progress = fields.String(metadata={"description": "the current job stage"})
+    key = fields.String(metadata={"description": "the key of the created ticket"})
+    error = fields.String()
+    created = fields.DateTime(attribute="created_at")
+    updated = fields.DateTime(attribute="updated_at")
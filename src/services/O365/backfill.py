@@ -0,0 +1,150 @@
+import collections
+import datetime
+import heapq
+import itertools
+import threading
+import typing
+
+import O365
+import O365.mailbox
+from flask import current_app
+from O365_notifications.base import O365NotificationHandler
+
+from src.services.checkpoint import CheckpointSvc
+from src.services.ticket import TicketSvc
+from src.utils.executors import KeyedExecutor
+
+
+class MailboxBackfill:
+    """Process the messages received by a mailbox since a given time.
+
+    Folders are paged through lazily and merged by received time, messages
+    already known to a local ticket are skipped without being fetched, and
+    conversations are processed in parallel while the messages of each one
+    keep their order.
+
+    A checkpoint is saved as the run goes, holding the received time of the
+    oldest message not processed yet, so that an interrupted run can resume
+    from there.
+
+    :param handler: the handler messages are processed with
+    :param folders: the mailbox folders to go through
+    :param workers: the number of conversations processed at once
+    :param chunk_size: the number of messages per page, dedup query and
+                       progress report
+    :param checkpoint: the name of the checkpoint to save, none if not given
+    """
+
+    def __init__(
+        self,
+        handler: O365NotificationHandler,
+        folders: list[O365.mailbox.Folder],
+        workers: int = 4,
+        chunk_size: int = 50,
+        checkpoint: str = None,
+    ):
+        self.handler = handler
+        self.folders = folders
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self.checkpoint = checkpoint
+
+        self.stats = collections.Counter()
+        self._lock = threading.Lock()
+        # messages dispatched but not processed yet, in received order
+        self._pending: dict[str, datetime.datetime] = collections.OrderedDict()
+        self._last_received: typing.Optional[datetime.datetime] = None
+
+    def messages(self, since: datetime.datetime) -> typing.Iterator[O365.Message]:
+        """Lazily iterate over the messages of all folders by received time."""
+        pages = []
+        for folder in self.folders:
+            query = (
+                folder.new_query()
+                .select("id", "conversationId", "receivedDateTime")
+                .on_attribute("receivedDateTime")
+                .greater_equal(since)
+                .order_by("receivedDateTime", ascending=True)
+            )
+            pages.append(
+                folder.get_messages(limit=None, query=query, batch=self.chunk_size)
+            )
+        return heapq.merge(*pages, key=lambda msg: msg.received)
+
+    def unprocessed(
+        self, messages: typing.Iterable[O365.Message]
+    ) -> typing.Iterator[O365.Message]:
+        """Skip the messages already in the history of a local ticket.
+
+        Messages are checked a chunk at a time, with one query per chunk.
+        """
+        messages = iter(messages)
+        while chunk := list(itertools.islice(messages, self.chunk_size)):
+            known = TicketSvc.known_messages(msg.object_id for msg in chunk)
+            for message in chunk:
+                if message.object_id in known:
+                    with self._lock:
+                        self.stats["skipped"] += 1
+                else:
+                    yield message
+
+    def run(self, since: datetime.datetime) -> collections.Counter:
+        """Process every message received since the given time.
+
+        :param since: the received time to start from
+        :return: the number of processed, failed and skipped messages
+        """
+        app = current_app._get_current_object()
+        started_at = datetime.datetime.now(tz=datetime.timezone.utc)
+
+        def process(message):
+            with app.app_context():
+                try:
+                    self.handler.process_message(message.object_id)
+                except Exception:
+                    app.logger.exception(
+                        f"Failed to process message '{message.object_id}'."
+                    )
+                    # failed messages are kept pending to hold the checkpoint back
+                    with self._lock:
+                        self.stats["failed"] += 1
+                else:
+                    with self._lock:
+                        self.stats["processed"] += 1
+                        self._pending.pop(message.object_id, None)
+
+        executor = KeyedExecutor(
+            max_workers=self.workers, max_pending=self.workers * self.chunk_size
+        )
+        with executor:
+            messages = self.unprocessed(self.messages(since=since))
+            for count, message in enumerate(messages, start=1):
+                with self._lock:
+                    self._pending[message.object_id] = message.received
+                    self._last_received = message.received
+                executor.submit(message.conversation_id, process, message)
+
+                if count % self.chunk_size == 0:
+                    self.report()
+
+        # once all is processed, the next run may start from this one
+        with self._lock:
+            self._last_received = started_at
+        self.report()
+        return self.stats
+
+    def watermark(self) -> typing.Optional[datetime.datetime]:
+        """The received time every message before which was processed."""
+        with self._lock:
+            return next(iter(self._pending.values()), self._last_received)
+
+    def report(self):
+        """Log the run progress and save its checkpoint."""
+        watermark = self.watermark()
+        current_app.logger.info(
+            f"Backfill progress: {self.stats['processed']} processed, "
+            f"{self.stats['failed']} failed, {self.stats['skipped']} skipped "
+            f"(up to {watermark.isoformat() if watermark else '-'})."
+        )
+        if self.checkpoint and watermark:
+            CheckpointSvc.set(name=self.checkpoint, value=watermark.isoformat())
@@ -17,6 +17,10 @@ class JiraCommentNotificationFilter(OutlookMessageFilter):
     recipient gets notified whenever a new comment has been added to the ticket.
     """
 
+    # messages of other senders are let through on a pure check, and comments
+    # must be relayed before the sender domain is checked against the whitelist
+    cost = 0
+
     def __init__(self, folder: O365.mailbox.Folder):
         self.folder = folder
 
@@ -25,10 +29,10 @@ class JiraCommentNotificationFilter(OutlookMessageFilter):
             return None
 
         if message.sender.address.split("@")[1] == "automation.atlassian.com":
-            svc = JiraSvc()
+            svc = JiraSvc.instance()
 
             # load message json payload
-            payload = utils.message_json(message)
+            payload = message.json
 
             model = TicketSvc.find_one(key=payload["ticket"], _model=True)
             if not model:
@@ -36,7 +40,7 @@ class JiraCommentNotificationFilter(OutlookMessageFilter):
                 return None
 
             # locate last lent message to reply on
-            last_message_id = model.outlook_messages_id.split(",")[-1]
+            last_message_id = TicketSvc.last_message(ticket_id=model.id).message_id
             try:
                 last_message = self.folder.get_message(object_id=last_message_id)
             except requests.exceptions.HTTPError as e:
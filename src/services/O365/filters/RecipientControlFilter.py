@@ -4,12 +4,13 @@ import itertools
 from flask import current_app
 
 from src.services.O365.filters.base import OutlookMessageFilter
-from src.services.ticket import TicketSvc
 
 
 class RecipientControlFilter(OutlookMessageFilter):
     """Filter for message validating its recipients"""
 
+    cost = 2
+
     def __init__(self, email, ignore: list[O365.mailbox.Folder] = ()):
         self.email = email
         self.ignore = ignore
@@ -37,8 +38,7 @@ class RecipientControlFilter(OutlookMessageFilter):
             return None
 
         # check for existing ticket
-        cid = message.conversation_id
-        existing_ticket = TicketSvc.find_one(outlook_conversation_id=cid, _model=True)
+        existing_ticket = message.context.ticket
 
         if not existing_ticket:
             # exclude if new message initiated by the recipient
@@ -6,6 +6,8 @@ from src.services.O365.filters.base import OutlookMessageFilter
 class SenderEmailBlacklistFilter(OutlookMessageFilter):
     """Filter for message whose sender email is not blacklisted"""
 
+    cost = 0
+
     def __init__(self, blacklist):
         self.blacklist = blacklist
 
@@ -6,6 +6,8 @@ from src.services.O365.filters.base import OutlookMessageFilter
 class SenderEmailDomainWhitelistedFilter(OutlookMessageFilter):
     """Filter for message whose sender email domain is whitelisted"""
 
+    cost = 0
+
     def __init__(self, whitelisted_domains):
         self.whitelisted_domains = whitelisted_domains
 
@@ -1,3 +1,4 @@
+from .chain import FilterChain
 from .JiraCommentNotificationFilter import JiraCommentNotificationFilter
 from .RecipientControlFilter import RecipientControlFilter
 from .SenderEmailBlacklistFilter import SenderEmailBlacklistFilter
@@ -5,6 +6,7 @@ from .SenderEmailDomainWhitelistFilter import SenderEmailDomainWhitelistedFilter
 from .ValidateMetadataFilter import ValidateMetadataFilter
 
 __all__ = [
+    FilterChain,
     JiraCommentNotificationFilter,
     RecipientControlFilter,
     SenderEmailBlacklistFilter,
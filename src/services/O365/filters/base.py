@@ -2,6 +2,10 @@ from abc import ABC, abstractmethod
 
 
 class Filter(ABC):
+    # relative cost of applying the filter, cheaper filters are applied first:
+    # 0 for pure checks, 1 for checks parsing the message, 2 for I/O bound checks
+    cost: int = 0
+
     @abstractmethod
     def apply(self, message):
         raise NotImplementedError("Subclasses must implement this method.")
@@ -0,0 +1,67 @@
+import dataclasses
+import threading
+import time
+
+from flask import current_app
+
+from src.services.O365.filters.base import OutlookMessageFilter
+
+
+@dataclasses.dataclass
+class FilterStats:
+    calls: int = 0
+    rejections: int = 0
+    seconds: float = 0
+
+
+class FilterChain(OutlookMessageFilter):
+    """Filter applying several filters in turn, by increasing cost.
+
+    The chain stops at the first filter rejecting the message, so that the
+    expensive filters only see messages which passed the cheap ones. Filters
+    of the same cost keep the order they are given in.
+
+    :param filters: the filters a message must pass
+    """
+
+    def __init__(self, filters: list[OutlookMessageFilter] = ()):
+        self.filters = sorted(filters, key=lambda f: f.cost)
+        self.stats = {type(f).__name__: FilterStats() for f in self.filters}
+        self._lock = threading.Lock()
+
+    def apply(self, message):
+        if not message:
+            return None
+
+        for f in self.filters:
+            name = type(f).__name__
+            start = time.perf_counter()
+            try:
+                passed = f.apply(message)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.stats[name].calls += 1
+                    self.stats[name].seconds += elapsed
+
+            if not passed:
+                with self._lock:
+                    self.stats[name].rejections += 1
+                current_app.logger.debug(
+                    f"Message rejected by '{name}' in {elapsed * 1000:.1f}ms."
+                )
+                return None
+        return message
+
+    def report(self) -> dict[str, dict]:
+        """The number of calls, rejections and the time spent per filter."""
+        with self._lock:
+            return {k: dataclasses.asdict(v) for k, v in self.stats.items()}
+
+    def log_report(self):
+        """Log the number of calls, rejections and the time spent per filter."""
+        for name, stats in self.report().items():
+            current_app.logger.info(
+                f"Filter '{name}': {stats['calls']} calls, "
+                f"{stats['rejections']} rejections, {stats['seconds']:.3f}s."
+            )
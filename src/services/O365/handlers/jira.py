@@ -1,6 +1,7 @@
-import datetime
+import concurrent.futures
 import itertools
 import json
+import typing
 
 import mistune
 import O365
@@ -10,9 +11,12 @@ from flask import current_app
 from O365_notifications.base import O365Notification, O365NotificationHandler
 from O365_notifications.constants import O365EventType, O365Namespace
 
-from src.models.ticket import Ticket
+from src.models.ticket import Ticket, TicketMessage
 from src.services.O365.filters.base import OutlookMessageFilter
+from src.services.O365.filters.chain import FilterChain
+from src.services.O365.message import ParsedMessage
 from src.services.ticket import TicketSvc
+from src.utils.executors import KeyedExecutor
 
 
 class JiraNotificationHandler(O365NotificationHandler):
@@ -21,10 +25,20 @@ class JiraNotificationHandler(O365NotificationHandler):
         parent: O365.utils.ApiComponent,
         namespace: O365Namespace,
         filters: list[OutlookMessageFilter] = (),
+        executor: KeyedExecutor = None,
     ):
+        """
+        :param parent: the O365 component messages are fetched with
+        :param namespace: the O365 notifications namespace
+        :param filters: the filters a message must pass to be processed, applied
+                        by increasing cost until one rejects the message
+        :param executor: the pool messages are processed on, processing them
+                         inline as they are received when not given
+        """
         self.parent = parent
         self.namespace = namespace
-        self.filters = filters
+        self.filters = FilterChain(filters=filters)
+        self.executor = executor
 
     def process(self, notification: O365Notification):
         """A handler that deals with email notifications.
@@ -45,13 +59,43 @@ class JiraNotificationHandler(O365NotificationHandler):
                 notification.resource.type
                 == self.namespace.O365ResourceDataType.MESSAGE
             ):
-                self.process_message(message_id=notification.resource.id)
+                self.dispatch(message_id=notification.resource.id)
+
+    def dispatch(self, message_id) -> typing.Optional[concurrent.futures.Future]:
+        """Hand a message over to the worker pool.
+
+        Messages of different conversations are processed in parallel, while
+        messages of the same conversation are processed in the order they are
+        received, so that a comment never races the creation of its ticket.
+        Messages whose conversation cannot be told are processed on their own.
+        """
+        if not self.executor:
+            return self.process_message(message_id=message_id)
+
+        app = current_app._get_current_object()
+        try:
+            conversation_id = self.get_conversation_id(message_id, parent=self.parent)
+        except Exception as ex:
+            # a failed lookup must not stop the notifications stream
+            msg = f"Failed to get the conversation of message '{message_id}': {ex}"
+            app.logger.warning(msg)
+            conversation_id = None
+
+        def run():
+            with app.app_context():
+                try:
+                    self.process_message(message_id=message_id)
+                except Exception:
+                    app.logger.exception(f"Failed to process message '{message_id}'.")
+
+        return self.executor.submit(conversation_id or message_id, run)
 
     def process_message(self, message_id):
         """Process a message and create/update a ticket."""
         svc = TicketSvc()
 
-        message = self.get_message(message_id, parent=self.parent)
+        # the message is parsed once and shared with the filters
+        message = ParsedMessage(self.get_message(message_id, parent=self.parent))
 
         # watchers list
         ccs = (e.address for e in message.cc)
@@ -72,30 +116,28 @@ class JiraNotificationHandler(O365NotificationHandler):
         )
 
         # skip message processing if message is filtered
-        if any(not e for e in list(map(lambda f: f.apply(message), self.filters))):
+        if not self.filters.apply(message):
             current_app.logger.info(f"Message '{message.subject}' filtered.")
             return
 
         # check for local existing ticket
-        existing_ticket = svc.find_one(
-            outlook_conversation_id=message.conversation_id, _model=True
-        )
+        existing_ticket = message.context.ticket
 
         # add new comment if ticket already exists.
         # create new ticket otherwise.
         if existing_ticket:
 
             # delete local reference if ticket no longer exists in Jira
-            exists = next(iter(svc.find_by(key=existing_ticket.key, limit=1)), None)
-            if not exists:
+            if not message.context.issue_exists(existing_ticket.key):
                 svc.delete(ticket_id=existing_ticket.id)
+                message.context.invalidate()
 
             # only add comment if not added yet
-            if message.object_id not in existing_ticket.outlook_messages_id:
+            if not svc.has_message(existing_ticket.id, message_id=message.object_id):
                 svc.create_comment(
                     issue=existing_ticket,
                     author=message.sender.address,
-                    body=O365.message.bs(message.unique_body, "html.parser").body.text,
+                    body=message.text,
                     watchers=emails,
                     attachments=message.attachments,
                 )
@@ -114,7 +156,7 @@ class JiraNotificationHandler(O365NotificationHandler):
             issue = svc.create(
                 # Jira fields
                 title=message.subject,
-                body=O365.message.bs(message.unique_body, "html.parser").body.text,
+                body=message.text,
                 reporter=message.sender.address,
                 board="support",
                 category="general",
@@ -124,17 +166,19 @@ class JiraNotificationHandler(O365NotificationHandler):
                 # local fields
                 outlook_message_id=message.object_id,
                 outlook_conversation_id=message.conversation_id,
-                outlook_messages_id=message.object_id,
             )
 
-            # get local ticket reference
+            # get local ticket reference, which history starts with the message
             model = svc.find_one(key=issue["key"], _model=True)
+            self.add_message_to_history(message=message, model=model)
 
             # notify ticket reporter about created ticket
             notification = self.notify_reporter(message=message, ticket_key=model.key)
 
             # append message to history
-            self.add_message_to_history(message=notification, model=model)
+            self.add_message_to_history(
+                message=notification, model=model, direction=TicketMessage.OUTBOUND
+            )
 
             current_app.logger.info(f"New ticket created with Jira key '{model.key}'.")
 
@@ -169,6 +213,13 @@ class JiraNotificationHandler(O365NotificationHandler):
             object_id=message_id, query=query, download_attachments=True
         )
 
+    @staticmethod
+    def get_conversation_id(message_id, parent: O365.utils.ApiComponent):
+        """Get the conversation of a message, without fetching the whole message."""
+        folder = O365.mailbox.Folder(parent=parent)
+        query = folder.new_query().select("Id", "ConversationId")
+        return folder.get_message(object_id=message_id, query=query).conversation_id
+
     @classmethod
     def notify_reporter(cls, *, message: O365.Message, ticket_key: str):
         # creating notification message to be sent to all recipients
@@ -190,15 +241,13 @@ class JiraNotificationHandler(O365NotificationHandler):
         return reply
 
     @staticmethod
-    def add_message_to_history(message: O365.Message, model: Ticket):
+    def add_message_to_history(
+        message: O365.Message, model: Ticket, direction: str = TicketMessage.INBOUND
+    ):
         """Add a message to the ticket history."""
-        messages_id = model.outlook_messages_id.split(",")
-        if message.object_id not in messages_id:
-            TicketSvc.update(
-                ticket_id=model.id,
-                outlook_messages_id=",".join(messages_id + [message.object_id]),
-                updated_at=datetime.datetime.utcnow(),
-            )
+        TicketSvc.add_message(
+            ticket_id=model.id, message_id=message.object_id, direction=direction
+        )
 
     @staticmethod
     def create_reply(message: O365.Message, values: dict = None):
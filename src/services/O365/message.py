@@ -0,0 +1,120 @@
+import functools
+import json
+import re
+import typing
+
+import bs4
+import O365
+from flask import current_app
+
+from src.models.ticket import Ticket
+from src.services.ticket import TicketSvc
+from src.utils.cache import MISSING
+
+
+class MessageContext:
+    """The lookups made while a message is processed, made once each.
+
+    Filters and handlers look up the same local ticket and check it against
+    Jira several times over the processing of a message. The context keeps
+    the results for as long as the message is processed.
+
+    :param conversation_id: the conversation of the message
+    """
+
+    def __init__(self, conversation_id: str):
+        self.conversation_id = conversation_id
+        self._ticket = MISSING
+        self._issues: dict[str, bool] = {}
+
+    @property
+    def ticket(self) -> typing.Optional[Ticket]:
+        """The local ticket of the message conversation."""
+        if self._ticket is MISSING:
+            self._ticket = TicketSvc.find_one(
+                outlook_conversation_id=self.conversation_id, _model=True
+            )
+        return self._ticket
+
+    def issue_exists(self, key: str) -> bool:
+        """Whether a ticket is still present in Jira."""
+        if key not in self._issues:
+            issue = TicketSvc.find_one(key=key, mirror=False)
+            self._issues[key] = issue is not None
+        return self._issues[key]
+
+    def invalidate(self):
+        """Drop the lookups made so far, e.g. once a ticket is deleted."""
+        self._ticket = MISSING
+        self._issues.clear()
+
+
+class ParsedMessage:
+    """A message whose HTML is parsed once, when first needed.
+
+    Wraps an O365 message, which attributes remain reachable, so that filters
+    and handlers share the same soups and extracted values instead of each
+    parsing the message again.
+
+    The parser is set by ``O365_HTML_PARSER``, e.g. ``lxml`` when installed.
+
+    :param message: the wrapped O365 message
+    :param parser: the BeautifulSoup parser, from the settings if not given
+    """
+
+    def __init__(self, message: O365.Message, parser: str = None):
+        self.message = message
+        self.parser = parser or current_app.config["O365_HTML_PARSER"]
+
+    def __getattr__(self, name):
+        return getattr(self.message, name)
+
+    def parse(self, markup: str) -> bs4.BeautifulSoup:
+        try:
+            return bs4.BeautifulSoup(markup or "", self.parser)
+        except bs4.FeatureNotFound:
+            current_app.logger.warning(
+                f"HTML parser '{self.parser}' not found, using 'html.parser'."
+            )
+            self.parser = "html.parser"
+            return bs4.BeautifulSoup(markup or "", self.parser)
+
+    @functools.cached_property
+    def body_soup(self) -> typing.Optional[bs4.BeautifulSoup]:
+        """The parsed body, ``None`` if the body is not HTML."""
+        if self.message.body_type.upper() != "HTML":
+            return None
+        return self.parse(self.message.body)
+
+    @functools.cached_property
+    def unique_body_soup(self) -> bs4.BeautifulSoup:
+        """The parsed body, without the previous messages of the conversation."""
+        return self.parse(self.message.unique_body)
+
+    @functools.cached_property
+    def metadata(self) -> set[str]:
+        """The content of the ``meta`` tags of the body head."""
+        soup = self.body_soup
+        if soup is None or soup.head is None:
+            return set()
+        return {meta.get("content") for meta in soup.head.find_all("meta")}
+
+    @functools.cached_property
+    def text(self) -> str:
+        """The unique body as plain text."""
+        soup = self.unique_body_soup
+        return (soup.body or soup).text
+
+    @functools.cached_property
+    def json(self) -> dict:
+        """The JSON payload embedded in the unique body."""
+        data = re.search(r"{.*\s.*}", str(self.unique_body_soup)).group()
+        return json.loads(data)
+
+    @functools.cached_property
+    def context(self) -> MessageContext:
+        """The lookups made while the message is processed."""
+        return MessageContext(conversation_id=self.message.conversation_id)
+
+    def get_body_soup(self) -> typing.Optional[bs4.BeautifulSoup]:
+        return self.body_soup
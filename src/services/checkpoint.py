@@ -0,0 +1,34 @@
+import datetime
+import typing
+
+from flask import current_app
+
+from src.models.checkpoint import Checkpoint
+from src.settings.ctx import db
+
+
+class CheckpointSvc:
+    @staticmethod
+    def get(name) -> typing.Optional[str]:
+        """Get the value of a checkpoint, ``None`` if it was never saved."""
+        checkpoint = db.session.get(Checkpoint, name)
+        return checkpoint.value if checkpoint else None
+
+    @staticmethod
+    def set(name, value: str):
+        """Save the value of a checkpoint, creating it if missing."""
+        checkpoint = db.session.get(Checkpoint, name) or Checkpoint(name=name)
+        checkpoint.value = value
+        checkpoint.updated_at = datetime.datetime.utcnow()
+
+        db.session.add(checkpoint)
+        db.session.commit()
+
+        current_app.logger.debug(f"Saved checkpoint '{name}' at '{value}'.")
+
+    @staticmethod
+    def delete(name):
+        checkpoint = db.session.get(Checkpoint, name)
+        if checkpoint:
+            db.session.delete(checkpoint)
+            db.session.commit()
@@ -1,22 +1,27 @@
-import base64
-import functools
-import io
+import concurrent.futures
+import datetime
+import os
 import re
-import tempfile
+import threading
+import time
 import typing
+import zoneinfo
 
 import jira.resources
 import O365
 import requests
+import requests.adapters
 import werkzeug.datastructures
 from flask import current_app
 from jira import JIRA
 
-from src.models.jira import Board
+from src.models.jira import AttachmentUpload, Board
 from src.models.ticket import Ticket
 from src.settings.env import env
+from src.utils.cache import MISSING, TTLCache
+from src.utils.streams import Base64Reader, SizedReader
 
-__all__ = ("JiraSvc",)
+__all__ = ("JiraSvc", "board_registry", "user_directory", "watchers_cache")
 
 
 class ProxyJIRA(JIRA):
@@ -174,14 +179,160 @@ class JiraMarkdown(ProxyJIRA):
             return None
 
 
+class BoardRegistry:
+    """Process-wide registry of the configured Jira boards.
+
+    Boards are loaded along with their project keys and filter ids, and
+    kept for ``JIRA_BOARDS_TTL_IN_SECONDS`` before being fetched again. For
+    another ``JIRA_BOARDS_STALE_TTL_IN_SECONDS`` the expired boards are still
+    served while they are refreshed in the background, so translating boards
+    into filters never sits in the path of a search.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(ttl=3600)
+
+    @staticmethod
+    def configs() -> tuple[tuple, ...]:
+        """The boards settings as (key, name, is default) entries."""
+
+        def from_config(var):
+            regex = r"^JIRA_|_BOARD$"
+            name = current_app.config[var] if var in current_app.config else env(var)
+            return re.sub(regex, "", var).lower(), name
+
+        default = current_app.config["JIRA_DEFAULT_BOARD"]
+        return tuple(
+            (*from_config(var), var == default)
+            for var in current_app.config["JIRA_BOARDS"]
+        )
+
+    def boards(self, svc: "JiraSvc") -> list[Board]:
+        """Get the configured boards, loading them if needed."""
+        config = current_app.config
+        configs = self.configs()
+        return self._cache.get_or_load(
+            key=(svc.server_url, configs),
+            loader=lambda: self.load(svc, configs),
+            ttl=config["JIRA_BOARDS_TTL_IN_SECONDS"],
+            stale_ttl=config["JIRA_BOARDS_STALE_TTL_IN_SECONDS"],
+        )
+
+    @staticmethod
+    def load(svc: "JiraSvc", configs: tuple[tuple, ...]) -> list[Board]:
+        """Fetch the configured boards from Jira."""
+
+        def make_board(key, name, is_default):
+            boards = JIRA.boards(svc, name=name)
+            board = next((board for board in boards if board.name == name), None)
+            config = svc.board_configuration(board_id=board.id)
+            return Board(
+                key=key,
+                raw=board.raw,
+                is_default=is_default,
+                filter_id=str(config["filter"]["id"]),
+            )
+
+        return [make_board(*config) for config in configs]
+
+    def invalidate(self):
+        """Discard the loaded boards so that they are fetched again."""
+        self._cache.invalidate()
+
+    def warm_up(self, app) -> threading.Thread:
+        """Load the boards in the background, ahead of the first request."""
+
+        def run():
+            with app.app_context():
+                try:
+                    JiraSvc.instance().boards()
+                except Exception as ex:
+                    app.logger.warning(f"Failed to warm up Jira boards: {ex}")
+
+        thread = threading.Thread(target=run, name="jira-boards", daemon=True)
+        thread.start()
+        return thread
+
+
+# the boards shared across the process
+board_registry = BoardRegistry()
+
+
+class UserDirectory:
+    """Process-wide directory translating emails into Jira users.
+
+    Both found users and unknown emails are cached, the latter for a shorter
+    ``JIRA_USERS_NEGATIVE_TTL_IN_SECONDS``, and the directory is bounded to
+    the ``JIRA_USERS_CACHE_SIZE`` most recently used emails.
+    """
+
+    def __init__(self):
+        self._cache = TTLCache(ttl=3600, maxsize=1024)
+
+    def resolve(
+        self, svc: "JiraSvc", emails: list[str]
+    ) -> dict[str, typing.Optional[jira.User]]:
+        """Translate emails into Jira users, ``None`` if there is no such user.
+
+        Emails not yet in the directory are looked up concurrently.
+
+        :param svc: the client to look users up with
+        :param emails: the emails to resolve
+        """
+        config = current_app.config
+        self._cache.maxsize = config["JIRA_USERS_CACHE_SIZE"]
+
+        users = {}
+        for email in emails:
+            users[email] = self._cache.get(email.lower(), MISSING) if email else None
+        missing = [email for email, user in users.items() if user is MISSING]
+
+        if missing:
+            workers = min(len(missing), config["JIRA_MAX_WORKERS"])
+            with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+                found = pool.map(lambda e: self.search(svc, email=e), missing)
+                for email, user in zip(missing, found):
+                    if user:
+                        ttl = config["JIRA_USERS_TTL_IN_SECONDS"]
+                    else:
+                        ttl = config["JIRA_USERS_NEGATIVE_TTL_IN_SECONDS"]
+                    self._cache.set(email.lower(), user, ttl=ttl)
+                    users[email] = user
+        return users
+
+    @staticmethod
+    def search(svc: "JiraSvc", email: str) -> typing.Optional[jira.User]:
+        return next(iter(svc.search_users(query=email, maxResults=1)), None)
+
+    def invalidate(self, email: str = None):
+        """Forget a single email or, when none is given, every email."""
+        if email:
+            self._cache.invalidate(email.lower())
+        else:
+            self._cache.invalidate()
+
+
+# the users shared across the process
+user_directory = UserDirectory()
+
+# the watchers of issues, keyed by issue key and last update
+watchers_cache = TTLCache(ttl=300, maxsize=4096)
+
+
 class JiraSvc(ProxyJIRA):
     """Service to handle Jira operations."""
 
+    # the process-wide clients, see ``JiraSvc.instance``
+    _clients: dict[tuple, "JiraSvc"] = {}
+    _clients_lock = threading.Lock()
+
     def __init__(
         self,
         url=None,
         user=None,
         token=None,
+        pool_size: int = 10,
+        keep_alive: bool = True,
         **kwargs,
     ):
         url = url or current_app.config["ATLASSIAN_URL"]
@@ -193,43 +344,177 @@ class JiraSvc(ProxyJIRA):
             token=token,
             **kwargs,
         )
+        self.mount_pool(pool_size=pool_size, keep_alive=keep_alive)
+
+    @classmethod
+    def instance(cls) -> "JiraSvc":
+        """Get the shared client for the configured Jira account.
+
+        A single client is kept per worker process, so that every service
+        reuses the same connection pool instead of setting up a new session
+        (and TLS handshake) on every call. The key includes the process id
+        so forked workers never share sockets inherited from their parent.
+        """
+        config = current_app.config
+        key = (os.getpid(), config["ATLASSIAN_URL"], config["ATLASSIAN_USER"])
+        with cls._clients_lock:
+            if key not in cls._clients:
+                cls._clients[key] = cls(
+                    pool_size=config["JIRA_POOL_SIZE"],
+                    keep_alive=config["JIRA_POOL_KEEP_ALIVE"],
+                )
+            return cls._clients[key]
+
+    @classmethod
+    def reset(cls):
+        """Close and forget every shared client."""
+        with cls._clients_lock:
+            for client in cls._clients.values():
+                client.close()
+            cls._clients.clear()
+
+    def mount_pool(self, pool_size: int, keep_alive: bool = True):
+        """Mount a connection pool that is safe to share across threads.
+
+        :param pool_size: the max number of connections kept open
+        :param keep_alive: whether connections are reused between requests
+        """
+        adapter = requests.adapters.HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size
+        )
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        if not keep_alive:
+            self._session.headers["Connection"] = "close"
 
-    @functools.cache
     def boards(self) -> list[Board]:
-        def from_config(var):
-            regex = r"^JIRA_|_BOARD$"
-            return {
-                "key": re.sub(regex, "", var).lower(),
-                "name": current_app.config.get(var, env(var)),
-            }
-
-        def make_board(conf):
-            name = conf["name"]
-            boards = super(ProxyJIRA, self).boards(name=name)
-            board = next((board for board in boards if board.name == name), None)
-            default = from_config(current_app.config["JIRA_DEFAULT_BOARD"])
-            return Board(key=conf["key"], raw=board.raw, is_default=(default == conf))
+        return board_registry.boards(svc=self)
 
-        configs = [from_config(var) for var in current_app.config["JIRA_BOARDS"]]
-        return [make_board(config) for config in configs]
+    def resolve_users(self, emails: list[str]) -> dict[str, typing.Optional[jira.User]]:
+        return user_directory.resolve(svc=self, emails=emails)
 
     def create_jql_query(
         self,
         board_keys: list[str] = None,
         **kwargs,
     ):
-        def find_board(key):
-            return next(b for b in self.boards() if b.key == key)
-
         if board_keys:
-            boards = [find_board(key=key) for key in board_keys]
+            boards = {b.key: b for b in self.boards()}
 
             # translate boards into filters
-            configs = [self.board_configuration(board_id=b.id) for b in boards]
-            kwargs["filters"] = [config["filter"]["id"] for config in configs]
+            kwargs["filters"] = [boards[key].filter_id for key in board_keys]
 
         return super().create_jql_query(**kwargs)
 
+    def search_page(
+        self,
+        jql_str: str,
+        token: typing.Union[str, int] = None,
+        batch_size: int = 100,
+        **kwargs,
+    ) -> tuple[jira.client.ResultList, typing.Union[str, int, None]]:
+        """Search a page of issues, along with the token of the next page.
+
+        The token is the position of the next page, or the page token given by
+        Jira Cloud, and ``None`` once on the last page. Jira Cloud is paged by
+        position as well with the versions of the client that predate its
+        enhanced search.
+
+        :param jql_str: the JQL search
+        :param token: the token of the page, the first page if not given
+        :param batch_size: the number of issues per page
+        :param kwargs: other search parameters, e.g. fields and expand
+        """
+        if self._is_cloud and hasattr(self, "enhanced_search_issues"):
+            page = self.enhanced_search_issues(
+                jql_str, nextPageToken=token, maxResults=batch_size, **kwargs
+            )
+            return page, page.nextPageToken or None
+
+        start = token or 0
+        page = self.search_issues(
+            jql_str,
+            startAt=start,
+            maxResults=batch_size,
+            validate_query=False,
+            **kwargs,
+        )
+        start += len(page)
+        return page, start if page and start < page.total else None
+
+    def iter_issues(
+        self, jql_str: str, batch_size: int = 100, **kwargs
+    ) -> typing.Iterator[jira.Issue]:
+        """Lazily iterate over the issues of a search, a page at a time.
+
+        :param jql_str: the JQL search
+        :param batch_size: the number of issues per page
+        :param kwargs: other search parameters, e.g. fields and expand
+        """
+        token = None
+        while True:
+            page, token = self.search_page(
+                jql_str, token=token, batch_size=batch_size, **kwargs
+            )
+            yield from page
+            if token is None:
+                return
+
+    def jql_datetime(self, value: datetime.datetime) -> str:
+        """Format a time for JQL, which reads it in the timezone of the user."""
+        if value.tzinfo is None:
+            value = value.replace(tzinfo=datetime.timezone.utc)
+        timezone = zoneinfo.ZoneInfo(self.myself().get("timeZone") or "UTC")
+        return value.astimezone(timezone).strftime("%Y/%m/%d %H:%M")
+
+    def issues_watchers(self, issues: list[jira.Issue]) -> dict[str, list[dict]]:
+        """Get the watchers of several issues at once.
+
+        Watchers are fetched concurrently and cached for as long as the issue is
+        not updated. Issues whose watchers could not be fetched within
+        ``JIRA_WATCHERS_TIMEOUT_IN_SECONDS`` are left out of the result.
+
+        :param issues: the issues to get watchers for
+        :return: the raw watchers keyed by issue key
+        """
+        config = current_app.config
+
+        def cache_key(issue):
+            return issue.key, issue.raw["fields"].get("updated")
+
+        watchers = {}
+        for issue in issues:
+            cached = watchers_cache.get(cache_key(issue), default=MISSING)
+            if cached is not MISSING:
+                watchers[issue.key] = cached
+        missing = [issue for issue in issues if issue.key not in watchers]
+        if not missing:
+            return watchers
+
+        workers = min(len(missing), config["JIRA_MAX_WORKERS"])
+        pool = concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+        futures = {pool.submit(self.watchers, issue.key): issue for issue in missing}
+        try:
+            done, not_done = concurrent.futures.wait(
+                futures, timeout=config["JIRA_WATCHERS_TIMEOUT_IN_SECONDS"]
+            )
+            for future in done:
+                issue = futures[future]
+                try:
+                    watchers[issue.key] = future.result().raw["watchers"]
+                except (jira.JIRAError, requests.RequestException) as ex:
+                    msg = f"Failed to get watchers of '{issue.key}': {ex}"
+                    current_app.logger.warning(msg)
+                else:
+                    ttl = config["JIRA_WATCHERS_TTL_IN_SECONDS"]
+                    watchers_cache.set(cache_key(issue), watchers[issue.key], ttl=ttl)
+            for future in not_done:
+                msg = f"Timed out getting watchers of '{futures[future].key}'."
+                current_app.logger.warning(msg)
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        return watchers
+
     def add_attachment(
         self,
         issue: typing.Union[jira.Issue, str],
@@ -238,33 +523,99 @@ class JiraSvc(ProxyJIRA):
         ],
         filename: str = None,
     ) -> typing.Optional[jira.resources.Attachment]:
-        """Add attachment considering different types of files."""
-        content = None
+        """Add attachment considering different types of files.
+
+        The content is streamed to Jira as it is read (and decoded, for O365
+        attachments), so it is never held whole in memory nor written to disk.
+        """
+        stream = None
         if isinstance(attachment, werkzeug.datastructures.FileStorage):
             filename = filename or attachment.filename
-            content = attachment.stream.read()
+            stream = SizedReader(attachment.stream)
         elif isinstance(attachment, O365.message.MessageAttachment):
             filename = filename or attachment.name
             if not attachment.content:
                 current_app.logger.warning(f"Attachment '{filename}' is empty")
             else:
-                content = base64.b64decode(attachment.content)
+                stream = Base64Reader(attachment.content)
         else:
             msg = f"'{type(attachment)}' is not a supported attachment type."
             current_app.logger.warning(msg)
 
         # no point on adding empty file
-        if content:
-            file = tempfile.TemporaryFile()
-            file.write(content)
-            file.seek(0)
-            fi = io.FileIO(file.fileno())
+        if stream and stream.len:
             return super().add_attachment(
                 issue=str(issue),
-                attachment=io.BufferedReader(fi),
+                attachment=stream,
                 filename=filename,
             )
 
+    def add_attachments(
+        self,
+        issue: typing.Union[jira.Issue, str],
+        attachments: list,
+    ) -> list[AttachmentUpload]:
+        """Add several attachments at once.
+
+        Attachments are uploaded concurrently, up to ``JIRA_ATTACHMENT_WORKERS``
+        at a time, and each upload is retried on its own up to
+        ``JIRA_ATTACHMENT_RETRIES`` times on transient errors. A failed upload
+        does not affect the others.
+
+        :param issue: the Jira issue
+        :param attachments: the files to attach
+        :return: the outcome of each upload, in the given order
+        """
+        if not attachments:
+            return []
+
+        app = current_app._get_current_object()
+        retries = app.config["JIRA_ATTACHMENT_RETRIES"]
+
+        def upload(attachment):
+            filename = getattr(attachment, "filename", None) or attachment.name
+            if isinstance(attachment, werkzeug.datastructures.FileStorage):
+                # each attempt reads the file from the start, so it must seek
+                attachment = werkzeug.datastructures.FileStorage(
+                    stream=SizedReader(attachment.stream).stream,
+                    filename=attachment.filename,
+                    content_type=attachment.content_type,
+                )
+            with app.app_context():
+                for attempt in range(retries + 1):
+                    if isinstance(attachment, werkzeug.datastructures.FileStorage):
+                        attachment.stream.seek(0)
+                    try:
+                        added = self.add_attachment(issue=issue, attachment=attachment)
+                    except (jira.JIRAError, requests.RequestException) as ex:
+                        if attempt < retries and self.is_transient_error(ex):
+                            time.sleep(2**attempt)
+                            continue
+                        msg = f"Failed to add attachment '{filename}': {ex}"
+                        app.logger.warning(msg)
+                        return AttachmentUpload(filename=filename, error=str(ex))
+                    else:
+                        return AttachmentUpload(filename=filename, attachment=added)
+
+        workers = min(len(attachments), app.config["JIRA_ATTACHMENT_WORKERS"])
+        with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(upload, attachments))
+
+    @staticmethod
+    def is_transient_error(ex: Exception) -> bool:
+        """Whether a failed request may succeed when retried.
+
+        :param ex: the error raised by the request
+        """
+        if isinstance(ex, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if isinstance(ex, jira.JIRAError):
+            # no status code when Jira could not be reached at all
+            status_code = ex.status_code or requests.codes.service_unavailable
+        else:
+            status_code = getattr(ex.response, "status_code", None) or 0
+        return status_code == requests.codes.too_many_requests or status_code >= 500
+
     def add_watchers(
         self, issue: typing.Union[Ticket, str], watchers: list[jira.User] = None
     ):
@@ -311,7 +662,7 @@ class JiraSvc(ProxyJIRA):
 
     @classmethod
     def default_board(cls):
-        return next(b for b in cls().boards() if b.is_default)
+        return next(b for b in cls.instance().boards() if b.is_default)
 
     @staticmethod
     def allowed_categories():
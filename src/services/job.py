@@ -0,0 +1,119 @@
+import concurrent.futures
+import datetime
+import os
+import threading
+import typing
+
+from flask import current_app
+
+from src.models.job import Job
+from src.settings.ctx import db
+
+
+class JobSvc:
+    # the worker pool of the current process, see ``JobSvc.pool``
+    _pool: typing.Optional[tuple[int, concurrent.futures.Executor]] = None
+    _pool_lock = threading.Lock()
+
+    UNFINISHED = ("pending", "running")
+
+    @staticmethod
+    def create(**kwargs) -> Job:
+        job = Job(**kwargs)
+
+        db.session.add(job)
+        db.session.commit()
+
+        current_app.logger.info(f"Created job '{job.id}'.")
+
+        return job
+
+    @classmethod
+    def get(cls, job_id) -> typing.Optional[Job]:
+        job = db.session.get(Job, job_id)
+        if job and job.status in cls.UNFINISHED and job.updated_at < cls.stale_since():
+            cls.fail_stale()
+            db.session.refresh(job)
+        return job
+
+    @staticmethod
+    def stale_since() -> datetime.datetime:
+        """The last update time of the jobs whose worker is considered gone."""
+        seconds = current_app.config["JOBS_STALE_AFTER_IN_SECONDS"]
+        return datetime.datetime.utcnow() - datetime.timedelta(seconds=seconds)
+
+    @classmethod
+    def fail_stale(cls) -> int:
+        """Fail the unfinished jobs left behind by workers that are gone.
+
+        Jobs only run in the process that submitted them, so those left pending
+        or running by a restarted process would otherwise never finish. Jobs of
+        live workers are told apart by being updated recently.
+
+        :return: the number of failed jobs
+        """
+        count = Job.query.filter(
+            Job.status.in_(cls.UNFINISHED), Job.updated_at < cls.stale_since()
+        ).update(
+            {
+                "status": "failed",
+                "error": "The job was interrupted.",
+                "updated_at": datetime.datetime.utcnow(),
+            },
+            synchronize_session=False,
+        )
+        db.session.commit()
+
+        if count:
+            current_app.logger.warning(f"Failed {count} interrupted jobs.")
+        return count
+
+    @classmethod
+    def update(cls, job_id, **kwargs):
+        job = cls.get(job_id=job_id)
+        for key, value in kwargs.items():
+            if hasattr(job, key):
+                setattr(job, key, value)
+        job.updated_at = datetime.datetime.utcnow()
+        db.session.commit()
+
+        current_app.logger.debug(f"Updated job '{job.id}' with: '{kwargs}'.")
+
+    @classmethod
+    def pool(cls) -> concurrent.futures.Executor:
+        """Get the worker pool running the jobs of the current process."""
+        with cls._pool_lock:
+            if cls._pool is None or cls._pool[0] != os.getpid():
+                workers = current_app.config["JOBS_WORKERS"]
+                executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="job"
+                )
+                cls._pool = (os.getpid(), executor)
+            return cls._pool[1]
+
+    @classmethod
+    def submit(cls, job_id, func: typing.Callable) -> concurrent.futures.Future:
+        """Run a job on the worker pool.
+
+        :param job_id: the job to run
+        :param func: the job work, called with a callback taking the current
+                     stage and any other job attributes to report
+        """
+        app = current_app._get_current_object()
+
+        def progress(stage, **kwargs):
+            cls.update(job_id=job_id, progress=stage, **kwargs)
+
+        def run():
+            with app.app_context():
+                cls.update(job_id=job_id, status="running")
+                try:
+                    func(progress)
+                except Exception as ex:
+                    db.session.rollback()
+                    app.logger.exception(f"Job '{job_id}' failed.")
+                    cls.update(job_id=job_id, status="failed", error=str(ex))
+                else:
+                    cls.update(job_id=job_id, status="done", progress=None)
+
+        return cls.pool().submit(run)
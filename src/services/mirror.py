@@ -0,0 +1,183 @@
+import datetime
+import typing
+
+import jira.resources
+import sqlalchemy
+from flask import current_app
+
+from src.models.issue import MirroredIssue
+from src.services.checkpoint import CheckpointSvc
+from src.settings.ctx import db
+
+
+class IssueMirrorSvc:
+    """Local read-through mirror of the Jira issues of tickets.
+
+    The mirror is refreshed by ``sync``, which only fetches the issues updated
+    since the previous sync. Searches are served from it for as long as the
+    last sync is more recent than ``JIRA_MIRROR_MAX_STALENESS_IN_SECONDS``,
+    and go to Jira otherwise.
+    """
+
+    # when the mirror was last synced, and up to which issue update
+    SYNCED_AT = "jira.mirror.synced_at"
+    WATERMARK = "jira.mirror.watermark"
+
+    # the search filters the mirror can apply locally
+    FILTERS = ("boards", "key", "q", "sort", "status", "assignee")
+
+    @classmethod
+    def is_fresh(cls) -> bool:
+        """Whether the mirror may serve searches."""
+        config = current_app.config
+        if not config["JIRA_MIRROR_ENABLED"]:
+            return False
+
+        synced_at = CheckpointSvc.get(name=cls.SYNCED_AT)
+        if not synced_at:
+            return False
+        age = datetime.datetime.utcnow() - datetime.datetime.fromisoformat(synced_at)
+        return age.total_seconds() <= config["JIRA_MIRROR_MAX_STALENESS_IN_SECONDS"]
+
+    @classmethod
+    def supports(cls, filters: dict) -> bool:
+        """Whether a search can be served from the mirror."""
+        return all(k in cls.FILTERS for k, v in filters.items() if v) and cls.is_fresh()
+
+    @classmethod
+    def search(cls, limit: int = 20, **criteria) -> list[MirroredIssue]:
+        """Search the mirror as Jira would for the same filters.
+
+        :param limit: the max number of results
+        :param criteria: the search filters, see ``search_page``
+        """
+        return cls.search_page(limit=limit, **criteria)[0]
+
+    @staticmethod
+    def search_page(
+        limit: int = 20,
+        token: int = None,
+        projects: list[str] = None,
+        key: typing.Union[str, list[str]] = None,
+        labels: list[str] = None,
+        status: str = None,
+        assignee: str = None,
+        summary: str = None,
+        sort: str = None,
+    ) -> tuple[list[MirroredIssue], typing.Optional[int]]:
+        """Search a page of the mirror, along with the token of the next page.
+
+        :param limit: the max number of results
+        :param token: the position of the page, the first page if not given
+        :param projects: the projects of the searched boards
+        :param key: the issue keys
+        :param labels: issues with any of these labels
+        :param status: the status name
+        :param assignee: the assignee email
+        :param summary: the text to find in the summary
+        :param sort: sorting criteria (enum: ['created'])
+        :raise ValueError: if the limit is not positive
+        """
+        if limit < 1:
+            raise ValueError("The limit must be positive.")
+
+        query = MirroredIssue.query
+        if projects is not None:
+            query = query.filter(MirroredIssue.project.in_(projects))
+        if key:
+            keys = key if isinstance(key, list) else [key]
+            query = query.filter(MirroredIssue.key.in_(keys))
+        if status:
+            query = query.filter(
+                sqlalchemy.func.lower(MirroredIssue.status) == status.lower()
+            )
+        if assignee:
+            query = query.filter(MirroredIssue.assignee == assignee)
+        if summary:
+            query = query.filter(MirroredIssue.summary.ilike(f"%{summary}%"))
+        if sort == "created":
+            query = query.order_by(MirroredIssue.created)
+        # a total order, for pages not to overlap
+        query = query.order_by(MirroredIssue.key)
+
+        # labels are kept as JSON, and checked once loaded, hence the token
+        # is the position among the rows matching the other filters
+        position = token or 0
+        issues = []
+        for issue in query.offset(position).yield_per(max(limit, 100)):
+            position += 1
+            if not labels or set(labels) & set(issue.labels or []):
+                issues.append(issue)
+                if len(issues) == limit:
+                    return issues, position
+        return issues, None
+
+    @classmethod
+    def sync(cls, svc, batch_size: int = None) -> int:
+        """Fetch the issues updated since the last sync into the mirror.
+
+        :param svc: the Jira client
+        :param batch_size: the number of issues per page and per commit
+        :return: the number of issues mirrored
+        """
+        config = current_app.config
+        batch_size = batch_size or config["JIRA_MIRROR_BATCH_SIZE"]
+        started_at = datetime.datetime.utcnow()
+
+        jql = svc.create_jql_query(labels=config["JIRA_TICKET_LABELS"])
+        watermark = CheckpointSvc.get(name=cls.WATERMARK)
+        if watermark:
+            since = svc.jql_datetime(datetime.datetime.fromisoformat(watermark))
+            jql = " AND ".join(filter(None, (jql, f'updated >= "{since}"')))
+        jql = f"{jql} ORDER BY updated ASC"
+
+        count = 0
+        latest = None
+        issues = svc.iter_issues(
+            jql, batch_size=batch_size, fields="*navigable", expand="renderedFields"
+        )
+        for issue in issues:
+            mirrored = cls.upsert(issue, synced_at=started_at)
+            if mirrored.updated and (not latest or mirrored.updated > latest):
+                latest = mirrored.updated
+            count += 1
+            if count % batch_size == 0:
+                db.session.commit()
+                CheckpointSvc.set(name=cls.WATERMARK, value=latest.isoformat())
+        db.session.commit()
+
+        if latest:
+            CheckpointSvc.set(name=cls.WATERMARK, value=latest.isoformat())
+        CheckpointSvc.set(name=cls.SYNCED_AT, value=started_at.isoformat())
+
+        current_app.logger.info(f"Mirrored {count} updated issues.")
+        return count
+
+    @staticmethod
+    def upsert(issue: jira.resources.Issue, synced_at: datetime.datetime = None):
+        """Add or refresh an issue in the mirror, without committing."""
+        fields = issue.raw["fields"]
+        mirrored = db.session.get(MirroredIssue, issue.key) or MirroredIssue(
+            key=issue.key
+        )
+        mirrored.id = str(issue.id)
+        mirrored.project = (fields.get("project") or {}).get("key")
+        mirrored.summary = fields.get("summary")
+        mirrored.status = (fields.get("status") or {}).get("name")
+        mirrored.assignee = (fields.get("assignee") or {}).get("emailAddress")
+        mirrored.labels = fields.get("labels") or []
+        mirrored.fields = fields
+        mirrored.rendered_fields = issue.raw.get("renderedFields")
+        mirrored.created = parse_datetime(fields.get("created"))
+        mirrored.updated = parse_datetime(fields.get("updated"))
+        mirrored.synced_at = synced_at or datetime.datetime.utcnow()
+        db.session.add(mirrored)
+        return mirrored
+
+
+def parse_datetime(value: str) -> typing.Optional[datetime.datetime]:
+    """Parse a Jira time into a naive UTC time."""
+    if not value:
+        return None
+    parsed = datetime.datetime.strptime(value, "%Y-%m-%dT%H:%M:%S.%f%z")
+    return parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
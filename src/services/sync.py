@@ -0,0 +1,189 @@
+import collections
+import datetime
+import itertools
+import json
+
+import jira
+import requests
+import sqlalchemy
+from flask import current_app
+
+from src.models.issue import MirroredIssue
+from src.models.ticket import Ticket, TicketMessage
+from src.services.checkpoint import CheckpointSvc
+from src.services.mirror import parse_datetime
+from src.services.ticket import TicketSvc
+from src.settings.ctx import db
+
+
+class TicketSyncSvc:
+    """Reconcile the local tickets with their Jira issues.
+
+    Changes are fetched with a search of the issues updated since the last
+    sync, and deleted issues are found by searching the local keys a batch at
+    a time, which returns the ones still present. Both cost one call per batch
+    rather than one per ticket. Only the keys missing from those searches are
+    then looked up one by one, to tell moved issues from deleted ones.
+
+    Jira answers issues the client may no longer see as not found too, so a
+    ticket is only deleted once its issue is missing from two syncs in a row,
+    and a sync stops short when most of a batch goes missing at once.
+    """
+
+    WATERMARK = "jira.sync.watermark"
+    # the keys of the issues found missing by the last sync
+    MISSING = "jira.sync.missing"
+
+    @classmethod
+    def sync(cls, svc, batch_size: int = None) -> collections.Counter:
+        """Apply the changes made in Jira to the local tickets.
+
+        :param svc: the Jira client
+        :param batch_size: the number of issues per page and per bulk statement
+        :return: the number of updated, moved, missing and deleted tickets
+        :raises RuntimeError: if most tickets of a batch are missing from Jira
+        """
+        batch_size = batch_size or current_app.config["JIRA_SYNC_BATCH_SIZE"]
+        stats = cls.sync_updated(svc, batch_size=batch_size)
+        stats.update(cls.sync_deleted(svc, batch_size=batch_size))
+
+        current_app.logger.info(
+            f"Synced tickets: {stats['updated']} updated, {stats['moved']} moved, "
+            f"{stats['missing']} missing, {stats['deleted']} deleted."
+        )
+        return stats
+
+    @classmethod
+    def sync_updated(cls, svc, batch_size: int) -> collections.Counter:
+        """Bring the update times of the tickets changed in Jira up to date."""
+        jql = svc.create_jql_query(labels=current_app.config["JIRA_TICKET_LABELS"])
+        watermark = CheckpointSvc.get(name=cls.WATERMARK)
+        if watermark:
+            since = svc.jql_datetime(datetime.datetime.fromisoformat(watermark))
+            jql = " AND ".join(filter(None, (jql, f'updated >= "{since}"')))
+        jql = f"{jql} ORDER BY updated ASC"
+
+        stats = collections.Counter()
+        issues = svc.iter_issues(jql, batch_size=batch_size, fields="updated")
+        while batch := list(itertools.islice(issues, batch_size)):
+            updates = {
+                issue.key: parse_datetime(issue.raw["fields"].get("updated"))
+                for issue in batch
+            }
+            updates = {key: updated for key, updated in updates.items() if updated}
+            if not updates:
+                continue
+
+            # a single statement for the batch, leaving newer local times alone
+            table = Ticket.__table__
+            statement = (
+                table.update()
+                .where(table.c.key == sqlalchemy.bindparam("b_key"))
+                .where(
+                    sqlalchemy.or_(
+                        table.c.updated_at.is_(None),
+                        table.c.updated_at < sqlalchemy.bindparam("b_updated"),
+                    )
+                )
+                .values(updated_at=sqlalchemy.bindparam("b_updated"))
+            )
+            result = db.session.execute(
+                statement,
+                [{"b_key": k, "b_updated": v} for k, v in updates.items()],
+            )
+            db.session.commit()
+            TicketSvc.invalidate_searches(keys=list(updates))
+            stats["updated"] += max(result.rowcount, 0)
+
+            latest = max(updates.values())
+            CheckpointSvc.set(name=cls.WATERMARK, value=latest.isoformat())
+        return stats
+
+    @classmethod
+    def sync_deleted(cls, svc, batch_size: int) -> collections.Counter:
+        """Drop the tickets whose issue was deleted, and follow moved issues."""
+        max_missing = current_app.config["JIRA_SYNC_MAX_MISSING_RATIO"]
+        suspected = set(json.loads(CheckpointSvc.get(name=cls.MISSING) or "[]"))
+        missing_now = []
+
+        stats = collections.Counter()
+        last_id = 0
+        while True:
+            # pages by id, as the tickets of a batch may be renamed or deleted
+            rows = db.session.execute(
+                sqlalchemy.select(Ticket.id, Ticket.key)
+                .where(Ticket.id > last_id)
+                .order_by(Ticket.id)
+                .limit(batch_size)
+            ).all()
+            if not rows:
+                CheckpointSvc.set(name=cls.MISSING, value=json.dumps(missing_now))
+                if missing_now:
+                    current_app.logger.warning(
+                        f"Tickets missing from Jira, to be deleted if still missing "
+                        f"on the next sync: {missing_now}."
+                    )
+                return stats
+            last_id = rows[-1].id
+            keys = [row.key for row in rows]
+
+            # the search leaves out the keys of missing issues
+            found = svc.search_issues(
+                jql_str=svc.create_jql_query(key=keys),
+                maxResults=len(keys),
+                validate_query=False,
+                fields="key",
+            )
+            found = {issue.key for issue in found}
+
+            missing = [key for key in keys if key not in found]
+            if len(missing) > max(1, len(keys) * max_missing):
+                # more likely a lost permission than issues deleted in bulk
+                raise RuntimeError(
+                    f"{len(missing)} of {len(keys)} tickets are missing from Jira, "
+                    f"stopped syncing their deletions: {missing}."
+                )
+
+            deleted = []
+            for key in missing:
+                moved = cls.moved_to(svc, key=key)
+                if moved:
+                    Ticket.query.filter_by(key=key).update({"key": moved})
+                    MirroredIssue.query.filter_by(key=key).delete()
+                    stats["moved"] += 1
+                elif key in suspected:
+                    deleted.append(key)
+                else:
+                    missing_now.append(key)
+                    stats["missing"] += 1
+
+            if deleted:
+                cls.delete(keys=deleted)
+                stats["deleted"] += len(deleted)
+            db.session.commit()
+            TicketSvc.invalidate_searches(keys=missing)
+
+    @staticmethod
+    def moved_to(svc, key: str):
+        """The current key of an issue, ``None`` if the issue no longer exists."""
+        try:
+            issue = svc.issue(id=key, fields="key")
+        except jira.JIRAError as ex:
+            if ex.status_code == requests.codes.not_found:
+                return None
+            raise
+        return issue.key if issue.key != key else None
+
+    @staticmethod
+    def delete(keys: list[str]):
+        """Delete tickets in bulk, along with their history and mirrored issue."""
+        ids = sqlalchemy.select(Ticket.id).where(Ticket.key.in_(keys))
+        db.session.execute(
+            sqlalchemy.delete(TicketMessage).where(TicketMessage.ticket_id.in_(ids))
+        )
+        db.session.execute(
+            sqlalchemy.delete(MirroredIssue).where(MirroredIssue.key.in_(keys))
+        )
+        db.session.execute(sqlalchemy.delete(Ticket).where(Ticket.key.in_(keys)))
+
+        current_app.logger.info(f"Deleted tickets no longer in Jira: {keys}.")
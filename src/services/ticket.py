@@ -1,23 +1,44 @@
-import os
+import base64
+import datetime
+import hashlib
+import json
+import shutil
+import tempfile
 import typing
 
 import jinja2
 import jira.resources
+import sqlalchemy.exc
+import werkzeug.datastructures
 from flask import current_app
 
-from src.models.ticket import Ticket
+from src.models.issue import MirroredIssue
+from src.models.jira import AttachmentUpload
+from src.models.job import Job
+from src.models.ticket import Ticket, TicketMessage
+from src.schemas.serializers.jira.Issue import IssueSchema
 from src.services.jira import JiraSvc
+from src.services.job import JobSvc
+from src.services.mirror import IssueMirrorSvc, parse_datetime
 from src.settings.ctx import db
 
 
 class TicketSvc:
     @classmethod
-    def create(cls, attachments: list = None, **kwargs) -> dict:
+    def create(
+        cls,
+        attachments: list = None,
+        progress: typing.Callable[..., None] = None,
+        **kwargs,
+    ) -> dict:
         """Create a new ticket by calling Jira API to create a new
         issue. A new local reference is also created.
 
         :param attachments: the files to attach to the ticket which
                             are stored in Jira
+        :param progress: callback reporting the current stage, the ticket
+                         key once the issue is created, and the attachments
+                         that failed to upload as an error
         :param kwargs: properties of the ticket
             title: title of the ticket
             description: body of the ticket
@@ -27,14 +48,15 @@ class TicketSvc:
             priority: severity of the ticket
             watchers: user emails to watch for ticket changes
         """
-        svc = JiraSvc()
+        svc = JiraSvc.instance()
+        report = progress or (lambda *_, **__: None)
 
         # translate emails into jira.User objects
-        reporter = cls.resolve_email(email=kwargs.get("reporter"))
-        watchers = [
-            cls.resolve_email(email, default=email)
-            for email in kwargs.get("watchers") or []
-        ]
+        report("resolving users")
+        emails = kwargs.get("watchers") or []
+        users = cls.resolve_emails(emails=[kwargs.get("reporter"), *emails])
+        reporter = users[kwargs.get("reporter")]
+        watchers = [users[email] or email for email in emails]
 
         # create ticket body with Jira markdown format
         body = cls.create_message_body(
@@ -59,6 +81,7 @@ class TicketSvc:
         categories = category.split(",") + current_app.config["JIRA_TICKET_LABELS"]
 
         # create ticket in Jira
+        report("creating issue")
         issue = svc.create_issue(
             summary=kwargs.get("title"),
             description=body,
@@ -70,22 +93,63 @@ class TicketSvc:
         )
 
         # add watchers
+        report("adding watchers", key=issue.key)
         svc.add_watchers(issue=issue.key, watchers=watchers)
 
         # adding attachments
-        for attachment in attachments or []:
-            svc.add_attachment(issue=issue, attachment=attachment)
+        report("uploading attachments")
+        uploads = svc.add_attachments(issue=issue, attachments=attachments)
+        failed = [upload.filename for upload in uploads if not upload.ok]
+        if failed:
+            msg = f"Failed to add attachments {failed} to ticket '{issue.key}'."
+            current_app.logger.warning(msg)
+            report("uploading attachments", error=msg)
 
         # add new entry to the db
+        report("saving")
         local_fields = {k: v for k, v in kwargs.items() if k in Ticket.__dict__}
         ticket = Ticket(key=issue.key, **local_fields)
 
         db.session.add(ticket)
         db.session.commit()
+        cls.invalidate_searches(boards=[board.key])
 
         current_app.logger.info(f"Created ticket '{ticket.key}'.")
 
-        return TicketSvc.find_one(key=ticket.key)
+        return TicketSvc.find_one(key=ticket.key, mirror=False)
+
+    @classmethod
+    def create_async(cls, attachments: list = None, **kwargs) -> Job:
+        """Create a new ticket in the background.
+
+        Attachments are copied first, since the given files are closed along
+        with the request they came in.
+
+        :param attachments: the files to attach to the ticket
+        :param kwargs: properties of the ticket, see ``TicketSvc.create``
+        :return: the job tracking the ticket creation
+        """
+        files = []
+        for attachment in attachments or []:
+            stream = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+            shutil.copyfileobj(attachment.stream, stream)
+            stream.seek(0)
+            files.append(
+                werkzeug.datastructures.FileStorage(
+                    stream=stream,
+                    filename=attachment.filename,
+                    content_type=attachment.content_type,
+                )
+            )
+
+        job = JobSvc.create(payload=kwargs)
+        JobSvc.submit(
+            job_id=job.id,
+            func=lambda progress: cls.create(
+                attachments=files, progress=progress, **kwargs
+            ),
+        )
+        return job
 
     @staticmethod
     def get(ticket_id) -> typing.Optional[Ticket]:
@@ -98,7 +162,12 @@ class TicketSvc:
 
     @classmethod
     def find_by(
-        cls, limit: int = 20, fields: list = None, _model: bool = False, **filters
+        cls,
+        limit: int = 20,
+        fields: list = None,
+        only: list = None,
+        _model: bool = False,
+        **filters,
     ) -> list[typing.Union[dict, Ticket]]:
         """Search for tickets based on several criteria.
 
@@ -106,76 +175,360 @@ class TicketSvc:
 
         :param limit: the max number of results retrieved
         :param fields: additional fields to include in results schema
+        :param only: the results schema fields to restrict results to
         :param _model: whether to return a ticket model or cross results Jira data
         :param filters: the query filters
         """
-        svc = JiraSvc()
+        if _model:
+            local_filters = {k: v for k, v in filters.items() if k in Ticket.__dict__}
+            return Ticket.query.filter_by(**local_filters).all()
+        return cls.find_page(limit=limit, fields=fields, only=only, **filters)[0]
+
+    @classmethod
+    def find_page(
+        cls,
+        limit: int = 20,
+        cursor: str = None,
+        fields: list = None,
+        only: list = None,
+        **filters,
+    ) -> tuple[list[dict], typing.Optional[str]]:
+        """Search for a page of tickets, see ``find_by``.
+
+        :param limit: the max number of results retrieved
+        :param cursor: the page to search, as given along with the previous page
+        :param fields: additional fields to include in results schema
+        :param only: the results schema fields to restrict results to
+        :param filters: the query filters
+        :return: the tickets and the cursor of the next page, ``None`` if last
+        """
+        fields = cls.projection(fields=fields, only=only)
+        search = cls.search(fields=fields, **filters)
+        if search is None:
+            return [], None
+
+        issues, cursor = search(limit=limit, cursor=cursor)
+        return cls.cross(issues=issues, fields=fields), cursor
+
+    @classmethod
+    def find_page_cached(
+        cls, criteria: dict, limit: int = 20, cursor: str = None, **filters
+    ) -> tuple[list[dict], typing.Optional[str]]:
+        """Search for a page of tickets, see ``find_page``, through the cache.
+
+        Cached pages are tagged with their boards and tickets, for writes to
+        invalidate them, see ``invalidate_searches``.
+
+        :param criteria: the normalized search criteria, keying the cached page
+        :param limit: the max number of results retrieved
+        :param cursor: the page to search, as given along with the previous page
+        :param filters: the query filters
+        """
+        cache = current_app.extensions.get("tickets_cache")
+        if cache is None:
+            return cls.find_page(limit=limit, cursor=cursor, **filters)
+
+        key = json.dumps([criteria, limit, cursor], sort_keys=True, default=str)
+        cached = cache.get(key)
+        if cached is not None:
+            return tuple(cached)
+
+        tickets, next_cursor = cls.find_page(limit=limit, cursor=cursor, **filters)
+        tags = [
+            *(f"board:{board}" for board in criteria.get("boards") or ()),
+            *(f"ticket:{ticket['key']}" for ticket in tickets),
+        ]
+        cache.set(key, [tickets, next_cursor], tags=tags)
+        return tickets, next_cursor
+
+    @staticmethod
+    def invalidate_searches(boards: list[str] = (), keys: list[str] = ()):
+        """Drop the cached searches of some boards, or including some tickets.
+
+        :param boards: the boards new tickets were added to
+        :param keys: the tickets which were changed or deleted
+        """
+        cache = current_app.extensions.get("tickets_cache")
+        tags = [*(f"board:{b}" for b in boards), *(f"ticket:{k}" for k in keys)]
+        if cache is not None and tags:
+            cache.invalidate_tags(*tags)
+
+    @classmethod
+    def iter_by(
+        cls,
+        batch_size: int = 20,
+        cursor: str = None,
+        fields: list = None,
+        only: list = None,
+        **filters,
+    ) -> typing.Iterator[dict]:
+        """Lazily iterate over the tickets of a search, a page at a time.
+
+        The first page is searched right away, so that an invalid search fails
+        before any ticket is consumed.
+
+        :param batch_size: the number of results per page
+        :param cursor: the page to start from, the first one if not given
+        :param fields: additional fields to include in results schema
+        :param only: the results schema fields to restrict results to
+        :param filters: the query filters
+        """
+        fields = cls.projection(fields=fields, only=only)
+        search = cls.search(fields=fields, **filters)
+        if search is None:
+            return iter(())
+
+        issues, cursor = search(limit=batch_size, cursor=cursor)
+
+        def tickets(issues, cursor):
+            while True:
+                yield from cls.cross(issues=issues, fields=fields)
+                if cursor is None:
+                    return
+                issues, cursor = search(limit=batch_size, cursor=cursor)
+
+        return tickets(issues, cursor)
+
+    @classmethod
+    def search(
+        cls,
+        fields: list = None,
+        versions: bool = False,
+        mirror: bool = True,
+        **filters,
+    ) -> typing.Optional[typing.Callable[..., tuple[list, typing.Optional[str]]]]:
+        """Prepare a search of issues, done a page at a time.
+
+        The search is served by the local mirror when possible, and by Jira
+        otherwise. Cursors are only valid for the source they were given by.
+
+        :param fields: the results schema fields, see ``projection``
+        :param versions: whether only the update times of issues are fetched
+        :param mirror: whether the mirror may serve the search, which lags
+                       behind Jira, e.g. not for telling an issue still exists
+        :param filters: the query filters
+        :return: a function of the limit and cursor of a page, giving its issues
+                 and the cursor of the next page, ``None`` if no ticket matches
+        """
+        svc = JiraSvc.instance()
 
         # split filters
         local_filters = {k: v for k, v in filters.items() if k in Ticket.__dict__}
         jira_filters = {k: v for k, v in filters.items() if svc.is_jira_filter(k)}
 
-        if _model:
-            return Ticket.query.filter_by(**local_filters).all()
-        else:
-            # if any of the filter is not a Jira filter, then
-            # apply local filter and pass on results to jql
-            if local_filters:
-                tickets = Ticket.query.filter_by(**local_filters).all()
+        # if any of the filter is not a Jira filter, then
+        # apply local filter and pass on results to jql
+        if local_filters:
+            tickets = Ticket.query.filter_by(**local_filters).all()
+
+            # skip routine if no local entries are found
+            if not tickets:
+                return None
+            jira_filters["key"] = [ticket.key for ticket in tickets]
+
+        # fetch the Jira fields of the results schema fields only
+        fields = cls.projection() if fields is None else fields
+        rendered = "renderedFields" if "rendered" in fields else "fields"
+
+        if mirror and IssueMirrorSvc.supports(filters=jira_filters):
+            # serve the search from the local mirror of Jira issues
+            source = "mirror"
+            boards = {b.key: b for b in svc.boards()}
+            board_keys = list(jira_filters.pop("boards", None) or boards)
+            criteria = dict(
+                projects=[boards[k].project for k in board_keys],
+                labels=current_app.config["JIRA_TICKET_LABELS"],
+                summary=filters.pop("q", None),
+                **{
+                    k: v
+                    for k, v in jira_filters.items()
+                    if v and k in IssueMirrorSvc.FILTERS and k != "q"
+                },
+            )
 
-                # skip routine if no local entries are found
-                if not tickets:
-                    return []
-                jira_filters["key"] = [ticket.key for ticket in tickets]
+            def page(limit, token):
+                return IssueMirrorSvc.search_page(limit=limit, token=token, **criteria)
 
+        else:
             # fetch tickets from Jira using jql while skipping jql
             # validation since local db might not be synched with Jira
+            source = "jira"
+            board_keys = jira_filters.pop("boards", None)
             query = svc.create_jql_query(
+                board_keys=list(board_keys) if board_keys else None,
                 summary=filters.pop("q", None),
                 labels=current_app.config["JIRA_TICKET_LABELS"],
                 tags=filters.pop("categories", []),
                 **jira_filters,
             )
 
-            # include additional fields
-            fields = fields or []
-            if "*navigable" not in fields:
-                fields.append("*navigable")
-            rendered = "renderedFields" if "rendered" in fields else "fields"
-
-            # remove plurals in fields
-            issues = svc.search_issues(
-                jql_str=query,
-                maxResults=limit,
-                validate_query=False,
-                fields=",".join([f[:-1] if f.endswith("s") else f for f in fields]),
-                expand=rendered,
+            # the update time is always fetched for the response validators
+            jira_fields = [*IssueSchema.jira_fields(only=fields), "updated"]
+            params = dict(fields=",".join(jira_fields), expand=rendered)
+            if versions:
+                params = dict(fields="updated")
+
+            def page(limit, token):
+                return svc.search_page(
+                    jql_str=query, token=token, batch_size=limit, **params
+                )
+
+        def search(limit, cursor=None):
+            issues, token = page(
+                limit=int(limit), token=cls.decode_cursor(cursor, source)
             )
+            return issues, cls.encode_cursor(token, source)
+
+        return search
+
+    @classmethod
+    def find_versions(
+        cls, limit: int = 20, cursor: str = None, fields: list = None, **filters
+    ) -> tuple[dict[str, tuple], typing.Optional[str]]:
+        """Search for the versions of a page of tickets, see ``find_page``.
+
+        Only the update times of the issues are fetched, which makes for a
+        lighter search than the tickets themselves, e.g. to tell whether a
+        page changed.
+
+        :param limit: the max number of results retrieved
+        :param cursor: the page to search, as given along with the previous page
+        :param fields: ignored, as versions do not depend on them
+        :param filters: the query filters
+        :return: the versions, see ``versions``, and the cursor of the next page
+        """
+        search = cls.search(versions=True, **filters)
+        if search is None:
+            return {}, None
+
+        issues, cursor = search(limit=limit, cursor=cursor)
+        updated = {issue.key: issue.raw["fields"].get("updated") for issue in issues}
+        return cls.versions(updated=updated), cursor
+
+    @staticmethod
+    def versions(updated: dict[str, str]) -> dict[str, tuple]:
+        """Pair the update times of issues with those of their local ticket.
+
+        Issues with no local ticket are left out, as they are from searches.
+
+        :param updated: the Jira update times of issues, by key
+        :return: the Jira and local update times, by key in the issues order
+        """
+        rows = db.session.execute(
+            sqlalchemy.select(Ticket.key, Ticket.updated_at).where(
+                Ticket.key.in_(updated)
+            )
+        )
+        local = dict(rows.all())
+        return {key: (updated[key], local[key]) for key in updated if key in local}
+
+    @staticmethod
+    def validators(
+        versions: dict[str, tuple], cursor: str = None
+    ) -> tuple[str, typing.Optional[datetime.datetime]]:
+        """The ETag and last modification time of a set of tickets.
+
+        :param versions: the versions of the tickets, see ``versions``
+        :param cursor: the cursor of the next page, if any
+        :return: the ETag, and the most recent update time in UTC, if any
+        """
+        data = [
+            [k, jira_updated, local_updated and local_updated.isoformat()]
+            for k, (jira_updated, local_updated) in versions.items()
+        ]
+        digest = hashlib.sha1(json.dumps([data, cursor]).encode()).hexdigest()
+
+        times = [
+            time
+            for jira_updated, local_updated in versions.values()
+            for time in (parse_datetime(jira_updated), local_updated)
+            if time
+        ]
+        last_modified = max(times, default=None)
+        if last_modified:
+            last_modified = last_modified.replace(tzinfo=datetime.timezone.utc)
+        return digest, last_modified
+
+    @staticmethod
+    def projection(fields: list = None, only: list = None) -> list[str]:
+        """The results schema fields of a search.
+
+        Optional fields, e.g. comments or watchers, are left out unless given.
+
+        :param fields: additional fields to include in results schema
+        :param only: the results schema fields to restrict results to, all if
+                     not given
+        """
+        optional = JiraSvc.allowed_fields()
+        names = only or list(IssueSchema._declared_fields)
+        return [n for n in names if n not in optional or n in (fields or ())]
 
-            tickets = []
-            for issue in issues:
-                model = cls.find_one(key=issue.key, _model=True)
+    @staticmethod
+    def cross(issues: list, fields: list = None) -> list[dict]:
+        """Cross a page of issues with their local tickets.
 
-                # prevent cases where local db is not synched with Jira
-                # for cases where Jira tickets are not yet locally present
-                if model:
-                    url = current_app.config["ATLASSIAN_URL"]
-                    ticket = issue.raw["fields"]
-                    ticket["id"] = issue.id
-                    ticket["key"] = issue.key
-                    ticket["url"] = f"{url}/browse/{issue.key}"
-                    ticket["reporter"] = {"emailAddress": model.reporter}
+        :param issues: the Jira or mirrored issues
+        :param fields: the results schema fields, see ``projection``
+        """
+        fields = fields or []
+        svc = JiraSvc.instance()
+
+        # fetch local entries for the whole page in a single query
+        keys = [issue.key for issue in issues]
+        models = {m.key: m for m in Ticket.query.filter(Ticket.key.in_(keys))}
+
+        tickets = []
+        for issue in issues:
+            model = models.get(issue.key)
+
+            # prevent cases where local db is not synched with Jira
+            # for cases where Jira tickets are not yet locally present
+            if model:
+                url = current_app.config["ATLASSIAN_URL"]
+                ticket = issue.raw["fields"]
+                ticket["id"] = issue.id
+                ticket["key"] = issue.key
+                ticket["url"] = f"{url}/browse/{issue.key}"
+                ticket["reporter"] = {"emailAddress": model.reporter}
+
+                # add rendered fields if requested
+                if "rendered" in fields:
+                    ticket["rendered"] = issue.raw["renderedFields"]
+
+                tickets.append(ticket)
+
+        # add watchers if requested
+        if "watchers" in fields:
+            present = [issue for issue in issues if issue.key in models]
+            watchers = svc.issues_watchers(issues=present)
+            for ticket in tickets:
+                if ticket["key"] in watchers:
+                    ticket["watchers"] = watchers[ticket["key"]]
+        return tickets
 
-                    # add rendered fields if requested
-                    if "rendered" in fields:
-                        ticket["rendered"] = issue.raw["renderedFields"]
+    @staticmethod
+    def encode_cursor(token: typing.Union[str, int, None], source: str):
+        """Make an opaque cursor out of the token of a page."""
+        if token is None:
+            return None
+        data = json.dumps([source, token]).encode()
+        return base64.urlsafe_b64encode(data).decode()
 
-                    # add watchers if requested
-                    if "watchers" in fields:
-                        ticket["watchers"] = svc.watchers(issue.key).raw["watchers"]
+    @staticmethod
+    def decode_cursor(cursor: typing.Optional[str], source: str):
+        """Get the token of a page out of its cursor.
 
-                    tickets.append(ticket)
-            return tickets
+        :raise ValueError: if the cursor is malformed or given by another source
+        """
+        if not cursor:
+            return None
+        try:
+            cursor_source, token = json.loads(base64.urlsafe_b64decode(cursor))
+        except (TypeError, ValueError):
+            raise ValueError("Malformed cursor.")
+        if cursor_source != source or not isinstance(token, (str, int)):
+            raise ValueError("Cursor no longer valid, start over the search.")
+        return token
 
     @classmethod
     def update(cls, ticket_id, **kwargs):
@@ -184,6 +537,7 @@ class TicketSvc:
             if hasattr(ticket, key):
                 setattr(ticket, key, value)
         db.session.commit()
+        cls.invalidate_searches(keys=[ticket.key])
 
         msg = f"Updated ticket '{ticket.key}' with the attributes: '{kwargs}'."
         current_app.logger.info(msg)
@@ -192,11 +546,78 @@ class TicketSvc:
     def delete(cls, ticket_id):
         ticket = cls.get(ticket_id=ticket_id)
         if ticket:
+            # not left to the foreign key, which SQLite does not enforce
+            db.session.execute(
+                sqlalchemy.delete(TicketMessage).where(
+                    TicketMessage.ticket_id == ticket.id
+                )
+            )
+            MirroredIssue.query.filter_by(key=ticket.key).delete()
             db.session.delete(ticket)
             db.session.commit()
+            cls.invalidate_searches(keys=[ticket.key])
 
             current_app.logger.info(f"Deleted ticket '{ticket.key}'.")
 
+    @staticmethod
+    def add_message(ticket_id, message_id, direction: str = None) -> bool:
+        """Append a message to the history of a ticket.
+
+        :param ticket_id: the ticket the message belongs to
+        :param message_id: the O365 message id
+        :param direction: whether the message was received or sent, see
+                          ``TicketMessage.INBOUND`` and ``TicketMessage.OUTBOUND``
+        :return: whether the message was added, ``False`` if already present
+        """
+        if TicketSvc.has_message(ticket_id=ticket_id, message_id=message_id):
+            return False
+
+        now = datetime.datetime.utcnow()
+        message = TicketMessage(
+            ticket_id=ticket_id,
+            message_id=message_id,
+            direction=direction,
+            created_at=now,
+        )
+        db.session.add(message)
+        db.session.query(Ticket).filter_by(id=ticket_id).update({"updated_at": now})
+        try:
+            db.session.commit()
+        except sqlalchemy.exc.IntegrityError:
+            # added concurrently in the meantime
+            db.session.rollback()
+            return False
+
+        current_app.logger.debug(f"Added message '{message_id}' to ticket history.")
+        return True
+
+    @staticmethod
+    def has_message(ticket_id, message_id) -> bool:
+        """Whether a message is in the history of a ticket."""
+        query = TicketMessage.query.filter_by(
+            ticket_id=ticket_id, message_id=message_id
+        )
+        return db.session.query(query.exists()).scalar()
+
+    @staticmethod
+    def last_message(
+        ticket_id, direction: str = None
+    ) -> typing.Optional[TicketMessage]:
+        """The message most recently added to the history of a ticket."""
+        query = TicketMessage.query.filter_by(ticket_id=ticket_id)
+        if direction:
+            query = query.filter_by(direction=direction)
+        order = (TicketMessage.created_at.desc(), TicketMessage.id.desc())
+        return query.order_by(*order).first()
+
+    @staticmethod
+    def known_messages(message_ids: typing.Iterable[str]) -> set[str]:
+        """The given messages that are in the history of any ticket."""
+        query = db.session.query(TicketMessage.message_id).filter(
+            TicketMessage.message_id.in_(set(message_ids))
+        )
+        return {message_id for message_id, in query}
+
     @classmethod
     def create_comment(
         cls,
@@ -205,7 +626,7 @@ class TicketSvc:
         body: str,
         watchers: list = None,
         attachments: list = None,
-    ):
+    ) -> list[AttachmentUpload]:
         """Create the body of the ticket.
 
         :param issue: the ticket to comment on
@@ -214,11 +635,14 @@ class TicketSvc:
         :param watchers: user emails to watch for ticket changes
         :param attachments: the files to attach to the comment which
                             are stored in Jira
+        :return: the outcome of each attachment upload
         """
-        svc = JiraSvc()
+        svc = JiraSvc.instance()
 
         # translate watchers into jira.User objects iff exists
-        watchers = [cls.resolve_email(email, default=email) for email in watchers or []]
+        emails = watchers or []
+        users = cls.resolve_emails(emails=emails)
+        watchers = [users[email] or email for email in emails]
 
         body = cls.create_message_body(
             template="jira.j2",
@@ -236,8 +660,11 @@ class TicketSvc:
         svc.add_watchers(issue=issue, watchers=watchers)
 
         # adding attachments
-        for attachment in attachments or []:
-            svc.add_attachment(issue=issue, attachment=attachment)
+        uploads = svc.add_attachments(issue=issue, attachments=attachments)
+
+        # searches cached meanwhile may miss the watchers or attachments
+        cls.invalidate_searches(keys=[getattr(issue, "key", issue)])
+        return uploads
 
     @staticmethod
     def create_message_body(template=None, values=None) -> typing.Optional[str]:
@@ -249,19 +676,19 @@ class TicketSvc:
         if not template:
             return None
 
-        template_path = os.path.join(
-            current_app.root_path, "templates", "ticket", "format"
-        )
-        template_filepath = os.path.join(template_path, template)
-        if not os.path.exists(template_filepath):
+        try:
+            compiled = current_app.extensions["templates"].get_template(template)
+        except jinja2.TemplateNotFound:
             raise ValueError("Invalid template provided")
 
-        with open(template_filepath) as file:
-            content = file.read()
-
-        return jinja2.Template(content).render(**values)
+        return compiled.render(**values)
 
     @staticmethod
     def resolve_email(email, default=None) -> jira.resources.User:
         """Email translation to Jira user."""
-        return next(iter(JiraSvc().search_users(query=email, maxResults=1)), default)
+        return JiraSvc.instance().resolve_users(emails=[email])[email] or default
+
+    @staticmethod
+    def resolve_emails(emails: list[str]) -> dict[str, jira.resources.User]:
+        """Batch email translation to Jira users, ``None`` for unknown emails."""
+        return JiraSvc.instance().resolve_users(emails=emails)
@@ -0,0 +1,30 @@
+import os
+import tempfile
+import typing
+
+from src.utils.cache import MemoryCache, SQLiteCache
+
+__all__ = ("create_search_cache",)
+
+
+def create_search_cache(app) -> typing.Optional[typing.Union[MemoryCache, SQLiteCache]]:
+    """Create the cache of ticket searches, none if disabled.
+
+    The ``memory`` backend is private to each process, and only sees its own
+    invalidations. The ``sqlite`` backend is a file shared by the processes of
+    a host, e.g. every worker of the web server and the incoming messages
+    handler.
+    """
+    config = app.config
+    backend = (config["TICKETS_CACHE_BACKEND"] or "").lower()
+    ttl = config["TICKETS_CACHE_TTL_IN_SECONDS"]
+    if backend == "memory":
+        return MemoryCache(ttl=ttl, maxsize=config["TICKETS_CACHE_MAX_ENTRIES"])
+    elif backend == "sqlite":
+        path = config["TICKETS_CACHE_PATH"] or os.path.join(
+            tempfile.gettempdir(), "ticket-api-cache.sqlite"
+        )
+        return SQLiteCache(path=path, ttl=ttl)
+    elif backend not in ("", "none"):
+        raise ValueError(f"Unknown tickets cache backend '{backend}'.")
+    return None
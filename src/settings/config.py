@@ -16,8 +16,37 @@ class BaseConfig:
     # Database settings
     SQLALCHEMY_DATABASE_URI = env("SQLALCHEMY_DATABASE_URI", None)
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
     DATABASE_CONNECT_OPTIONS = {}
 
+    # Database connection pool of each process, see ``database.engine_options``
+    DATABASE_POOL_SIZE = env.int("DATABASE_POOL_SIZE", None)
+    DATABASE_MAX_OVERFLOW = env.int("DATABASE_MAX_OVERFLOW", 5)
+    DATABASE_POOL_TIMEOUT_IN_SECONDS = env.int("DATABASE_POOL_TIMEOUT_IN_SECONDS", 10)
+    DATABASE_POOL_RECYCLE_IN_SECONDS = env.int("DATABASE_POOL_RECYCLE_IN_SECONDS", 1800)
+    DATABASE_POOL_PRE_PING = env.bool("DATABASE_POOL_PRE_PING", True)
+
+    # Interval between database pool stats logs, disabled if 0
+    DATABASE_POOL_STATS_INTERVAL_IN_SECONDS = env.int(
+        "DATABASE_POOL_STATS_INTERVAL_IN_SECONDS", 0
+    )
+
+    # Directory for compiled ticket templates, a temporary one if not set
+    TEMPLATES_BYTECODE_CACHE_DIR = env("TEMPLATES_BYTECODE_CACHE_DIR", None)
+
+    # Cache of ticket searches, either 'memory', 'sqlite' or 'none', and its SQLite
+    # file when shared by the processes of a host, a temporary one if not set
+    TICKETS_CACHE_BACKEND = env("TICKETS_CACHE_BACKEND", "memory")
+    TICKETS_CACHE_TTL_IN_SECONDS = env.int("TICKETS_CACHE_TTL_IN_SECONDS", 30)
+    TICKETS_CACHE_MAX_ENTRIES = env.int("TICKETS_CACHE_MAX_ENTRIES", 512)
+    TICKETS_CACHE_PATH = env("TICKETS_CACHE_PATH", None)
+
+    # Number of threads running background jobs, e.g. async ticket creation
+    JOBS_WORKERS = env.int("JOBS_WORKERS", 4)
+
+    # Unfinished jobs not updated for this long are failed, their worker being gone
+    JOBS_STALE_AFTER_IN_SECONDS = env.int("JOBS_STALE_AFTER_IN_SECONDS", 3600)
+
     # OpenAPI supported version
     OPENAPI = env("OPENAPI", "3.0.3")
 
@@ -47,11 +76,61 @@ class BaseConfig:
     CONNECTION_TIMEOUT_IN_MINUTES = env.int("CONNECTION_TIMEOUT_IN_MINUTES", 120)
     KEEP_ALIVE_INTERVAL_IN_SECONDS = env.int("KEEP_ALIVE_INTERVAL_IN_SECONDS", 300)
 
+    # Incoming messages are processed in parallel, one at a time per conversation
+    O365_HANDLER_WORKERS = env.int("O365_HANDLER_WORKERS", 4)
+    O365_HANDLER_MAX_PENDING = env.int("O365_HANDLER_MAX_PENDING", 100)
+
+    # Interval at which the time spent and rejections per filter are logged
+    O365_FILTERS_REPORT_INTERVAL_IN_SECONDS = env.int(
+        "O365_FILTERS_REPORT_INTERVAL_IN_SECONDS", 3600
+    )
+
+    # BeautifulSoup parser for messages HTML, e.g. 'lxml' when installed
+    O365_HTML_PARSER = env("O365_HTML_PARSER", "html.parser")
+
+    # Missing tickets backfill
+    O365_BACKFILL_WORKERS = env.int("O365_BACKFILL_WORKERS", 4)
+    O365_BACKFILL_CHUNK_SIZE = env.int("O365_BACKFILL_CHUNK_SIZE", 50)
+
     # Atlassian credentials
     ATLASSIAN_URL = env("ATLASSIAN_URL", "https://atlassian.net")
     ATLASSIAN_USER = env("ATLASSIAN_USER", None)
     ATLASSIAN_API_TOKEN = env("ATLASSIAN_API_TOKEN", None)
 
+    # Jira client connection pool, shared by every service in a worker
+    JIRA_POOL_SIZE = env.int("JIRA_POOL_SIZE", 10)
+    JIRA_POOL_KEEP_ALIVE = env.bool("JIRA_POOL_KEEP_ALIVE", True)
+
+    # Max concurrent Jira calls when fanning out requests
+    JIRA_MAX_WORKERS = env.int("JIRA_MAX_WORKERS", 8)
+
+    # Attachments are uploaded concurrently, and retried one by one
+    JIRA_ATTACHMENT_WORKERS = env.int("JIRA_ATTACHMENT_WORKERS", 4)
+    JIRA_ATTACHMENT_RETRIES = env.int("JIRA_ATTACHMENT_RETRIES", 2)
+
+    # Jira users resolved from emails, unknown emails are kept for less time
+    JIRA_USERS_CACHE_SIZE = env.int("JIRA_USERS_CACHE_SIZE", 1024)
+    JIRA_USERS_TTL_IN_SECONDS = env.int("JIRA_USERS_TTL_IN_SECONDS", 3600)
+    JIRA_USERS_NEGATIVE_TTL_IN_SECONDS = env.int(
+        "JIRA_USERS_NEGATIVE_TTL_IN_SECONDS", 300
+    )
+
+    # Issue watchers, kept until the issue is updated or for as long as the TTL
+    JIRA_WATCHERS_TTL_IN_SECONDS = env.int("JIRA_WATCHERS_TTL_IN_SECONDS", 300)
+    JIRA_WATCHERS_TIMEOUT_IN_SECONDS = env.int("JIRA_WATCHERS_TIMEOUT_IN_SECONDS", 10)
+
+    # Searches served from a local mirror of the Jira issues, see 'flask jira mirror',
+    # as long as it was synced within the staleness bound
+    JIRA_MIRROR_ENABLED = env.bool("JIRA_MIRROR_ENABLED", False)
+    JIRA_MIRROR_MAX_STALENESS_IN_SECONDS = env.int(
+        "JIRA_MIRROR_MAX_STALENESS_IN_SECONDS", 300
+    )
+    JIRA_MIRROR_BATCH_SIZE = env.int("JIRA_MIRROR_BATCH_SIZE", 100)
+    # Issues per search and tickets per bulk statement of 'flask jira sync'
+    JIRA_SYNC_BATCH_SIZE = env.int("JIRA_SYNC_BATCH_SIZE", 100)
+    # Share of a batch of tickets missing from Jira that stops 'flask jira sync'
+    JIRA_SYNC_MAX_MISSING_RATIO = env.float("JIRA_SYNC_MAX_MISSING_RATIO", 0.5)
+
     # Jira settings
     JIRA_TICKET_TYPE = env("JIRA_TICKET_TYPE", None)
     JIRA_TICKET_LABELS = env.list("JIRA_TICKET_LABELS", [])
@@ -62,6 +141,15 @@ class BaseConfig:
     JIRA_BOARDS = env.list("JIRA_BOARDS", [])
     JIRA_DEFAULT_BOARD = env("JIRA_DEFAULT_BOARD", None)
 
+    # Jira boards are kept for a while, and served stale while refreshed
+    JIRA_BOARDS_TTL_IN_SECONDS = env.int("JIRA_BOARDS_TTL_IN_SECONDS", 3600)
+    JIRA_BOARDS_STALE_TTL_IN_SECONDS = env.int(
+        "JIRA_BOARDS_STALE_TTL_IN_SECONDS", 86400
+    )
+
+    # Load the Jira boards when the app is created, only worth it when serving
+    JIRA_BOARDS_WARM_UP = env.bool("JIRA_BOARDS_WARM_UP", False)
+
     # Filter settings
     EMAIL_WHITELISTED_DOMAINS = env.list("EMAIL_WHITELISTED_DOMAINS", [])
     EMAIL_BLACKLIST = env.list("EMAIL_BLACKLIST", [])
@@ -0,0 +1,140 @@
+import functools
+import logging
+import threading
+import time
+
+import sqlalchemy
+import sqlalchemy.engine
+import sqlalchemy.pool
+
+__all__ = ("PoolMonitor", "engine_options")
+
+logger = logging.getLogger(__name__)
+
+
+def engine_options(config) -> dict:
+    """Create the options of the database engine of the current process.
+
+    The engine is created along with the app, before knowing whether it serves
+    requests or runs the streaming or backfill commands. Unless set, the pool
+    is therefore sized after the largest set of threads that may each hold a
+    connection: background jobs, or the message handler or backfill workers,
+    plus the main thread. Options in ``SQLALCHEMY_ENGINE_OPTIONS`` take
+    precedence.
+    """
+    options = {
+        "pool_pre_ping": config["DATABASE_POOL_PRE_PING"],
+        "pool_recycle": config["DATABASE_POOL_RECYCLE_IN_SECONDS"],
+    }
+    if config["DATABASE_CONNECT_OPTIONS"]:
+        options["connect_args"] = config["DATABASE_CONNECT_OPTIONS"]
+
+    # SQLite pools are set by Flask-SQLAlchemy and not sized
+    uri = config["SQLALCHEMY_DATABASE_URI"]
+    if uri and sqlalchemy.engine.make_url(uri).get_backend_name() != "sqlite":
+        workers = (
+            config["JOBS_WORKERS"],
+            config["O365_HANDLER_WORKERS"],
+            config["O365_BACKFILL_WORKERS"],
+        )
+        options.update(
+            pool_size=config["DATABASE_POOL_SIZE"] or max(workers) + 1,
+            max_overflow=config["DATABASE_MAX_OVERFLOW"],
+            pool_timeout=config["DATABASE_POOL_TIMEOUT_IN_SECONDS"],
+        )
+    return {**options, **config["SQLALCHEMY_ENGINE_OPTIONS"]}
+
+
+class PoolMonitor:
+    """Keep track of the connections checked out of an engine pool.
+
+    Records how long getting a connection takes and how many connections are
+    in use at once, against the pool capacity.
+
+    :param engine: the engine which pool is monitored
+    :param log: the logger reporting the stats
+    """
+
+    def __init__(self, engine: sqlalchemy.engine.Engine, log: logging.Logger = None):
+        self.engine = engine
+        self.log = log or logger
+        self.checkouts = 0
+        self.wait = 0.0
+        self.max_wait = 0.0
+        self.checked_out = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+        sqlalchemy.event.listen(engine.pool, "checkout", self.on_checkout)
+        sqlalchemy.event.listen(engine.pool, "checkin", self.on_checkin)
+        engine.pool.connect = self.timed(engine.pool.connect)
+
+    def timed(self, connect):
+        @functools.wraps(connect)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return connect(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - start
+                with self._lock:
+                    self.checkouts += 1
+                    self.wait += elapsed
+                    self.max_wait = max(self.max_wait, elapsed)
+
+        return wrapper
+
+    def on_checkout(self, *_):
+        with self._lock:
+            self.checked_out += 1
+            self.peak = max(self.peak, self.checked_out)
+
+    def on_checkin(self, *_):
+        with self._lock:
+            self.checked_out = max(self.checked_out - 1, 0)
+
+    @property
+    def capacity(self) -> int:
+        """The max number of connections the pool hands out, 0 if unbounded."""
+        pool = self.engine.pool
+        if isinstance(pool, sqlalchemy.pool.QueuePool):
+            return max(pool.size() + max(pool._max_overflow, 0), 0)
+        elif isinstance(pool, sqlalchemy.pool.StaticPool):
+            return 1
+        return 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            capacity = self.capacity
+            return {
+                "checkouts": self.checkouts,
+                "checked_out": self.checked_out,
+                "peak": self.peak,
+                "capacity": capacity,
+                "saturation": self.peak / capacity if capacity else None,
+                "avg_wait": self.wait / self.checkouts if self.checkouts else 0.0,
+                "max_wait": self.max_wait,
+            }
+
+    def report(self):
+        """Log the pool stats."""
+        stats = self.stats()
+        saturation = stats["saturation"]
+        self.log.info(
+            f"Database pool: {stats['checked_out']} checked out "
+            f"(peak {stats['peak']} of {stats['capacity'] or 'unbounded'}, "
+            f"{'-' if saturation is None else f'{saturation:.0%}'} saturation), "
+            f"{stats['checkouts']} checkouts, "
+            f"{stats['avg_wait'] * 1000:.1f}ms avg wait, "
+            f"{stats['max_wait'] * 1000:.1f}ms max wait."
+        )
+
+    def start(self, interval: float):
+        """Log the pool stats every given number of seconds, in the background."""
+
+        def run():
+            while True:
+                time.sleep(interval)
+                self.report()
+
+        threading.Thread(target=run, daemon=True, name="pool-monitor").start()
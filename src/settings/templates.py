@@ -0,0 +1,31 @@
+import os
+
+import jinja2
+
+__all__ = ("create_environment",)
+
+
+def create_environment(app) -> jinja2.Environment:
+    """Create the environment rendering the ticket format templates.
+
+    Templates are compiled once, when the environment is created, and their
+    bytecode is cached on disk so that other workers skip compiling them too.
+    Changes to the templates are only picked up when auto reload is enabled,
+    which is the default in debug mode.
+    """
+    auto_reload = app.config["TEMPLATES_AUTO_RELOAD"]
+    environment = jinja2.Environment(
+        loader=jinja2.FileSystemLoader(
+            os.path.join(app.root_path, "templates", "ticket", "format")
+        ),
+        bytecode_cache=jinja2.FileSystemBytecodeCache(
+            directory=app.config["TEMPLATES_BYTECODE_CACHE_DIR"]
+        ),
+        auto_reload=app.debug if auto_reload is None else auto_reload,
+    )
+
+    # compile every template ahead of time
+    for name in environment.list_templates():
+        environment.get_template(name)
+
+    return environment
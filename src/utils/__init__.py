@@ -1,8 +1,5 @@
 import base64
-import json
-import re
 
-import O365
 from flask_restful import abort
 from werkzeug.http import HTTP_STATUS_CODES
 
@@ -29,15 +26,3 @@ def encode_content(content):
     data = data.decode()  # convert bytes to string
 
     return data
-
-
-def message_json(message: O365.Message):
-    soup = O365.message.bs(message.unique_body, "html.parser")
-
-    body = str(soup)
-
-    # get the json data
-    data = re.search(r"{.*\s.*}", body).group()
-    data = json.loads(data)
-
-    return data
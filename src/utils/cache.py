@@ -0,0 +1,259 @@
+import collections
+import contextlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+import typing
+
+__all__ = ("TTLCache", "MemoryCache", "SQLiteCache")
+
+logger = logging.getLogger(__name__)
+
+# marks a missing entry, since ``None`` is a valid value to cache
+MISSING = object()
+
+
+class TTLCache:
+    """A thread-safe in-memory cache whose entries expire after some time.
+
+    Entries may also be given a stale period following their expiration,
+    during which ``get_or_load`` keeps serving the stale value while a
+    single background refresh takes place (stale-while-revalidate).
+
+    When bounded, the least recently used entries are evicted first.
+
+    :param ttl: the default number of seconds an entry is kept
+    :param stale_ttl: the default number of seconds a stale entry is served
+    :param maxsize: the max number of entries kept, unbounded if not set
+    """
+
+    def __init__(self, ttl: float, stale_ttl: float = 0, maxsize: int = None):
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.maxsize = maxsize
+        self._data = collections.OrderedDict()
+        self._refreshing = set()
+        self._lock = threading.RLock()
+
+    def get(self, key, default=None):
+        """Get the value of an entry if it has not expired yet."""
+        with self._lock:
+            value, expires_at, _ = self._data.get(key, (MISSING, None, None))
+            if value is MISSING or expires_at <= time.monotonic():
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl: float = None, stale_ttl: float = None):
+        """Store an entry that expires in ``ttl`` seconds."""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        stale_at = expires_at + (self.stale_ttl if stale_ttl is None else stale_ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at, stale_at)
+            self._data.move_to_end(key)
+            while self.maxsize is not None and len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_load(
+        self,
+        key,
+        loader: typing.Callable,
+        ttl: float = None,
+        stale_ttl: float = None,
+    ):
+        """Get the value of an entry, loading it if missing or expired.
+
+        A stale entry is returned right away and refreshed in the background.
+
+        :param key: the entry key
+        :param loader: callable producing a fresh value
+        :param ttl: the number of seconds the loaded value is kept
+        :param stale_ttl: the number of seconds the value is served once stale
+        """
+        now = time.monotonic()
+        with self._lock:
+            value, expires_at, stale_at = self._data.get(key, (MISSING, 0, 0))
+        if value is not MISSING and now < expires_at:
+            return value
+        elif value is not MISSING and now < stale_at:
+            self._refresh(key, loader, ttl=ttl, stale_ttl=stale_ttl)
+            return value
+
+        value = loader()
+        self.set(key, value, ttl=ttl, stale_ttl=stale_ttl)
+        return value
+
+    def _refresh(self, key, loader, **kwargs):
+        """Reload an entry in the background, once at a time per key."""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def run():
+            try:
+                self.set(key, loader(), **kwargs)
+            except Exception:
+                logger.warning(f"Failed to refresh cache entry '{key}'.", exc_info=1)
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def invalidate(self, key=MISSING):
+        """Drop a single entry or, when no key is given, every entry."""
+        with self._lock:
+            if key is MISSING:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+
+    def invalidate_if(self, predicate: typing.Callable[[typing.Any], bool]):
+        """Drop every entry whose value matches the predicate."""
+        with self._lock:
+            for key in [k for k, (v, *_) in self._data.items() if predicate(v)]:
+                del self._data[key]
+
+    def __len__(self):
+        return len(self._data)
+
+
+class MemoryCache:
+    """An in-process cache of JSON values, which may be invalidated by tag.
+
+    Values are kept serialized, so that callers never share the cached ones.
+    Invalidations only reach the cache of the current process.
+
+    :param ttl: the default number of seconds an entry is kept
+    :param maxsize: the max number of entries kept, unbounded if not set
+    """
+
+    def __init__(self, ttl: float, maxsize: int = None):
+        self._cache = TTLCache(ttl=ttl, maxsize=maxsize)
+
+    def get(self, key: str, default=None):
+        entry = self._cache.get(key)
+        return default if entry is None else json.loads(entry[1])
+
+    def set(self, key: str, value, ttl: float = None, tags: typing.Iterable = ()):
+        self._cache.set(key, (frozenset(tags), json.dumps(value)), ttl=ttl)
+
+    def invalidate_tags(self, *tags: str):
+        """Drop the entries with any of the given tags."""
+        self._cache.invalidate_if(lambda entry: not entry[0].isdisjoint(tags))
+
+    def clear(self):
+        self._cache.invalidate()
+
+
+class SQLiteCache:
+    """A cache of JSON values in a SQLite file, shared by the processes of a host.
+
+    Lets every worker serving requests, and the commands processing incoming
+    messages, see the same entries and invalidations. Failing to reach the
+    file is logged and taken as a miss.
+
+    :param path: the SQLite file, created if missing
+    :param ttl: the default number of seconds an entry is kept
+    :param timeout: the number of seconds to wait for a lock on the file
+    """
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS entries "
+        "(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)",
+        "CREATE INDEX IF NOT EXISTS ix_entries_expires_at ON entries (expires_at)",
+        "CREATE TABLE IF NOT EXISTS tags "
+        "(tag TEXT NOT NULL, key TEXT NOT NULL, PRIMARY KEY (tag, key))",
+        "CREATE INDEX IF NOT EXISTS ix_tags_key ON tags (key)",
+    )
+
+    def __init__(self, path: str, ttl: float, timeout: float = 5):
+        self.path = path
+        self.ttl = ttl
+        self.timeout = timeout
+        self._local = threading.local()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        """The connection of the current thread."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=self.timeout, isolation_level=None
+            )
+            connection.execute("PRAGMA journal_mode=WAL")
+            for statement in self.SCHEMA:
+                connection.execute(statement)
+            self._local.connection = connection
+        return connection
+
+    def get(self, key: str, default=None):
+        try:
+            row = self.connection.execute(
+                "SELECT value FROM entries WHERE key = ? AND expires_at > ?",
+                (key, time.time()),
+            ).fetchone()
+        except sqlite3.Error:
+            logger.warning(f"Failed to get cache entry '{key}'.", exc_info=1)
+            return default
+        return default if row is None else json.loads(row[0])
+
+    def set(self, key: str, value, ttl: float = None, tags: typing.Iterable = ()):
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        try:
+            with self._transaction() as connection:
+                # expired entries are dropped along the way
+                self._delete(
+                    connection, "SELECT key FROM entries WHERE expires_at <= ?", now
+                )
+                self._delete(connection, "SELECT ?", key)
+                connection.execute(
+                    "INSERT INTO entries (key, value, expires_at) VALUES (?, ?, ?)",
+                    (key, json.dumps(value), expires_at),
+                )
+                connection.executemany(
+                    "INSERT OR IGNORE INTO tags (tag, key) VALUES (?, ?)",
+                    [(tag, key) for tag in tags],
+                )
+        except sqlite3.Error:
+            logger.warning(f"Failed to set cache entry '{key}'.", exc_info=1)
+
+    def invalidate_tags(self, *tags: str):
+        """Drop the entries with any of the given tags."""
+        if not tags:
+            return
+        placeholders = ", ".join("?" * len(tags))
+        select = f"SELECT key FROM tags WHERE tag IN ({placeholders})"
+        try:
+            with self._transaction() as connection:
+                self._delete(connection, select, *tags)
+        except sqlite3.Error:
+            logger.warning(f"Failed to invalidate cache tags {tags}.", exc_info=1)
+
+    def clear(self):
+        with self._transaction() as connection:
+            connection.execute("DELETE FROM tags")
+            connection.execute("DELETE FROM entries")
+
+    @staticmethod
+    def _delete(connection: sqlite3.Connection, select: str, *params):
+        """Delete the entries, and their tags, whose keys are selected."""
+        keys = [(key,) for key, in connection.execute(select, params)]
+        connection.executemany("DELETE FROM tags WHERE key = ?", keys)
+        connection.executemany("DELETE FROM entries WHERE key = ?", keys)
+
+    @contextlib.contextmanager
+    def _transaction(self) -> typing.Iterator[sqlite3.Connection]:
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        else:
+            connection.execute("COMMIT")
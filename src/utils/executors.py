@@ -0,0 +1,71 @@
+import collections
+import concurrent.futures
+import threading
+import typing
+
+__all__ = ("KeyedExecutor",)
+
+
+class KeyedExecutor:
+    """Thread pool running tasks in parallel, except for tasks sharing a key.
+
+    Tasks submitted with the same key run one at a time, in the order they
+    were submitted, while tasks with different keys run concurrently.
+
+    :param max_workers: the max number of tasks running at once
+    :param max_pending: the max number of tasks not yet done, after which
+                        ``submit`` blocks until a task completes
+    """
+
+    def __init__(self, max_workers: int, max_pending: int = None):
+        self._pool = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
+        self._queues: dict[typing.Hashable, collections.deque] = {}
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending) if max_pending else None
+
+    def submit(
+        self, key: typing.Hashable, fn: typing.Callable, *args, **kwargs
+    ) -> concurrent.futures.Future:
+        """Schedule a task to run after the previous tasks of the same key."""
+        if self._slots:
+            self._slots.acquire()
+
+        future = concurrent.futures.Future()
+        with self._lock:
+            queue = self._queues.setdefault(key, collections.deque())
+            queue.append((future, fn, args, kwargs))
+            if len(queue) == 1:
+                self._pool.submit(self._drain, key)
+        return future
+
+    def _drain(self, key):
+        """Run the tasks of a key until there are none left."""
+        while True:
+            with self._lock:
+                future, fn, args, kwargs = self._queues[key][0]
+
+            if future.set_running_or_notify_cancel():
+                try:
+                    result = fn(*args, **kwargs)
+                except BaseException as ex:
+                    future.set_exception(ex)
+                else:
+                    future.set_result(result)
+            if self._slots:
+                self._slots.release()
+
+            with self._lock:
+                queue = self._queues[key]
+                queue.popleft()
+                if not queue:
+                    del self._queues[key]
+                    return
+
+    def shutdown(self, wait: bool = True):
+        self._pool.shutdown(wait=wait)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.shutdown(wait=True)
@@ -0,0 +1,93 @@
+import base64
+import io
+import os
+import shutil
+import tempfile
+import typing
+
+__all__ = ("Base64Reader", "SizedReader")
+
+
+class SizedReader:
+    """Binary stream wrapper exposing how many bytes are left to read.
+
+    Multipart encoders use the ``len`` attribute to stream a body in chunks
+    instead of copying it whole into memory. Streams that cannot seek are
+    spooled first, which keeps at most ``max_size`` bytes in memory.
+
+    :param stream: the wrapped binary stream
+    :param max_size: bytes kept in memory when spooling an unseekable stream
+    """
+
+    def __init__(self, stream: typing.BinaryIO, max_size: int = 1024 * 1024):
+        if not (hasattr(stream, "seekable") and stream.seekable()):
+            spooled = tempfile.SpooledTemporaryFile(max_size=max_size)
+            shutil.copyfileobj(stream, spooled)
+            spooled.seek(0)
+            stream = spooled
+        self.stream = stream
+        self.size = stream.seek(0, os.SEEK_END)
+        stream.seek(0)
+
+    @property
+    def len(self) -> int:
+        return self.size - self.stream.tell()
+
+    def read(self, size: int = -1) -> bytes:
+        return self.stream.read(size)
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        return self.stream.seek(offset, whence)
+
+    def tell(self) -> int:
+        return self.stream.tell()
+
+
+class Base64Reader:
+    """Binary stream decoding base64 content as it is read.
+
+    Only the blocks covering each read are decoded, so the decoded content
+    is never held in memory at once.
+
+    :param content: the base64 encoded content
+    """
+
+    def __init__(self, content: typing.Union[str, bytes]):
+        if isinstance(content, str):
+            content = content.encode("ascii")
+        if any(c in content for c in b" \r\n\t"):
+            content = b"".join(content.split())
+        self.content = content
+        padding = len(content) - len(content.rstrip(b"="))
+        self.size = len(content) // 4 * 3 - padding
+        self.position = 0
+
+    @property
+    def len(self) -> int:
+        return self.size - self.position
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0 or size > self.len:
+            size = self.len
+        if size == 0:
+            return b""
+
+        # decode the 4-char blocks spanning the requested bytes
+        start, end = self.position // 3, -(-(self.position + size) // 3)
+        data = base64.b64decode(self.content[start * 4 : end * 4])
+        offset = self.position - start * 3
+        self.position += size
+        return data[offset : offset + size]
+
+    def seek(self, offset: int, whence: int = os.SEEK_SET) -> int:
+        if whence == os.SEEK_CUR:
+            offset += self.position
+        elif whence == os.SEEK_END:
+            offset += self.size
+        if offset < 0:
+            raise io.UnsupportedOperation("negative seek position")
+        self.position = min(offset, self.size)
+        return self.position
+
+    def tell(self) -> int:
+        return self.position
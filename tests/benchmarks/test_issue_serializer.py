@@ -0,0 +1,46 @@
+"""Time to dump pages of tickets, with marshmallow and the compiled serializer.
+
+Disabled by default, set ``BENCHMARK_SERIALIZER`` to run:
+
+    $ BENCHMARK_SERIALIZER=1 pytest -s tests/benchmarks
+"""
+import os
+import statistics
+import time
+
+import pytest
+
+from src.schemas.serializers.compiled import compile_schema
+from src.schemas.serializers.jira.Issue import IssueSchema
+from tests.unit.test_serializers import make_ticket
+
+pytestmark = pytest.mark.skipif(
+    not os.environ.get("BENCHMARK_SERIALIZER"), reason="BENCHMARK_SERIALIZER not set"
+)
+
+PAGE_SIZES = (20, 200, 2000)
+
+
+def measure(dump, tickets, repeat: int = 20) -> float:
+    """The median time to dump a page, in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        dump(tickets)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def test_issue_serializer():
+    schema = IssueSchema(many=True)
+    compiled = compile_schema(IssueSchema)
+
+    print(f"\n{'page size':<12}{'marshmallow':>14}{'compiled':>12}{'speedup':>10}")
+    for size in PAGE_SIZES:
+        tickets = [make_ticket(i) for i in range(size)]
+        assert compiled.dump(tickets, many=True) == schema.dump(tickets)
+
+        before = measure(schema.dump, tickets)
+        after = measure(lambda page: compiled.dump(page, many=True), tickets)
+        print(f"{size:<12}{before:>14.2f}{after:>12.2f}{before / after:>9.1f}x")
+        assert after < before
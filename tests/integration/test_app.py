@@ -46,3 +46,18 @@ class TestApp:
 
         response = client.get("/test/v1/specs.json")
         assert response.status_code == 200
+
+    @pytest.mark.parametrize("warm_up", [False, True])
+    def test_boards_warm_up(self, warm_up, mocker):
+        """Ensure boards are only loaded on creation when asked to."""
+        mock = mocker.patch("src.app.board_registry.warm_up")
+        create_app(
+            config_name="testing",
+            dotenv=False,
+            configs={
+                "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+                "JIRA_BOARDS": ["JIRA_SUPPORT_BOARD"],
+                "JIRA_BOARDS_WARM_UP": warm_up,
+            },
+        )
+        assert mock.called is warm_up
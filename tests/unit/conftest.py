@@ -0,0 +1,46 @@
+import pytest
+
+from src.app import create_app
+from src.models.jira import Board
+from src.services.jira import JiraSvc
+from src.settings.ctx import db
+
+
+@pytest.fixture
+def app():
+    app = create_app(
+        config_name="testing",
+        dotenv=False,
+        configs={
+            "SQLALCHEMY_DATABASE_URI": "sqlite:///:memory:",
+            "ATLASSIAN_URL": "https://jira.atlassian.com",
+            "JIRA_TICKET_LABELS": ["ticket"],
+        },
+    )
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.drop_all()
+
+
+@pytest.fixture
+def jira_svc(app, mocker, request):
+    """A mocked Jira client, with a single default board.
+
+    Indirectly parametrize to override the return values of its methods, e.g.
+    ``{"allowed_categories": ["general"]}``.
+    """
+    raw = {"id": 1, "name": "Support board", "location": {"projectKey": "SUP"}}
+    board = Board(key="support", raw=raw, is_default=True, filter_id="10")
+    svc = mocker.Mock(spec=JiraSvc)
+    svc.boards.return_value = [board]
+    svc.allowed_categories.return_value = []
+    svc.allowed_fields.return_value = []
+    svc.is_jira_filter.side_effect = JiraSvc.is_jira_filter
+    svc.create_jql_query.return_value = "labels in (ticket)"
+    svc.jql_datetime.return_value = "2024/01/01 10:00"
+    for name, value in getattr(request, "param", {}).items():
+        getattr(svc, name).return_value = value
+    mocker.patch.object(JiraSvc, "instance", return_value=svc)
+    mocker.patch.object(JiraSvc, "allowed_categories", svc.allowed_categories)
+    return svc
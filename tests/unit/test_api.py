@@ -0,0 +1,118 @@
+import datetime
+import json
+
+import pytest
+
+from src.models.ticket import Ticket
+from src.services.mirror import IssueMirrorSvc
+from src.services.ticket import TicketSvc
+from src.settings.ctx import db
+from tests.unit.test_mirror import make_issue
+
+KEYS = [f"SUP-{i}" for i in range(1, 6)]
+
+
+@pytest.fixture
+def client(app, jira_svc, mocker):
+    """A client searching tickets served by a fresh mirror."""
+    app.config["JIRA_MIRROR_ENABLED"] = True
+    db.session.add_all(Ticket(key=key, reporter="user@xyz.com") for key in KEYS)
+    db.session.commit()
+    jira_svc.iter_issues.return_value = iter(make_issue(mocker, k) for k in KEYS)
+    IssueMirrorSvc.sync(svc=jira_svc)
+    return app.test_client()
+
+
+class TestTicketsPages:
+    def test_follow_cursor(self, client, jira_svc):
+        keys = []
+        url = "/tickets/?limit=2&only=key"
+        while url:
+            response = client.get(url)
+            assert response.status_code == 200
+            assert [list(t) for t in response.json] == [["key"]] * len(response.json)
+            keys.extend(t["key"] for t in response.json)
+
+            link = response.headers.get("Link")
+            url = link and link[link.index("<") + 1 : link.index(">")]
+            if url:
+                assert link.endswith('; rel="next"')
+                assert "only=key" in url and "limit=2" in url
+        assert keys == KEYS
+        jira_svc.search_page.assert_not_called()
+
+    def test_invalid_cursor(self, client):
+        response = client.get("/tickets/?cursor=not-a-cursor")
+        assert response.status_code == 400
+        assert response.json["message"] == "Malformed cursor."
+
+        # a cursor given by Jira is not valid for the mirror
+        cursor = TicketSvc.encode_cursor(token="next", source="jira")
+        response = client.get(f"/tickets/?cursor={cursor}")
+        assert response.status_code == 400
+        assert "start over" in response.json["message"]
+
+    @pytest.mark.parametrize("limit", [0, -1, 101])
+    def test_invalid_limit(self, client, jira_svc, limit):
+        response = client.get(f"/tickets/?limit={limit}")
+        assert response.status_code == 400
+        assert "limit" in response.json["message"]
+        jira_svc.search_page.assert_not_called()
+
+    def test_stream(self, client, jira_svc):
+        response = client.get(
+            "/tickets/?limit=2", headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.status_code == 200
+        assert response.mimetype == "application/x-ndjson"
+        assert "Link" not in response.headers
+
+        lines = response.get_data(as_text=True).splitlines()
+        tickets = [json.loads(line) for line in lines]
+        assert [t["key"] for t in tickets] == KEYS
+        assert tickets[0]["title"] == "Issue SUP-1"
+        jira_svc.search_page.assert_not_called()
+
+    def test_stream_invalid_cursor(self, client):
+        response = client.get(
+            "/tickets/?cursor=not-a-cursor", headers={"Accept": "application/x-ndjson"}
+        )
+        assert response.status_code == 400
+
+
+class TestConditionalRequests:
+    @pytest.mark.parametrize("url", ["/tickets/?limit=2", "/tickets/SUP-1"])
+    def test_if_none_match(self, client, url, mocker):
+        response = client.get(url)
+        assert response.status_code == 200
+        etag = response.headers["ETag"]
+
+        find_versions = mocker.spy(TicketSvc, "find_versions")
+        find_page = mocker.spy(TicketSvc, "find_page")
+        response = client.get(url, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.headers["ETag"] == etag
+        assert response.data == b""
+        # only the versions were searched, not the tickets
+        assert find_versions.call_count == 1
+        assert find_page.call_count == 0
+
+        response = client.get(url, headers={"If-None-Match": '"other"'})
+        assert response.status_code == 200
+        assert response.headers["ETag"] == etag
+
+    @pytest.mark.parametrize("url", ["/tickets/?limit=2", "/tickets/SUP-1"])
+    def test_if_modified_since(self, client, url):
+        response = client.get(url)
+        last_modified = response.headers["Last-Modified"]
+
+        response = client.get(url, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 304
+        assert "ETag" in response.headers
+
+        # a ticket changed since
+        ticket = Ticket.query.filter_by(key="SUP-1").one()
+        TicketSvc.update(ticket_id=ticket.id, updated_at=datetime.datetime(2030, 1, 1))
+        response = client.get(url, headers={"If-Modified-Since": last_modified})
+        assert response.status_code == 200
+        assert response.headers["Last-Modified"] != last_modified
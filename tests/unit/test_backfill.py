@@ -0,0 +1,83 @@
+import datetime
+import types
+
+import pytest
+
+from src.models.ticket import Ticket
+from src.services.checkpoint import CheckpointSvc
+from src.services.O365.backfill import MailboxBackfill
+from src.services.ticket import TicketSvc
+from src.settings.ctx import db
+
+START = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+
+
+def message(object_id, conversation_id, minutes):
+    received = START + datetime.timedelta(minutes=minutes)
+    return types.SimpleNamespace(
+        object_id=object_id, conversation_id=conversation_id, received=received
+    )
+
+
+@pytest.fixture
+def folders(mocker):
+    inbox = mocker.MagicMock()
+    inbox.get_messages.return_value = iter(
+        [message("m1", "c1", 1), message("m3", "c2", 3), message("m4", "c1", 4)]
+    )
+    sent = mocker.MagicMock()
+    sent.get_messages.return_value = iter([message("m2", "c1", 2)])
+    return [inbox, sent]
+
+
+class TestMailboxBackfill:
+    def test_messages(self, app, mocker, folders):
+        backfill = MailboxBackfill(handler=mocker.Mock(), folders=folders)
+        messages = backfill.messages(since=START)
+        assert [m.object_id for m in messages] == ["m1", "m2", "m3", "m4"]
+
+    def test_unprocessed(self, app, mocker):
+        ticket = Ticket(
+            key="JIRA-1",
+            reporter="user@xyz.com",
+            outlook_message_id="m1",
+            outlook_conversation_id="c1",
+        )
+        db.session.add(ticket)
+        db.session.commit()
+        TicketSvc.add_message(ticket_id=ticket.id, message_id="m1")
+        TicketSvc.add_message(ticket_id=ticket.id, message_id="m2")
+
+        messages = [message("m1", "c1", 1), message("m2", "c1", 2)]
+        messages += [message("m3", "c1", 3), message("m4", "c2", 4)]
+        backfill = MailboxBackfill(handler=mocker.Mock(), folders=[], chunk_size=3)
+        unprocessed = backfill.unprocessed(messages)
+        assert [m.object_id for m in unprocessed] == ["m3", "m4"]
+        assert backfill.stats["skipped"] == 2
+
+    def test_run(self, app, mocker, folders):
+        handler = mocker.Mock()
+        backfill = MailboxBackfill(
+            handler=handler, folders=folders, chunk_size=2, checkpoint="backfill"
+        )
+        stats = backfill.run(since=START)
+        assert stats["processed"] == 4
+        calls = [c.args[0] for c in handler.process_message.call_args_list]
+        assert [c for c in calls if c in ("m1", "m2", "m4")] == ["m1", "m2", "m4"]
+
+        checkpoint = datetime.datetime.fromisoformat(CheckpointSvc.get("backfill"))
+        assert checkpoint > START + datetime.timedelta(minutes=4)
+
+    def test_run_failure(self, app, mocker, folders):
+        handler = mocker.Mock()
+        handler.process_message.side_effect = lambda i: 1 / (i != "m3")
+        backfill = MailboxBackfill(
+            handler=handler, folders=folders, workers=1, checkpoint="backfill"
+        )
+        stats = backfill.run(since=START)
+        assert stats["processed"] == 3
+        assert stats["failed"] == 1
+
+        # the checkpoint is held back by the failed message
+        checkpoint = CheckpointSvc.get("backfill")
+        assert checkpoint == (START + datetime.timedelta(minutes=3)).isoformat()
@@ -0,0 +1,118 @@
+import pytest
+
+from src.utils.cache import MemoryCache, SQLiteCache, TTLCache
+
+
+class TestTTLCache:
+    def test_get_set(self):
+        cache = TTLCache(ttl=60)
+        assert cache.get("key") is None
+        assert cache.get("key", default=1) == 1
+        cache.set("key", "value")
+        assert cache.get("key") == "value"
+
+    def test_expired(self, mocker):
+        clock = mocker.patch("time.monotonic", return_value=0)
+        cache = TTLCache(ttl=60)
+        cache.set("key", "value")
+        cache.set("other", "value", ttl=120)
+        clock.return_value = 60
+        assert cache.get("key") is None
+        assert cache.get("other") == "value"
+
+    def test_get_or_load(self, mocker):
+        cache = TTLCache(ttl=60)
+        loader = mocker.Mock(return_value="value")
+        assert cache.get_or_load("key", loader) == "value"
+        assert cache.get_or_load("key", loader) == "value"
+        assert loader.call_count == 1
+
+    def test_invalidate(self):
+        cache = TTLCache(ttl=60)
+        cache.set("key", "value")
+        cache.set("other", "value")
+        cache.invalidate("key")
+        assert cache.get("key") is None
+        assert cache.get("other") == "value"
+        cache.invalidate()
+        assert len(cache) == 0
+
+    def test_stale_while_revalidate(self, mocker):
+        clock = mocker.patch("time.monotonic", return_value=0)
+        thread = mocker.patch("threading.Thread")
+        cache = TTLCache(ttl=60, stale_ttl=60)
+        loader = mocker.Mock(return_value="value")
+        cache.get_or_load("key", loader)
+
+        # stale entry is served while a refresh is scheduled
+        clock.return_value = 90
+        loader.return_value = "fresh"
+        assert cache.get_or_load("key", loader) == "value"
+        assert thread.call_count == 1
+        thread.call_args.kwargs["target"]()
+        assert cache.get_or_load("key", loader) == "fresh"
+
+        # past the stale period the entry is loaded right away
+        clock.return_value = 300
+        loader.return_value = "new"
+        assert cache.get_or_load("key", loader) == "new"
+        assert loader.call_count == 3
+
+    def test_maxsize(self):
+        cache = TTLCache(ttl=60, maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")  # "b" becomes the least recently used
+        cache.set("c", 3)
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+
+
+class TestTaggedCaches:
+    @pytest.fixture(params=["memory", "sqlite"])
+    def cache(self, request, tmp_path):
+        if request.param == "memory":
+            return MemoryCache(ttl=60, maxsize=10)
+        return SQLiteCache(path=str(tmp_path / "cache.sqlite"), ttl=60)
+
+    def test_get_set(self, cache):
+        assert cache.get("key") is None
+        cache.set("key", {"tickets": [{"key": "SUP-1"}]})
+        value = cache.get("key")
+        assert value == {"tickets": [{"key": "SUP-1"}]}
+
+        # cached values are not shared with callers
+        value["tickets"].clear()
+        assert cache.get("key") == {"tickets": [{"key": "SUP-1"}]}
+
+    def test_expired(self, cache, mocker):
+        mocker.patch("time.monotonic", return_value=0)
+        mocker.patch("time.time", return_value=0)
+        cache.set("key", 1, ttl=10)
+        mocker.patch("time.monotonic", return_value=10)
+        mocker.patch("time.time", return_value=10)
+        assert cache.get("key") is None
+
+    def test_invalidate_tags(self, cache):
+        cache.set("support", 1, tags=["board:support", "ticket:SUP-1"])
+        cache.set("ops", 2, tags=["board:ops"])
+        cache.set("untagged", 3)
+
+        cache.invalidate_tags("ticket:SUP-1", "board:other")
+        assert cache.get("support") is None
+        assert cache.get("ops") == 2
+        cache.invalidate_tags("board:ops")
+        assert cache.get("ops") is None
+        assert cache.get("untagged") == 3
+
+        cache.clear()
+        assert cache.get("untagged") is None
+
+    def test_sqlite_shared(self, tmp_path):
+        path = str(tmp_path / "cache.sqlite")
+        cache, other = SQLiteCache(path=path, ttl=60), SQLiteCache(path=path, ttl=60)
+        cache.set("key", 1, tags=["ticket:SUP-1"])
+        assert other.get("key") == 1
+        other.invalidate_tags("ticket:SUP-1")
+        assert cache.get("key") is None
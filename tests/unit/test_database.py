@@ -0,0 +1,56 @@
+import sqlalchemy
+
+from src.settings import database
+from src.settings.ctx import db
+
+
+class TestEngineOptions:
+    def test_pool_size(self, app):
+        config = {**app.config, "SQLALCHEMY_DATABASE_URI": "postgresql://db/tickets"}
+        config.update(JOBS_WORKERS=2, O365_HANDLER_WORKERS=8, O365_BACKFILL_WORKERS=4)
+        options = database.engine_options(config)
+        assert options["pool_size"] == 9
+        assert options["pool_pre_ping"] is True
+
+        config["DATABASE_POOL_SIZE"] = 3
+        assert database.engine_options(config)["pool_size"] == 3
+
+    def test_sqlite(self, app):
+        options = database.engine_options(app.config)
+        assert "pool_size" not in options
+        assert "connect_args" not in options
+
+    def test_overrides(self, app):
+        config = {**app.config, "SQLALCHEMY_DATABASE_URI": "postgresql://db/tickets"}
+        config["DATABASE_CONNECT_OPTIONS"] = {"connect_timeout": 5}
+        config["SQLALCHEMY_ENGINE_OPTIONS"] = {"pool_size": 1}
+        options = database.engine_options(config)
+        assert options["pool_size"] == 1
+        assert options["connect_args"] == {"connect_timeout": 5}
+
+
+class TestPoolMonitor:
+    def test_stats(self, app, mocker):
+        engine = sqlalchemy.create_engine(
+            "sqlite://", poolclass=sqlalchemy.pool.QueuePool, max_overflow=2
+        )
+        monitor = database.PoolMonitor(engine)
+        with engine.connect() as connection:
+            connection.execute(sqlalchemy.text("SELECT 1"))
+            assert monitor.stats()["checked_out"] == 1
+
+        stats = monitor.stats()
+        assert stats["checkouts"] == 1
+        assert stats["checked_out"] == 0
+        assert stats["peak"] == 1
+        assert stats["capacity"] == 7
+        assert stats["saturation"] == 1 / 7
+
+        log = mocker.patch.object(monitor, "log")
+        monitor.report()
+        log.info.assert_called_once()
+
+    def test_app_monitor(self, app):
+        db.session.execute(sqlalchemy.text("SELECT 1"))
+        db.session.commit()
+        assert app.extensions["pool_monitor"].stats()["checkouts"] >= 1
@@ -0,0 +1,45 @@
+import threading
+import time
+
+from src.utils.executors import KeyedExecutor
+
+
+class TestKeyedExecutor:
+    def test_ordered_per_key(self):
+        calls = []
+        with KeyedExecutor(max_workers=4) as executor:
+            futures = [
+                executor.submit(i % 2, lambda i=i: time.sleep(0.001) or calls.append(i))
+                for i in range(20)
+            ]
+        assert all(f.done() for f in futures)
+        assert [i for i in calls if i % 2 == 0] == list(range(0, 20, 2))
+        assert [i for i in calls if i % 2 == 1] == list(range(1, 20, 2))
+
+    def test_parallel_across_keys(self):
+        barrier = threading.Barrier(2, timeout=5)
+        with KeyedExecutor(max_workers=2) as executor:
+            futures = [executor.submit(key, barrier.wait) for key in ("a", "b")]
+        assert all(f.exception() is None for f in futures)
+
+    def test_exception(self):
+        with KeyedExecutor(max_workers=1) as executor:
+            failed = executor.submit("a", lambda: 1 / 0)
+            passed = executor.submit("a", lambda: "value")
+        assert isinstance(failed.exception(), ZeroDivisionError)
+        assert passed.result() == "value"
+
+    def test_max_pending(self):
+        event = threading.Event()
+        executor = KeyedExecutor(max_workers=1, max_pending=1)
+        executor.submit("a", event.wait)
+
+        submitted = threading.Event()
+        threading.Thread(
+            target=lambda: executor.submit("b", lambda: None) and submitted.set(),
+            daemon=True,
+        ).start()
+        assert not submitted.wait(0.1)
+        event.set()
+        assert submitted.wait(5)
+        executor.shutdown()
@@ -0,0 +1,61 @@
+import types
+
+from src.services.O365.filters import (
+    FilterChain,
+    JiraCommentNotificationFilter,
+    RecipientControlFilter,
+    SenderEmailBlacklistFilter,
+    SenderEmailDomainWhitelistedFilter,
+    ValidateMetadataFilter,
+)
+from src.services.O365.filters.base import OutlookMessageFilter
+
+
+class Reject(OutlookMessageFilter):
+    def __init__(self, cost, reject=False):
+        self.cost = cost
+        self.reject = reject
+        self.calls = 0
+
+    def apply(self, message):
+        self.calls += 1
+        return None if self.reject else message
+
+
+class TestFilterChain:
+    def test_cost_order(self, mocker):
+        filters = [
+            JiraCommentNotificationFilter(folder=mocker.Mock()),
+            RecipientControlFilter(email="mailbox@xyz.com"),
+            SenderEmailBlacklistFilter(blacklist=[]),
+            SenderEmailDomainWhitelistedFilter(whitelisted_domains=[]),
+            ValidateMetadataFilter(),
+        ]
+        chain = FilterChain(filters=filters)
+        assert [type(f) for f in chain.filters] == [
+            JiraCommentNotificationFilter,
+            SenderEmailBlacklistFilter,
+            SenderEmailDomainWhitelistedFilter,
+            ValidateMetadataFilter,
+            RecipientControlFilter,
+        ]
+
+    def test_short_circuit(self, app, mocker):
+        expensive, rejecting, cheap = Reject(2), Reject(1, reject=True), Reject(0)
+        chain = FilterChain(filters=[expensive, rejecting, cheap])
+        assert chain.apply(types.SimpleNamespace()) is None
+        assert (cheap.calls, rejecting.calls, expensive.calls) == (1, 1, 0)
+
+        report = chain.report()["Reject"]
+        assert report["calls"] == 2
+        assert report["rejections"] == 1
+
+        info = mocker.patch.object(app.logger, "info")
+        chain.log_report()
+        info.assert_called_once_with("Filter 'Reject': 2 calls, 1 rejections, 0.000s.")
+
+    def test_pass(self, app):
+        message = types.SimpleNamespace()
+        chain = FilterChain(filters=[Reject(0), Reject(1)])
+        assert chain.apply(message) is message
+        assert chain.apply(None) is None
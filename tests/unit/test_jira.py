@@ -1,9 +1,22 @@
+import base64
+import datetime
+import io
+
+import flask
 import jira
+import O365
 import pytest
 import requests
 import requests_mock
+import werkzeug.datastructures
 
-from src.services.jira import JiraSvc
+from src.models.jira import Board
+from src.services.jira import (
+    JiraSvc,
+    board_registry,
+    user_directory,
+    watchers_cache,
+)
 
 
 @pytest.fixture
@@ -76,3 +89,282 @@ class TestJiraSvc:
         user = jira.User({}, svc._session, raw={"self": {}, "accountId": "123"})
         assert svc.markdown.mention(email) == f"[{email};|mailto:{email}]"
         assert svc.markdown.mention(user) == "[~accountid:123]"
+
+    def test_add_attachment(self, app, svc, mocker):
+        upload = mocker.patch.object(jira.JIRA, "add_attachment")
+        file = werkzeug.datastructures.FileStorage(
+            stream=io.BytesIO(b"some dummy data"), filename="dummy.txt"
+        )
+        svc.add_attachment(issue="JIRA-123", attachment=file)
+        stream = upload.call_args.kwargs["attachment"]
+        assert upload.call_args.kwargs["filename"] == "dummy.txt"
+        assert stream.len == 15
+        assert stream.read() == b"some dummy data"
+
+        attachment = O365.message.MessageAttachment(
+            protocol=O365.MSGraphProtocol(), attachment={"name": "dummy.txt"}
+        )
+        attachment.content = base64.b64encode(b"some dummy data").decode()
+        svc.add_attachment(issue="JIRA-123", attachment=attachment)
+        stream = upload.call_args.kwargs["attachment"]
+        assert upload.call_args.kwargs["filename"] == "dummy.txt"
+        assert stream.read() == b"some dummy data"
+
+        # empty files are not uploaded
+        file = werkzeug.datastructures.FileStorage(stream=io.BytesIO(b""))
+        assert svc.add_attachment(issue="JIRA-123", attachment=file) is None
+        assert upload.call_count == 2
+
+    def test_add_attachments(self, app, svc, mocker):
+        mocker.patch("time.sleep")
+        failures = {"flaky.txt": 1, "broken.txt": 3}
+
+        def add_attachment(issue, attachment):
+            if failures.get(attachment.filename):
+                failures[attachment.filename] -= 1
+                raise jira.JIRAError(status_code=500)
+            return attachment.filename
+
+        mocker.patch.object(svc, "add_attachment", side_effect=add_attachment)
+        files = [
+            werkzeug.datastructures.FileStorage(io.BytesIO(b"data"), filename=name)
+            for name in ("dummy.txt", "flaky.txt", "broken.txt")
+        ]
+        uploads = svc.add_attachments(issue="JIRA-123", attachments=files)
+        assert [u.filename for u in uploads] == ["dummy.txt", "flaky.txt", "broken.txt"]
+        assert [u.ok for u in uploads] == [True, True, False]
+        assert uploads[1].attachment == "flaky.txt"
+
+        # permanent errors fail fast
+        add_attachment = mocker.patch.object(
+            svc, "add_attachment", side_effect=jira.JIRAError(status_code=413)
+        )
+        file = werkzeug.datastructures.FileStorage(io.BytesIO(b"data"), filename="big")
+        [upload] = svc.add_attachments(issue="JIRA-123", attachments=[file])
+        assert not upload.ok
+        assert add_attachment.call_count == 1
+
+        # retries read unseekable streams from the start again
+        content = []
+        failures["unseekable.txt"] = 1
+
+        def add_attachment(issue, attachment):
+            data = attachment.stream.read()
+            if failures["unseekable.txt"]:
+                failures["unseekable.txt"] -= 1
+                raise jira.JIRAError(status_code=500)
+            content.append(data)
+
+        mocker.patch.object(svc, "add_attachment", side_effect=add_attachment)
+        stream = io.BufferedReader(io.BytesIO(b"data"))
+        stream.seekable = lambda: False
+        file = werkzeug.datastructures.FileStorage(stream, filename="unseekable.txt")
+        [upload] = svc.add_attachments(issue="JIRA-123", attachments=[file])
+        assert upload.ok
+        assert content == [b"data"]
+        assert svc.add_attachments(issue="JIRA-123", attachments=[]) == []
+
+    @pytest.mark.parametrize(
+        "ex, transient",
+        [
+            (jira.JIRAError(status_code=500), True),
+            (jira.JIRAError(status_code=429), True),
+            (jira.JIRAError(), True),
+            (jira.JIRAError(status_code=403), False),
+            (jira.JIRAError(status_code=413), False),
+            (requests.ConnectionError(), True),
+            (requests.Timeout(), True),
+            (requests.exceptions.InvalidURL(), False),
+        ],
+    )
+    def test_is_transient_error(self, ex, transient):
+        assert JiraSvc.is_transient_error(ex) is transient
+
+    def test_iter_issues(self, svc, mocker):
+        pages = [
+            jira.client.ResultList(["a", "b"], _total=3),
+            jira.client.ResultList(["c"], _total=3),
+        ]
+        search = mocker.patch.object(svc, "search_issues", side_effect=pages)
+        assert list(svc.iter_issues("jql", batch_size=2)) == ["a", "b", "c"]
+        assert [c.kwargs["startAt"] for c in search.call_args_list] == [0, 2]
+
+        mocker.patch.object(
+            JiraSvc, "_is_cloud", new_callable=mocker.PropertyMock, return_value=True
+        )
+        pages = [
+            jira.client.ResultList(["a", "b"], _nextPageToken="next"),
+            jira.client.ResultList(["c"]),
+        ]
+        search = mocker.patch.object(svc, "enhanced_search_issues", side_effect=pages)
+        assert list(svc.iter_issues("jql", batch_size=2)) == ["a", "b", "c"]
+        tokens = [c.kwargs["nextPageToken"] for c in search.call_args_list]
+        assert tokens == [None, "next"]
+
+    def test_iter_issues_without_enhanced_search(self, svc, mocker, monkeypatch):
+        # the locked client predates the enhanced search of Jira Cloud
+        monkeypatch.delattr(jira.JIRA, "enhanced_search_issues", raising=False)
+        mocker.patch.object(
+            JiraSvc, "_is_cloud", new_callable=mocker.PropertyMock, return_value=True
+        )
+        pages = [
+            jira.client.ResultList(["a", "b"], _total=3),
+            jira.client.ResultList(["c"], _total=3),
+        ]
+        search = mocker.patch.object(svc, "search_issues", side_effect=pages)
+        assert list(svc.iter_issues("jql", batch_size=2)) == ["a", "b", "c"]
+        assert [c.kwargs["startAt"] for c in search.call_args_list] == [0, 2]
+
+    def test_jql_datetime(self, svc, mocker):
+        mocker.patch.object(svc, "myself", return_value={"timeZone": "Europe/Lisbon"})
+        value = datetime.datetime(2024, 7, 1, 10, 30)
+        assert svc.jql_datetime(value) == "2024/07/01 11:30"
+
+    def test_mount_pool(self, svc):
+        svc.mount_pool(pool_size=2, keep_alive=False)
+        adapter = svc._session.get_adapter("https://jira.atlassian.com")
+        assert adapter._pool_maxsize == 2
+        assert svc._session.headers["Connection"] == "close"
+
+
+class TestJiraSvcRegistry:
+    @pytest.fixture
+    def app(self, mocker):
+        info = {"versionNumbers": [1000, 0, 0], "deploymentType": "Cloud"}
+        mocker.patch.object(JiraSvc, "server_info", return_value=info)
+        app = flask.Flask(__name__)
+        app.config.update(
+            ATLASSIAN_URL="https://jira.atlassian.com",
+            ATLASSIAN_USER="test",
+            ATLASSIAN_API_TOKEN="xxx",
+            JIRA_POOL_SIZE=4,
+            JIRA_POOL_KEEP_ALIVE=True,
+        )
+        with app.app_context():
+            yield app
+        JiraSvc.reset()
+
+    def test_instance_is_shared(self, app):
+        svc = JiraSvc.instance()
+        assert JiraSvc.instance() is svc
+        adapter = svc._session.get_adapter("https://jira.atlassian.com")
+        assert adapter._pool_maxsize == 4
+
+    def test_reset(self, app):
+        svc = JiraSvc.instance()
+        JiraSvc.reset()
+        assert JiraSvc.instance() is not svc
+
+
+class TestBoardRegistry:
+    @pytest.fixture
+    def app(self):
+        app = flask.Flask(__name__)
+        app.config.update(
+            JIRA_BOARDS=["JIRA_SUPPORT_BOARD"],
+            JIRA_SUPPORT_BOARD="Support board",
+            JIRA_DEFAULT_BOARD="JIRA_SUPPORT_BOARD",
+            JIRA_BOARDS_TTL_IN_SECONDS=60,
+            JIRA_BOARDS_STALE_TTL_IN_SECONDS=60,
+        )
+        with app.app_context():
+            yield app
+        board_registry.invalidate()
+
+    def test_configs(self, app):
+        assert board_registry.configs() == (("support", "Support board", True),)
+
+    def test_boards_are_shared(self, app, svc, mocker):
+        raw = {"id": 1, "name": "Support board", "location": {"projectKey": "SUP"}}
+        board = Board(key="support", raw=raw, is_default=True, filter_id="10")
+        load = mocker.patch.object(board_registry, "load", return_value=[board])
+        assert svc.boards() == [board]
+        assert svc.boards() == [board]
+        assert load.call_count == 1
+
+        board_registry.invalidate()
+        svc.boards()
+        assert load.call_count == 2
+
+    def test_jql_query_from_boards(self, app, svc, mocker):
+        raw = {"id": 1, "name": "Support board", "location": {"projectKey": "SUP"}}
+        board = Board(key="support", raw=raw, is_default=True, filter_id="10")
+        mocker.patch.object(board_registry, "load", return_value=[board])
+        configuration = mocker.patch.object(svc, "board_configuration")
+        query = svc.create_jql_query(board_keys=["support"])
+        assert "filter in (10)" in query
+        configuration.assert_not_called()
+
+
+class TestUserDirectory:
+    @pytest.fixture
+    def app(self):
+        app = flask.Flask(__name__)
+        app.config.update(
+            JIRA_MAX_WORKERS=4,
+            JIRA_USERS_CACHE_SIZE=10,
+            JIRA_USERS_TTL_IN_SECONDS=60,
+            JIRA_USERS_NEGATIVE_TTL_IN_SECONDS=60,
+        )
+        with app.app_context():
+            yield app
+        user_directory.invalidate()
+
+    def test_resolve_users(self, app, svc, mocker):
+        user = jira.User({}, svc._session, raw={"self": {}, "accountId": "123"})
+        search = mocker.patch.object(
+            svc,
+            "search_users",
+            side_effect=lambda query, **_: [user] if query == "user@xyz.com" else [],
+        )
+        emails = ["user@xyz.com", "unknown@xyz.com"]
+        assert svc.resolve_users(emails) == {
+            "user@xyz.com": user,
+            "unknown@xyz.com": None,
+        }
+        assert search.call_count == 2
+
+        # both known and unknown users are cached
+        assert svc.resolve_users(["USER@xyz.com", *emails])["USER@xyz.com"] == user
+        assert search.call_count == 2
+
+        user_directory.invalidate("unknown@xyz.com")
+        svc.resolve_users(emails)
+        assert search.call_count == 3
+
+
+class TestIssuesWatchers:
+    @pytest.fixture
+    def app(self):
+        app = flask.Flask(__name__)
+        app.config.update(
+            JIRA_MAX_WORKERS=4,
+            JIRA_WATCHERS_TTL_IN_SECONDS=60,
+            JIRA_WATCHERS_TIMEOUT_IN_SECONDS=5,
+        )
+        with app.app_context():
+            yield app
+        watchers_cache.invalidate()
+
+    @staticmethod
+    def make_issue(mocker, key, updated="2023-01-01T00:00:00.000+0000"):
+        return mocker.Mock(key=key, raw={"fields": {"updated": updated}})
+
+    def test_issues_watchers(self, app, svc, mocker):
+        def watchers(key):
+            if key == "JIRA-2":
+                raise jira.JIRAError(status_code=500)
+            return mocker.Mock(raw={"watchers": [{"accountId": key}]})
+
+        get = mocker.patch.object(svc, "watchers", side_effect=watchers)
+        issues = [self.make_issue(mocker, "JIRA-1"), self.make_issue(mocker, "JIRA-2")]
+
+        # failed calls are left out
+        assert svc.issues_watchers(issues) == {"JIRA-1": [{"accountId": "JIRA-1"}]}
+        assert get.call_count == 2
+
+        # cached until the issue is updated
+        svc.issues_watchers(issues[:1])
+        assert get.call_count == 2
+        svc.issues_watchers([self.make_issue(mocker, "JIRA-1", updated="later")])
+        assert get.call_count == 3
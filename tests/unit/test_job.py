@@ -0,0 +1,139 @@
+import datetime
+
+import pytest
+
+from src.app import create_app
+from src.models.job import Job
+from src.services.job import JobSvc
+from src.services.ticket import TicketSvc
+from src.settings.ctx import db
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+# the category of the created tickets
+with_categories = pytest.mark.parametrize(
+    "jira_svc", [{"allowed_categories": ["general"]}], indirect=True
+)
+
+
+class TestJobSvc:
+    def test_submit(self, app):
+        job = JobSvc.create()
+        assert job.status == "pending"
+
+        def work(progress):
+            progress("working", key="JIRA-123")
+
+        JobSvc.submit(job_id=job.id, func=work).result()
+        db.session.refresh(job)
+        assert job.status == "done"
+        assert job.key == "JIRA-123"
+
+    def test_submit_failure(self, app):
+        def work(progress):
+            raise ValueError("something went wrong")
+
+        job = JobSvc.create()
+        JobSvc.submit(job_id=job.id, func=work).result()
+        db.session.refresh(job)
+        assert job.status == "failed"
+        assert job.error == "something went wrong"
+
+    def test_fail_stale(self, app):
+        stale = datetime.datetime.utcnow() - datetime.timedelta(hours=2)
+        jobs = [
+            Job(status="running", updated_at=stale),
+            Job(status="pending", updated_at=stale),
+            Job(status="done", updated_at=stale),
+            Job(status="running"),
+        ]
+        db.session.add_all(jobs)
+        db.session.commit()
+
+        assert JobSvc.fail_stale() == 2
+        statuses = [db.session.get(Job, job.id).status for job in jobs]
+        assert statuses == ["failed", "failed", "done", "running"]
+        assert jobs[0].error == "The job was interrupted."
+
+        # jobs are failed as they are looked up too
+        job = Job(status="running", updated_at=stale)
+        db.session.add(job)
+        db.session.commit()
+        assert JobSvc.get(job_id=job.id).status == "failed"
+
+    def test_fail_stale_on_startup(self, tmp_path):
+        configs = {"SQLALCHEMY_DATABASE_URI": f"sqlite:///{tmp_path}/jobs.db"}
+        app = create_app(config_name="testing", dotenv=False, configs=configs)
+        with app.app_context():
+            db.create_all()
+            stale = datetime.datetime.utcnow() - datetime.timedelta(hours=2)
+            job = JobSvc.create(status="running", updated_at=stale)
+            job_id = job.id
+
+        app = create_app(config_name="testing", dotenv=False, configs=configs)
+        with app.app_context():
+            assert db.session.get(Job, job_id).status == "failed"
+
+
+class TestTicketJobs:
+    @with_categories
+    def test_create_async(self, client, jira_svc, mocker):
+        def create(progress, **_):
+            progress("creating issue", key="JIRA-123")
+
+        mocker.patch.object(TicketSvc, "create", side_effect=create)
+        futures = mocker.spy(JobSvc, "submit")
+        response = client.post(
+            "/tickets/?async=true",
+            json={
+                "title": "Some title",
+                "body": "Some body",
+                "reporter": "user@xyz.com",
+                "board": "support",
+                "category": "general",
+            },
+        )
+        assert response.status_code == 202
+        assert response.json["status"] == "pending"
+        location = response.headers["Location"]
+        assert location == f"/tickets/jobs/{response.json['id']}"
+
+        futures.spy_return.result()
+        response = client.get(location)
+        assert response.status_code == 200
+        assert response.json["status"] == "done"
+        assert response.json["key"] == "JIRA-123"
+
+    @with_categories
+    def test_create_with_failed_attachments(self, client, jira_svc, mocker):
+        def create(progress, **_):
+            progress("creating issue", key="JIRA-123")
+            progress("uploading attachments", error="Failed to add attachments")
+            return {"key": "JIRA-123"}
+
+        mocker.patch.object(TicketSvc, "create", side_effect=create)
+        futures = mocker.spy(JobSvc, "submit")
+        body = {
+            "title": "Some title",
+            "body": "Some body",
+            "reporter": "user@xyz.com",
+            "board": "support",
+            "category": "general",
+        }
+        response = client.post("/tickets/", json=body)
+        assert response.status_code == 201
+        assert response.headers["Warning"] == '199 - "Failed to add attachments"'
+
+        response = client.post("/tickets/?async=true", json=body)
+        futures.spy_return.result()
+        response = client.get(response.headers["Location"])
+        assert response.json["status"] == "done"
+        assert response.json["error"] == "Failed to add attachments"
+
+    def test_job_not_found(self, client):
+        response = client.get("/tickets/jobs/unknown")
+        assert response.status_code == 404
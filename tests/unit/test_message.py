@@ -0,0 +1,120 @@
+import types
+
+import requests
+
+from src.models.ticket import Ticket
+from src.services.jira import JiraSvc
+from src.services.O365.filters import RecipientControlFilter, ValidateMetadataFilter
+from src.services.O365.handlers.jira import JiraNotificationHandler
+from src.services.O365.message import MessageContext, ParsedMessage
+from src.services.ticket import TicketSvc
+from src.settings.ctx import db
+from src.utils.executors import KeyedExecutor
+
+BODY = (
+    "<html><head>"
+    '<meta name="message" content="relay jira comment">'
+    "</head><body><p>Some body</p></body></html>"
+)
+UNIQUE_BODY = '<html><body><div>{"ticket": "JIRA-1",\n"id": "1"}</div></body></html>'
+
+
+def message(**kwargs):
+    values = {"body_type": "HTML", "body": BODY, "unique_body": UNIQUE_BODY}
+    return types.SimpleNamespace(**{**values, **kwargs})
+
+
+class TestParsedMessage:
+    def test_parse_once(self, app, mocker):
+        parsed = ParsedMessage(message())
+        parse = mocker.spy(parsed, "parse")
+        assert parsed.get_body_soup() is parsed.body_soup
+        assert parsed.metadata == {"relay jira comment"}
+        assert parsed.json == {"ticket": "JIRA-1", "id": "1"}
+        assert parsed.text == '{"ticket": "JIRA-1",\n"id": "1"}'
+        assert parse.call_count == 2
+
+    def test_attributes(self, app):
+        parsed = ParsedMessage(message(subject="Some subject"))
+        assert parsed.subject == "Some subject"
+
+    def test_not_html(self, app):
+        parsed = ParsedMessage(message(body_type="text", body="Some body"))
+        assert parsed.body_soup is None
+        assert parsed.metadata == set()
+
+    def test_parser_not_found(self, app):
+        parsed = ParsedMessage(message(), parser="unknown")
+        assert parsed.metadata == {"relay jira comment"}
+        assert parsed.parser == "html.parser"
+
+    def test_validate_metadata(self, app, mocker):
+        history = mocker.patch(
+            "src.services.O365.handlers.jira.JiraNotificationHandler"
+            ".add_message_to_history"
+        )
+        mocker.patch("src.services.ticket.TicketSvc.find_one", return_value=None)
+        parsed = ParsedMessage(message(conversation_id="1"))
+        assert ValidateMetadataFilter().apply(parsed) is None
+        history.assert_called_once()
+
+        parsed = ParsedMessage(message(body="<p>Some body</p>"))
+        assert ValidateMetadataFilter().apply(parsed) is parsed
+
+
+class TestMessageContext:
+    def test_ticket(self, app, mocker):
+        mocker.patch.object(JiraSvc, "instance")
+        db.session.add(Ticket(key="JIRA-1", reporter="user@xyz.com"))
+        db.session.commit()
+        find_one = mocker.spy(TicketSvc, "find_one")
+
+        context = MessageContext(conversation_id="1")
+        assert context.ticket is None
+        assert context.ticket is None
+        assert find_one.call_count == 1
+
+        TicketSvc.update(ticket_id=1, outlook_conversation_id="1")
+        context.invalidate()
+        assert context.ticket.key == "JIRA-1"
+
+    def test_issue_exists(self, app, mocker):
+        find_one = mocker.patch.object(TicketSvc, "find_one", return_value={})
+        context = MessageContext(conversation_id="1")
+        assert context.issue_exists("JIRA-1") is True
+        assert context.issue_exists("JIRA-1") is True
+        find_one.assert_called_once_with(key="JIRA-1", mirror=False)
+
+    def test_shared_lookup(self, app, mocker):
+        find_one = mocker.patch.object(TicketSvc, "find_one", return_value=None)
+        parsed = ParsedMessage(message(conversation_id="1"))
+        mocker.patch.object(parsed, "parse")
+        parsed.__dict__["metadata"] = {"jira ticket notification"}
+        mocker.patch(
+            "src.services.O365.handlers.jira.JiraNotificationHandler"
+            ".add_message_to_history"
+        )
+
+        recipient = "mailbox@xyz.com"
+        parsed.sender = types.SimpleNamespace(address="user@xyz.com")
+        parsed.cc = parsed.bcc = []
+        parsed.to = [types.SimpleNamespace(address=recipient)]
+        assert RecipientControlFilter(email=recipient).apply(parsed) is parsed
+        assert ValidateMetadataFilter().apply(parsed) is None
+        assert find_one.call_count == 1
+
+
+class TestJiraNotificationHandler:
+    def test_dispatch(self, app, mocker):
+        executor = mocker.Mock(spec=KeyedExecutor)
+        handler = JiraNotificationHandler(
+            parent=mocker.Mock(), namespace=mocker.Mock(), executor=executor
+        )
+        get = mocker.patch.object(handler, "get_conversation_id", return_value="c1")
+        handler.dispatch(message_id="m1")
+        assert executor.submit.call_args.args[0] == "c1"
+
+        # messages are still processed when their conversation is unknown
+        get.side_effect = requests.HTTPError("503 Service Unavailable")
+        handler.dispatch(message_id="m2")
+        assert executor.submit.call_args.args[0] == "m2"
@@ -0,0 +1,95 @@
+import pytest
+import sqlalchemy
+
+from src import migrations
+from src.models.ticket import TicketMessage
+from src.settings.ctx import db
+
+LEGACY_TICKETS = """
+CREATE TABLE tickets (
+    id INTEGER PRIMARY KEY,
+    key VARCHAR NOT NULL UNIQUE,
+    outlook_message_id VARCHAR UNIQUE,
+    outlook_conversation_id VARCHAR UNIQUE,
+    outlook_messages_id VARCHAR,
+    created_at DATETIME,
+    updated_at DATETIME,
+    reporter VARCHAR NOT NULL
+)
+"""
+
+
+class TestMigrations:
+    def test_versions(self, app):
+        names = [name for name, _ in migrations.versions()]
+        assert names == sorted(names)
+        assert names[0] == "v0001_create_tables"
+
+    def test_upgrade_legacy(self, app):
+        db.drop_all()
+        with db.engine.begin() as connection:
+            connection.execute(sqlalchemy.text(LEGACY_TICKETS))
+            connection.execute(
+                sqlalchemy.text(
+                    "INSERT INTO tickets (id, key, reporter, outlook_messages_id, "
+                    "updated_at) VALUES (1, 'JIRA-1', 'user@xyz.com', 'm1,m2,m1', "
+                    "'2024-01-01 00:00:00')"
+                )
+            )
+
+        result = app.test_cli_runner().invoke(args=["db", "upgrade"])
+        assert result.exit_code == 0
+        assert migrations.pending(db.engine) == []
+
+        messages = TicketMessage.query.order_by(TicketMessage.id).all()
+        assert [m.message_id for m in messages] == ["m1", "m2"]
+        assert [m.direction for m in messages] == [TicketMessage.INBOUND, None]
+
+        indexes = sqlalchemy.inspect(db.engine).get_indexes("tickets")
+        assert {"ix_tickets_reporter_created_at", "ix_tickets_updated_at"} <= {
+            index["name"] for index in indexes
+        }
+
+        # applying again is a no-op
+        assert migrations.upgrade(db.engine) == []
+
+    def test_upgrade_target(self, app):
+        db.drop_all()
+        assert migrations.upgrade(db.engine, target="v0001_create_tables") == [
+            "v0001_create_tables"
+        ]
+        assert len(migrations.pending(db.engine)) == len(migrations.versions()) - 1
+
+        result = app.test_cli_runner().invoke(args=["db", "status"])
+        assert "[x] v0001_create_tables" in result.output
+
+        # the next migrations are left to apply on a new database
+        inspector = sqlalchemy.inspect(db.engine)
+        assert not inspector.has_table("ticket_messages")
+        assert not inspector.has_table("issues_mirror")
+        indexes = {index["name"] for index in inspector.get_indexes("tickets")}
+        assert "ix_tickets_updated_at" not in indexes
+
+        # an applied target applies nothing else
+        assert migrations.upgrade(db.engine, target="v0001_create_tables") == []
+
+    def test_upgrade_unknown_target(self, app):
+        db.drop_all()
+        with pytest.raises(ValueError):
+            migrations.upgrade(db.engine, target="v9999_unknown")
+        assert migrations.applied(db.engine) == set()
+
+        result = app.test_cli_runner().invoke(args=["db", "upgrade", "-t", "unknown"])
+        assert result.exit_code != 0
+
+    def test_upgrade_matches_models(self, app):
+        db.drop_all()
+        migrations.upgrade(db.engine)
+
+        inspector = sqlalchemy.inspect(db.engine)
+        for table in db.metadata.sorted_tables:
+            columns = {column["name"] for column in inspector.get_columns(table.name)}
+            assert set(table.columns.keys()) <= columns
+
+            indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+            assert {index.name for index in table.indexes} <= indexes
@@ -0,0 +1,162 @@
+import datetime
+
+import pytest
+
+from src.models.issue import MirroredIssue
+from src.models.ticket import Ticket
+from src.services.checkpoint import CheckpointSvc
+from src.services.mirror import IssueMirrorSvc
+from src.services.O365.message import MessageContext
+from src.services.ticket import TicketSvc
+from src.settings.ctx import db
+
+
+def make_issue(mocker, key, updated="2024-01-01T10:00:00.000+0000", **fields):
+    raw = {
+        "id": key.split("-")[1],
+        "key": key,
+        "fields": {
+            "summary": f"Issue {key}",
+            "project": {"key": key.split("-")[0]},
+            "status": {"name": "Open"},
+            "labels": ["ticket"],
+            "created": "2024-01-01T09:00:00.000+0000",
+            "updated": updated,
+            **fields,
+        },
+        "renderedFields": {"description": "<p>body</p>"},
+    }
+    return mocker.Mock(id=raw["id"], key=key, raw=raw)
+
+
+@pytest.fixture(autouse=True)
+def mirror_enabled(app):
+    app.config["JIRA_MIRROR_ENABLED"] = True
+
+
+class TestIssueMirrorSvc:
+    def test_sync(self, jira_svc, mocker):
+        issues = [make_issue(mocker, "SUP-1"), make_issue(mocker, "SUP-2")]
+        jira_svc.iter_issues.return_value = iter(issues)
+        assert IssueMirrorSvc.sync(svc=jira_svc) == 2
+        assert jira_svc.iter_issues.call_args.args[0] == (
+            "labels in (ticket) ORDER BY updated ASC"
+        )
+        assert IssueMirrorSvc.is_fresh() is True
+
+        mirrored = db.session.get(MirroredIssue, "SUP-1")
+        assert mirrored.project == "SUP"
+        assert mirrored.updated == datetime.datetime(2024, 1, 1, 10)
+        assert mirrored.raw["renderedFields"] == {"description": "<p>body</p>"}
+
+        # only issues updated since are fetched next
+        updated = make_issue(mocker, "SUP-1", updated="2024-01-02T10:00:00.000+0000")
+        jira_svc.iter_issues.return_value = iter([updated])
+        assert IssueMirrorSvc.sync(svc=jira_svc) == 1
+        assert 'updated >= "2024/01/01 10:00"' in jira_svc.iter_issues.call_args.args[0]
+        assert CheckpointSvc.get(IssueMirrorSvc.WATERMARK) == "2024-01-02T10:00:00"
+        assert MirroredIssue.query.count() == 2
+
+    def test_is_fresh(self, app, jira_svc, mocker):
+        assert IssueMirrorSvc.is_fresh() is False
+        synced_at = datetime.datetime.utcnow() - datetime.timedelta(minutes=10)
+        CheckpointSvc.set(name=IssueMirrorSvc.SYNCED_AT, value=synced_at.isoformat())
+        assert IssueMirrorSvc.is_fresh() is False
+
+        app.config["JIRA_MIRROR_MAX_STALENESS_IN_SECONDS"] = 3600
+        assert IssueMirrorSvc.is_fresh() is True
+        assert IssueMirrorSvc.supports({"boards": ["support"], "key": None}) is True
+        assert IssueMirrorSvc.supports({"watcher": "user@xyz.com"}) is False
+
+        app.config["JIRA_MIRROR_ENABLED"] = False
+        assert IssueMirrorSvc.is_fresh() is False
+
+    def test_search(self, jira_svc, mocker):
+        jira_svc.iter_issues.return_value = iter(
+            [
+                make_issue(mocker, "SUP-1"),
+                make_issue(mocker, "SUP-2", status={"name": "Done"}),
+                make_issue(mocker, "OPS-1"),
+                make_issue(mocker, "SUP-3", labels=["other"]),
+            ]
+        )
+        IssueMirrorSvc.sync(svc=jira_svc)
+
+        def keys(**kwargs):
+            return [i.key for i in IssueMirrorSvc.search(labels=["ticket"], **kwargs)]
+
+        assert keys(projects=["SUP"], sort="created") == ["SUP-1", "SUP-2"]
+        assert keys(projects=["SUP"], status="done") == ["SUP-2"]
+        assert sorted(keys(key=["SUP-1", "OPS-1"])) == ["OPS-1", "SUP-1"]
+        assert keys(summary="ops") == ["OPS-1"]
+        assert keys(limit=1) == ["OPS-1"]
+
+    def test_search_page(self, jira_svc, mocker):
+        jira_svc.iter_issues.return_value = iter(
+            [
+                make_issue(mocker, "SUP-1"),
+                make_issue(mocker, "SUP-2", labels=["other"]),
+                make_issue(mocker, "SUP-3"),
+                make_issue(mocker, "SUP-4"),
+            ]
+        )
+        IssueMirrorSvc.sync(svc=jira_svc)
+
+        pages = []
+        token = None
+        while True:
+            issues, token = IssueMirrorSvc.search_page(
+                limit=2, token=token, labels=["ticket"]
+            )
+            pages.append([i.key for i in issues])
+            if token is None:
+                break
+        # the token skips the rows filtered out on previous pages
+        assert pages == [["SUP-1", "SUP-3"], ["SUP-4"]]
+
+        for limit in (0, -1):
+            with pytest.raises(ValueError):
+                IssueMirrorSvc.search_page(limit=limit)
+
+    def test_find_by(self, jira_svc, mocker):
+        db.session.add(Ticket(key="SUP-1", reporter="user@xyz.com"))
+        db.session.commit()
+        jira_svc.iter_issues.return_value = iter([make_issue(mocker, "SUP-1")])
+        IssueMirrorSvc.sync(svc=jira_svc)
+
+        tickets = TicketSvc.find_by(boards=["support"], sort="created")
+        assert [t["key"] for t in tickets] == ["SUP-1"]
+        assert tickets[0]["summary"] == "Issue SUP-1"
+        jira_svc.search_page.assert_not_called()
+
+        # empty filters the mirror does not handle are left out
+        tickets = TicketSvc.find_by(boards=["support"], watcher="", category="")
+        assert [t["key"] for t in tickets] == ["SUP-1"]
+        jira_svc.search_page.assert_not_called()
+
+        # filters the mirror does not handle go to Jira
+        jira_svc.search_page.return_value = ([], None)
+        assert TicketSvc.find_by(watcher="user@xyz.com") == []
+        jira_svc.search_page.assert_called_once()
+
+        # so do existence checks, the issue having been deleted since
+        assert TicketSvc.find_one(key="SUP-1") is not None
+        assert MessageContext(conversation_id="1").issue_exists("SUP-1") is False
+        assert jira_svc.search_page.call_count == 2
+
+        TicketSvc.delete(ticket_id=Ticket.query.one().id)
+        assert MirroredIssue.query.count() == 0
+
+    def test_search_endpoint(self, app, jira_svc, mocker):
+        db.session.add(Ticket(key="SUP-1", reporter="user@xyz.com"))
+        db.session.commit()
+        jira_svc.iter_issues.return_value = iter([make_issue(mocker, "SUP-1")])
+        IssueMirrorSvc.sync(svc=jira_svc)
+        client = app.test_client()
+
+        # searches all the boards when none is given, as when all are given
+        response = client.get("/tickets/")
+        assert [t["key"] for t in response.json] == ["SUP-1"]
+        response = client.get("/tickets/?boards=support")
+        assert [t["key"] for t in response.json] == ["SUP-1"]
+        jira_svc.search_page.assert_not_called()
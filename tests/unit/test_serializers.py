@@ -0,0 +1,134 @@
+import copy
+
+import pytest
+from marshmallow import Schema, fields, post_dump
+
+from src.schemas.serializers.compiled import (
+    CompiledSchema,
+    _compile_schema,
+    compile_schema,
+)
+from src.schemas.serializers.jira.Issue import IssueSchema
+
+
+def make_user(name):
+    return {
+        "accountId": f"id-{name}",
+        "avatarUrls": {"16x16": f"https://avatar/{name}", "48x48": "ignored"},
+        "displayName": name.capitalize(),
+        "emailAddress": f"{name}@xyz.com",
+        "timeZone": "UTC",
+    }
+
+
+def make_ticket(i):
+    comment = {
+        "author": make_user("agent"),
+        "body": f"comment {i}",
+        "created": "2024-01-01T10:00:00.000+0000",
+        "updated": "2024-01-01T10:00:00.000+0000",
+    }
+    return {
+        "id": str(10000 + i),
+        "key": f"SUP-{i}",
+        "summary": f"Issue {i}",
+        "description": {"type": "doc", "content": []},
+        "created": "2024-01-01T09:00:00.000+0000",
+        "updated": "2024-01-01T10:00:00.000+0000",
+        "assignee": make_user("agent") if i % 2 else None,
+        "reporter": {"emailAddress": "user@xyz.com"},
+        "status": {"name": "Open", "statusCategory": {"key": "new", "colorName": 7}},
+        "labels": ["ticket", "general", 3],
+        "url": f"https://jira.atlassian.com/browse/SUP-{i}",
+        "issuetype": {"name": "Task", "iconUrl": "https://icon"},
+        "project": {"key": "SUP", "name": "Support"},
+        "comment": {"comments": [comment, comment], "total": 2},
+        "attachment": [
+            {
+                "filename": "file.txt",
+                "content": "https://content",
+                "mimeType": "text/plain",
+                "size": "42",
+                "author": make_user("user"),
+                "created": "2024-01-01T09:00:00.000+0000",
+            }
+        ],
+        "watchers": [make_user("user"), None],
+        "rendered": {"description": "<p>body</p>", "comment": None},
+        "customfield_10000": "ignored",
+    }
+
+
+TICKETS = [
+    make_ticket(1),
+    make_ticket(2),
+    {"key": "SUP-3"},
+    {"key": "SUP-4", "comment": None, "status": {"statusCategory": None}},
+    {"key": "SUP-5", "labels": None, "watchers": None, "attachment": []},
+]
+
+
+class TestCompiledSchema:
+    @pytest.mark.parametrize("ticket", TICKETS)
+    def test_identical_output(self, ticket):
+        expected = IssueSchema().dump(copy.deepcopy(ticket))
+        assert compile_schema(IssueSchema).dump(ticket) == expected
+        assert list(compile_schema(IssueSchema).dump(ticket)) == list(expected)
+
+    def test_many(self):
+        expected = IssueSchema(many=True).dump(TICKETS)
+        assert compile_schema(IssueSchema).dump(TICKETS, many=True) == expected
+        assert compile_schema(IssueSchema).dump([], many=True) == []
+
+    def test_only(self):
+        only = ("key", "title", "comments")
+        expected = IssueSchema(only=only).dump(TICKETS[0])
+        compiled = compile_schema(IssueSchema, only=only)
+        assert compiled.dump(TICKETS[0]) == expected
+        assert list(expected) == ["key", "title", "comments"]
+        assert compile_schema(IssueSchema, only=only) is compiled
+
+        # the same fields in another order, or repeated, share the same plan
+        reordered = ["comments", "key", "title", "key"]
+        assert compile_schema(IssueSchema, only=reordered) is compiled
+        assert list(compiled.dump(TICKETS[0])) == ["key", "title", "comments"]
+
+    def test_bounded_cache(self):
+        names = list(IssueSchema._declared_fields)
+        for i in range(len(names)):
+            for j in range(i + 1, len(names)):
+                compile_schema(IssueSchema, only=[names[i], names[j]])
+        assert _compile_schema.cache_info().currsize <= 64
+
+    def test_fallbacks(self):
+        class HookSchema(Schema):
+            name = fields.String()
+
+            @post_dump
+            def upper(self, data, **_):
+                return {k: v.upper() for k, v in data.items()}
+
+        class MixedSchema(Schema):
+            name = fields.String(dump_default="anonymous")
+            count = fields.Integer(as_string=True)
+            created = fields.DateTime()
+            items = fields.Method("get_items")
+            hooked = fields.Nested(HookSchema)
+
+            def get_items(self, obj):
+                return ["a", "b"]
+
+        data = {"count": 2, "hooked": {"name": "x"}}
+        compiled = CompiledSchema(MixedSchema())
+        assert compiled.dump(data) == MixedSchema().dump(data)
+        assert CompiledSchema(HookSchema()).fallback
+
+    def test_dict_attributes(self):
+        class ItemsSchema(Schema):
+            items = fields.String()
+            name = fields.String(attribute="nested.keys")
+
+        # marshmallow falls back to the attributes of dictionaries
+        data = {"nested": {"keys": "value"}}
+        expected = ItemsSchema().dump(data)
+        assert CompiledSchema(ItemsSchema()).dump(data) == expected
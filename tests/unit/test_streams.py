@@ -0,0 +1,47 @@
+import base64
+import io
+
+import pytest
+
+from src.utils.streams import Base64Reader, SizedReader
+
+
+class TestBase64Reader:
+    @pytest.mark.parametrize("data", [b"", b"a", b"ab", b"abc", bytes(range(256))])
+    def test_read(self, data):
+        reader = Base64Reader(base64.b64encode(data).decode())
+        assert reader.len == len(data)
+        assert reader.read() == data
+        assert reader.len == 0
+
+    @pytest.mark.parametrize("size", [1, 2, 4, 5, 7, 1000])
+    def test_read_chunks(self, size):
+        data = bytes(range(256)) * 3
+        reader = Base64Reader(base64.b64encode(data))
+        chunks = iter(lambda: reader.read(size), b"")
+        assert b"".join(chunks) == data
+
+    def test_seek(self):
+        reader = Base64Reader(base64.encodebytes(b"some dummy data"))
+        assert reader.read(4) == b"some"
+        assert reader.seek(1, io.SEEK_CUR) == 5
+        assert reader.read(5) == b"dummy"
+        reader.seek(0)
+        assert reader.read() == b"some dummy data"
+
+
+class TestSizedReader:
+    def test_read(self):
+        reader = SizedReader(io.BytesIO(b"some dummy data"))
+        assert reader.len == 15
+        assert reader.read(5) == b"some "
+        assert reader.len == 10
+        reader.seek(0)
+        assert reader.read() == b"some dummy data"
+
+    def test_unseekable(self, mocker):
+        stream = io.BytesIO(b"some dummy data")
+        mocker.patch.object(stream, "seekable", return_value=False)
+        reader = SizedReader(stream)
+        assert reader.len == 15
+        assert reader.read() == b"some dummy data"
@@ -0,0 +1,158 @@
+import datetime
+
+import jira
+import pytest
+
+from src.models.issue import MirroredIssue
+from src.models.ticket import Ticket, TicketMessage
+from src.services.checkpoint import CheckpointSvc
+from src.services.jira import JiraSvc, ProxyJIRA
+from src.services.sync import TicketSyncSvc
+from src.settings.ctx import db
+
+
+def make_issue(mocker, key, updated="2024-01-01T10:00:00.000+0000"):
+    return mocker.Mock(key=key, raw={"key": key, "fields": {"updated": updated}})
+
+
+@pytest.fixture
+def jira_svc(app, mocker):
+    svc = mocker.Mock(spec=JiraSvc)
+    svc.create_jql_query.side_effect = ProxyJIRA.create_jql_query
+    svc.jql_datetime.return_value = "2024/01/01 10:00"
+    svc.iter_issues.return_value = iter([])
+    svc.search_issues.return_value = []
+    return svc
+
+
+@pytest.fixture
+def tickets(app):
+    created_at = datetime.datetime(2023, 12, 1)
+    tickets = [
+        Ticket(
+            key=f"SUP-{i}",
+            reporter="user@xyz.com",
+            created_at=created_at,
+            updated_at=created_at,
+        )
+        for i in range(1, 4)
+    ]
+    db.session.add_all(tickets)
+    db.session.commit()
+    return tickets
+
+
+class TestTicketSyncSvc:
+    def test_sync_updated(self, app, jira_svc, tickets, mocker):
+        jira_svc.iter_issues.return_value = iter(
+            [
+                make_issue(mocker, "SUP-1"),
+                make_issue(mocker, "SUP-2", updated="2024-01-02T10:00:00.000+0000"),
+            ]
+        )
+        jira_svc.search_issues.return_value = [
+            mocker.Mock(key=ticket.key) for ticket in tickets
+        ]
+        stats = TicketSyncSvc.sync(svc=jira_svc, batch_size=1)
+        assert stats["updated"] == 2
+        assert stats["deleted"] == 0
+
+        jql = jira_svc.iter_issues.call_args.args[0]
+        assert jql.endswith("ORDER BY updated ASC")
+        assert "updated >=" not in jql
+        assert db.session.get(Ticket, tickets[1].id).updated_at == (
+            datetime.datetime(2024, 1, 2, 10)
+        )
+        assert db.session.get(Ticket, tickets[2].id).updated_at == (
+            datetime.datetime(2023, 12, 1)
+        )
+        assert CheckpointSvc.get(TicketSyncSvc.WATERMARK) == "2024-01-02T10:00:00"
+
+        # only issues updated since are fetched next
+        jira_svc.iter_issues.return_value = iter([])
+        TicketSyncSvc.sync(svc=jira_svc)
+        assert 'updated >= "2024/01/01 10:00"' in jira_svc.iter_issues.call_args.args[0]
+
+    def test_sync_updated_keeps_newer_local_times(self, app, jira_svc, tickets, mocker):
+        jira_svc.iter_issues.return_value = iter([make_issue(mocker, "SUP-1")])
+        jira_svc.search_issues.return_value = [
+            mocker.Mock(key=ticket.key) for ticket in tickets
+        ]
+        Ticket.query.filter_by(key="SUP-1").update(
+            {"updated_at": datetime.datetime(2024, 2, 1)}
+        )
+        db.session.commit()
+
+        assert TicketSyncSvc.sync(svc=jira_svc)["updated"] == 0
+        ticket = Ticket.query.filter_by(key="SUP-1").one()
+        assert ticket.updated_at == datetime.datetime(2024, 2, 1)
+
+    def test_sync_deleted(self, app, jira_svc, tickets, mocker):
+        db.session.add(TicketMessage(ticket_id=tickets[0].id, message_id="msg-1"))
+        db.session.add(MirroredIssue(key="SUP-1", id="1", project="SUP", fields={}))
+        db.session.commit()
+
+        # SUP-1 was deleted and SUP-3 moved to another project
+        jira_svc.search_issues.side_effect = [
+            [mocker.Mock(key="SUP-2")],
+            [],
+        ]
+        not_found = jira.JIRAError(status_code=404)
+        jira_svc.issue.side_effect = [not_found, mocker.Mock(key="OPS-7")]
+
+        stats = TicketSyncSvc.sync(svc=jira_svc, batch_size=2)
+        assert stats["deleted"] == 0
+        assert stats["missing"] == 1
+        assert stats["moved"] == 1
+        # one search per batch, one lookup per missing key
+        assert jira_svc.search_issues.call_count == 2
+        assert jira_svc.search_issues.call_args_list[0].kwargs["jql_str"] == (
+            "key in (SUP-1, SUP-2)"
+        )
+        assert jira_svc.issue.call_count == 2
+        assert sorted(t.key for t in Ticket.query) == ["OPS-7", "SUP-1", "SUP-2"]
+
+        # deleted once missing from the next sync too
+        jira_svc.issue.side_effect = [not_found]
+        jira_svc.search_issues.side_effect = [
+            [mocker.Mock(key="SUP-2"), mocker.Mock(key="OPS-7")]
+        ]
+        stats = TicketSyncSvc.sync(svc=jira_svc, batch_size=3)
+        assert stats["deleted"] == 1
+        assert stats["missing"] == 0
+
+        assert sorted(t.key for t in Ticket.query) == ["OPS-7", "SUP-2"]
+        assert TicketMessage.query.count() == 0
+        assert MirroredIssue.query.count() == 0
+
+    def test_sync_deleted_forgets_found_issues(self, app, jira_svc, tickets, mocker):
+        not_found = jira.JIRAError(status_code=404)
+        found = [mocker.Mock(key="SUP-2"), mocker.Mock(key="SUP-3")]
+        jira_svc.search_issues.return_value = found
+        jira_svc.issue.side_effect = not_found
+        assert TicketSyncSvc.sync(svc=jira_svc)["missing"] == 1
+
+        # found again, then missing: only suspected anew
+        jira_svc.search_issues.return_value = [mocker.Mock(key="SUP-1"), *found]
+        TicketSyncSvc.sync(svc=jira_svc)
+        jira_svc.search_issues.return_value = found
+        assert TicketSyncSvc.sync(svc=jira_svc)["deleted"] == 0
+        assert Ticket.query.count() == 3
+
+    def test_sync_deleted_stops_on_mass_missing(self, app, jira_svc, tickets):
+        jira_svc.issue.side_effect = jira.JIRAError(status_code=404)
+        for _ in range(2):
+            with pytest.raises(RuntimeError):
+                TicketSyncSvc.sync(svc=jira_svc)
+        jira_svc.issue.assert_not_called()
+        assert Ticket.query.count() == 3
+
+    def test_sync_deleted_raises_on_errors(self, app, jira_svc, tickets, mocker):
+        jira_svc.search_issues.return_value = [
+            mocker.Mock(key="SUP-2"),
+            mocker.Mock(key="SUP-3"),
+        ]
+        jira_svc.issue.side_effect = jira.JIRAError(status_code=500)
+        with pytest.raises(jira.JIRAError):
+            TicketSyncSvc.sync(svc=jira_svc)
+        assert Ticket.query.count() == 3
@@ -0,0 +1,301 @@
+import datetime
+
+import jinja2
+import pytest
+import sqlalchemy
+
+from src.models.jira import AttachmentUpload
+from src.models.ticket import Ticket, TicketMessage
+from src.schemas.serializers.jira.Issue import IssueSchema
+from src.services.jira import JiraSvc
+from src.services.ticket import TicketSvc
+from src.settings.ctx import db
+
+
+def make_issue(mocker, key):
+    return mocker.Mock(
+        id=key.split("-")[1], key=key, raw={"fields": {"summary": f"Issue {key}"}}
+    )
+
+
+@pytest.fixture
+def jira_svc(app, mocker):
+    svc = mocker.Mock(spec=JiraSvc)
+    svc.is_jira_filter.side_effect = JiraSvc.is_jira_filter
+    svc.create_jql_query.return_value = ""
+    mocker.patch.object(JiraSvc, "instance", return_value=svc)
+    return svc
+
+
+@pytest.fixture
+def queries(app):
+    statements = []
+
+    def count(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    sqlalchemy.event.listen(db.engine, "before_cursor_execute", count)
+    yield statements
+    sqlalchemy.event.remove(db.engine, "before_cursor_execute", count)
+
+
+class TestTicketSvc:
+    def test_find_by(self, jira_svc, mocker):
+        db.session.add(Ticket(key="JIRA-1", reporter="user@xyz.com"))
+        db.session.commit()
+        issues = [make_issue(mocker, "JIRA-1"), make_issue(mocker, "JIRA-2")]
+        jira_svc.search_page.return_value = (issues, None)
+
+        # tickets not locally present are left out
+        tickets = TicketSvc.find_by(limit=2)
+        assert len(tickets) == 1
+        assert tickets[0]["key"] == "JIRA-1"
+        assert tickets[0]["reporter"] == {"emailAddress": "user@xyz.com"}
+        assert tickets[0]["url"] == "https://jira.atlassian.com/browse/JIRA-1"
+
+    @pytest.mark.parametrize("limit", [1, 10, 100])
+    def test_find_by_query_count(self, jira_svc, queries, mocker, limit):
+        """The number of local queries must not grow with the page size."""
+        keys = [f"JIRA-{i}" for i in range(limit)]
+        db.session.add_all(Ticket(key=key, reporter="user@xyz.com") for key in keys)
+        db.session.commit()
+        issues = [make_issue(mocker, k) for k in keys]
+        jira_svc.search_page.return_value = (issues, None)
+
+        queries.clear()
+        tickets = TicketSvc.find_by(limit=limit)
+        assert len(tickets) == limit
+        assert len(queries) == 1
+
+    def test_find_by_projection(self, jira_svc, mocker):
+        jira_svc.search_page.return_value = ([], None)
+
+        TicketSvc.find_by()
+        fields = jira_svc.search_page.call_args.kwargs["fields"].split(",")
+        assert "*navigable" not in fields
+        assert "summary" in fields and "updated" in fields
+        assert "comment" not in fields
+
+        TicketSvc.find_by(fields=["comments"], only=["key", "title", "comments"])
+        assert jira_svc.search_page.call_args.kwargs["fields"] == (
+            "comment,summary,updated"
+        )
+
+        # the rendered fields are only rendered when fetched
+        TicketSvc.find_by(fields=["rendered"], only=["key", "rendered"])
+        kwargs = jira_svc.search_page.call_args.kwargs
+        assert kwargs["fields"] == "comment,description,updated"
+        assert kwargs["expand"] == "renderedFields"
+
+    def test_projection(self):
+        assert "comments" not in TicketSvc.projection()
+        assert "comments" in TicketSvc.projection(fields=["comments"])
+        assert TicketSvc.projection(only=["key", "watchers"]) == ["key"]
+        assert TicketSvc.projection(fields=["watchers"], only=["watchers"]) == [
+            "watchers"
+        ]
+        assert IssueSchema.jira_fields(only=["key", "type", "comments"]) == [
+            "comment",
+            "issuetype",
+        ]
+
+    def test_find_page(self, jira_svc, mocker):
+        db.session.add_all(
+            Ticket(key=f"JIRA-{i}", reporter="user@xyz.com") for i in range(3)
+        )
+        db.session.commit()
+        jira_svc.search_page.side_effect = [
+            ([make_issue(mocker, "JIRA-0"), make_issue(mocker, "JIRA-1")], 2),
+            ([make_issue(mocker, "JIRA-2")], None),
+        ]
+
+        tickets, cursor = TicketSvc.find_page(limit=2)
+        assert [t["key"] for t in tickets] == ["JIRA-0", "JIRA-1"]
+        assert cursor is not None
+
+        tickets, cursor = TicketSvc.find_page(limit=2, cursor=cursor)
+        assert [t["key"] for t in tickets] == ["JIRA-2"]
+        assert cursor is None
+        tokens = [c.kwargs["token"] for c in jira_svc.search_page.call_args_list]
+        assert tokens == [None, 2]
+
+        with pytest.raises(ValueError):
+            TicketSvc.find_page(limit=2, cursor="invalid")
+        with pytest.raises(ValueError):
+            TicketSvc.find_page(cursor=TicketSvc.encode_cursor(2, source="mirror"))
+
+    def test_iter_by(self, jira_svc, mocker):
+        db.session.add_all(
+            Ticket(key=f"JIRA-{i}", reporter="user@xyz.com") for i in range(3)
+        )
+        db.session.commit()
+        jira_svc.search_page.side_effect = [
+            ([make_issue(mocker, "JIRA-0"), make_issue(mocker, "JIRA-1")], 2),
+            ([make_issue(mocker, "JIRA-2")], None),
+        ]
+
+        tickets = TicketSvc.iter_by(batch_size=2)
+        # next pages are only searched as tickets are consumed
+        assert jira_svc.search_page.call_count == 1
+        assert next(tickets)["key"] == "JIRA-0"
+        assert jira_svc.search_page.call_count == 1
+        assert [t["key"] for t in tickets] == ["JIRA-1", "JIRA-2"]
+        assert jira_svc.search_page.call_count == 2
+
+    def test_find_page_cached(self, app, jira_svc, mocker):
+        db.session.add(Ticket(key="JIRA-1", reporter="user@xyz.com"))
+        db.session.commit()
+        jira_svc.search_page.return_value = ([make_issue(mocker, "JIRA-1")], None)
+        criteria = {"boards": ["support"], "status": "open"}
+
+        def search():
+            return TicketSvc.find_page_cached(criteria=dict(criteria), limit=2)
+
+        assert search() == search()
+        assert [t["key"] for t in search()[0]] == ["JIRA-1"]
+        assert jira_svc.search_page.call_count == 1
+
+        # writes drop the searches of their board or including their tickets
+        TicketSvc.invalidate_searches(boards=["other"], keys=["JIRA-2"])
+        search()
+        assert jira_svc.search_page.call_count == 1
+        TicketSvc.update(ticket_id=1, reporter="other@xyz.com")
+        search()
+        assert jira_svc.search_page.call_count == 2
+        TicketSvc.invalidate_searches(boards=["support"])
+        search()
+        assert jira_svc.search_page.call_count == 3
+
+        # searches cached while commenting are dropped once all is written
+        jira_svc.add_attachments.side_effect = lambda **_: search() and []
+        TicketSvc.create_comment(issue="JIRA-1", author="user@xyz.com", body="hello")
+        assert jira_svc.search_page.call_count == 3
+        search()
+        assert jira_svc.search_page.call_count == 4
+
+        app.extensions["tickets_cache"] = None
+        search()
+        assert jira_svc.search_page.call_count == 5
+
+    def test_find_versions(self, jira_svc, mocker):
+        db.session.add(
+            Ticket(
+                key="JIRA-1",
+                reporter="user@xyz.com",
+                updated_at=datetime.datetime(2024, 1, 2),
+            )
+        )
+        db.session.commit()
+        issues = [make_issue(mocker, "JIRA-1"), make_issue(mocker, "JIRA-2")]
+        for issue in issues:
+            issue.raw["fields"]["updated"] = "2024-01-01T10:00:00.000+0000"
+        jira_svc.search_page.return_value = (issues, None)
+
+        versions, cursor = TicketSvc.find_versions(limit=2, fields=["watchers"])
+        assert versions == {
+            "JIRA-1": ("2024-01-01T10:00:00.000+0000", datetime.datetime(2024, 1, 2))
+        }
+        assert cursor is None
+        # only the update times are fetched
+        assert jira_svc.search_page.call_args.kwargs["fields"] == "updated"
+
+    def test_validators(self):
+        versions = {
+            "JIRA-1": ("2024-01-03T10:00:00.000+0100", datetime.datetime(2024, 1, 2))
+        }
+        etag, last_modified = TicketSvc.validators(versions)
+        assert last_modified == datetime.datetime(
+            2024, 1, 3, 9, tzinfo=datetime.timezone.utc
+        )
+        assert etag == TicketSvc.validators(dict(versions))[0]
+
+        # any update or change of page gives another ETag
+        updated = {"JIRA-1": (versions["JIRA-1"][0], datetime.datetime(2024, 1, 4))}
+        assert TicketSvc.validators(updated)[0] != etag
+        assert TicketSvc.validators(versions, cursor="next")[0] != etag
+        assert TicketSvc.validators({}) == (TicketSvc.validators({})[0], None)
+
+    def test_create_with_failed_attachments(self, jira_svc, mocker):
+        board = mocker.Mock(key="support", project="SUP")
+        jira_svc.boards.return_value = [board]
+        jira_svc.markdown.mention.return_value = "user"
+        jira_svc.create_issue.return_value = mocker.Mock(key="SUP-1")
+        jira_svc.add_attachments.return_value = [
+            AttachmentUpload(filename="dummy.txt", attachment=mocker.Mock()),
+            AttachmentUpload(filename="broken.txt", error="server error"),
+        ]
+        users = {"user@xyz.com": None}
+        mocker.patch.object(TicketSvc, "resolve_emails", return_value=users)
+        mocker.patch.object(TicketSvc, "find_one", return_value={"key": "SUP-1"})
+        progress = mocker.Mock()
+
+        created = TicketSvc.create(
+            title="Some title",
+            reporter="user@xyz.com",
+            board="support",
+            category="general",
+            attachments=["dummy.txt", "broken.txt"],
+            progress=progress,
+        )
+        assert created == {"key": "SUP-1"}
+        assert Ticket.query.filter_by(key="SUP-1").count() == 1
+        error = progress.call_args_list[-2].kwargs["error"]
+        assert "broken.txt" in error and "dummy.txt" not in error
+
+    def test_create_message_body(self, app, mocker):
+        body = TicketSvc.create_message_body(
+            template="jira.j2",
+            values={"author": "user", "cc": "", "body": "some body"},
+        )
+        assert body == "From: user\n\n\nsome body"
+
+        # templates are not read again from disk
+        load = mocker.spy(jinja2.FileSystemLoader, "get_source")
+        TicketSvc.create_message_body(template="jira.j2", values={})
+        assert load.call_count == 0
+
+        assert TicketSvc.create_message_body(template=None) is None
+        with pytest.raises(ValueError):
+            TicketSvc.create_message_body(template="invalid.j2", values={})
+
+
+class TestTicketHistory:
+    @pytest.fixture
+    def ticket(self, app):
+        ticket = Ticket(key="JIRA-1", reporter="user@xyz.com")
+        db.session.add(ticket)
+        db.session.commit()
+        return ticket
+
+    def test_add_message(self, ticket):
+        assert TicketSvc.add_message(ticket_id=ticket.id, message_id="m1") is True
+        assert TicketSvc.add_message(ticket_id=ticket.id, message_id="m1") is False
+        assert TicketSvc.has_message(ticket_id=ticket.id, message_id="m1") is True
+        assert TicketSvc.has_message(ticket_id=ticket.id, message_id="m2") is False
+        assert ticket.messages.count() == 1
+
+    def test_last_message(self, ticket):
+        assert TicketSvc.last_message(ticket_id=ticket.id) is None
+        TicketSvc.add_message(ticket.id, "m1", direction=TicketMessage.INBOUND)
+        TicketSvc.add_message(ticket.id, "m2", direction=TicketMessage.OUTBOUND)
+        assert TicketSvc.last_message(ticket_id=ticket.id).message_id == "m2"
+
+        last = TicketSvc.last_message(ticket.id, direction=TicketMessage.INBOUND)
+        assert last.message_id == "m1"
+
+    def test_known_messages(self, ticket):
+        TicketSvc.add_message(ticket_id=ticket.id, message_id="m1")
+        assert TicketSvc.known_messages(["m1", "m2"]) == {"m1"}
+
+    def test_delete(self, ticket):
+        TicketSvc.add_message(ticket_id=ticket.id, message_id="m1")
+        TicketSvc.delete(ticket_id=ticket.id)
+        assert Ticket.query.count() == 0
+        assert TicketMessage.query.count() == 0
+
+        # a new ticket reusing the id starts with no history
+        ticket = Ticket(id=ticket.id, key="JIRA-2", reporter="user@xyz.com")
+        db.session.add(ticket)
+        db.session.commit()
+        assert TicketSvc.has_message(ticket_id=ticket.id, message_id="m1") is False
+        assert TicketSvc.known_messages(["m1"]) == set()